@@ -69,14 +69,12 @@ def decode_token(token: str) -> Optional[dict]:
 security = HTTPBearer()
 
 
-def get_current_student(
-    credentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> models.Student:
+def get_current_student_id(credentials = Depends(security)) -> int:
     """
-    Dependency that extracts and validates the JWT token from the Authorization header.
-    Returns the authenticated Student object.
-    Raises HTTPException if token is invalid or student not found.
+    Dependency that validates the JWT token and returns its student_id.
+    Does not touch the database; use get_current_student when the Student
+    row itself is needed.
+    Raises HTTPException if the token is invalid.
     """
     token = credentials.credentials
     payload = decode_token(token)
@@ -96,6 +94,18 @@ def get_current_student(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    return student_id
+
+
+def get_current_student(
+    student_id: int = Depends(get_current_student_id),
+    db: Session = Depends(get_db)
+) -> models.Student:
+    """
+    Dependency that extracts and validates the JWT token from the Authorization header.
+    Returns the authenticated Student object.
+    Raises HTTPException if token is invalid or student not found.
+    """
     student = db.query(models.Student).filter(models.Student.id == student_id).first()
     if student is None:
         raise HTTPException(
@@ -103,4 +113,4 @@ def get_current_student(
             detail="Student not found",
         )
     
-    return student
\ No newline at end of file
+    return student
@@ -0,0 +1,98 @@
+"""Course detail loader and per-course detail cache.
+
+A detail view needs the course row plus the names of its prerequisites, its
+skills and its clusters. ``load`` reads them in two queries: the course, then
+one UNION ALL over the three link tables. ``get`` serves responses from an
+in-process LRU cache. Each entry records the catalog version it was read at
+(``snapshot.catalog_version()``, shared by all workers through the snapshot
+directory); a committed course, prerequisite, course-skill, course-cluster,
+skill or cluster write in any worker changes that version, and older entries
+are reloaded on their next read.
+"""
+
+from typing import Optional
+
+from sqlalchemy import literal, null, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models, schemas
+from .cache import LRUCache
+from .recommendation_engine import snapshot
+
+COURSE_DETAIL_CACHE_SIZE = 2048
+
+_cache = LRUCache(COURSE_DETAIL_CACHE_SIZE)
+
+
+def _related_rows(course_id: int):
+    skills = (
+        select(
+            literal("skill").label("kind"), models.Skill.id, models.Skill.name,
+            models.Skill.type, models.Skill.description,
+        )
+        .join(models.CourseSkill, models.CourseSkill.skill_id == models.Skill.id)
+        .where(models.CourseSkill.course_id == course_id)
+    )
+    clusters = (
+        select(
+            literal("cluster"), models.Cluster.id, models.Cluster.name,
+            null(), models.Cluster.description,
+        )
+        .join(models.CourseCluster, models.CourseCluster.cluster_id == models.Cluster.id)
+        .where(models.CourseCluster.course_id == course_id)
+    )
+    prerequisites = (
+        select(literal("prerequisite"), models.Course.id, models.Course.name, null(), null())
+        .join(models.CoursePrerequisite, models.CoursePrerequisite.required_course_id == models.Course.id)
+        .where(models.CoursePrerequisite.course_id == course_id)
+    )
+    return union_all(skills, clusters, prerequisites)
+
+
+async def load(db: AsyncSession, course_id: int) -> Optional[schemas.CourseDetailsResponse]:
+    """Read a course's detail response from the database (two queries)."""
+    course = await db.get(models.Course, course_id)
+    if course is None:
+        return None
+
+    prerequisites, skills, clusters = [], [], []
+    for kind, id_, name, type_, description in (await db.execute(_related_rows(course_id))).all():
+        if kind == "skill":
+            skills.append(schemas.SkillResponse(id=id_, name=name, type=type_, description=description))
+        elif kind == "cluster":
+            clusters.append(schemas.ClusterResponse(id=id_, name=name, description=description))
+        else:
+            prerequisites.append(schemas.PrerequisiteCourseResponse(id=id_, name=name))
+
+    return schemas.CourseDetailsResponse(
+        id=course.id,
+        name=course.name,
+        description=course.description,
+        workload=course.workload,
+        credits=course.credits,
+        status=course.status,
+        prerequisites=prerequisites,
+        skills=skills,
+        clusters=clusters,
+        created_at=course.created_at,
+    )
+
+
+async def get(db: AsyncSession, course_id: int) -> Optional[schemas.CourseDetailsResponse]:
+    """Cached course detail response; None for an unknown course (not cached)."""
+    version = snapshot.catalog_version()
+    cached = _cache.get(course_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    details = await load(db, course_id)
+    if details is not None:
+        _cache.put(course_id, (version, details))
+    return details
+
+
+def clear():
+    _cache.clear()
+
+
+def stats() -> dict:
+    return _cache.stats()
@@ -1,6 +1,11 @@
-from sqlalchemy.orm import Session
-from typing import Dict, Any, List, Optional
-from . import models, schemas
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.util import identity_key
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, date, timedelta
+from . import models, pagination, schemas
+from .recommendation_engine import config as recommendation_config, peers, review_stats
 
 # ==================== Student CRUD Operations ====================
 
@@ -8,6 +13,35 @@ def get_student(db: Session, student_id: int):
     """Retrieve a student by their ID."""
     return db.query(models.Student).filter(models.Student.id == student_id).first()
 
+# Relationships serialized in StudentResponse, loaded up front so a page of
+# students costs the same four queries however many rows it holds
+STUDENT_PROFILE_RELATIONS = (
+    selectinload(models.Student.career_goal),
+    selectinload(models.Student.human_skills),
+    selectinload(models.Student.student_courses),
+)
+
+def get_student_profile(db: Session, student_id: int):
+    """Retrieve a student with the relationships of its StudentResponse."""
+    return (
+        db.query(models.Student)
+        .options(*STUDENT_PROFILE_RELATIONS)
+        .filter(models.Student.id == student_id)
+        .first()
+    )
+
+def get_student_profiles(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    """Retrieve a page of students (by id) with the relationships of their StudentResponse.
+
+    Returns (students, next_cursor); see pagination.keyset.
+    """
+    query = pagination.keyset(
+        db.query(models.Student).options(*STUDENT_PROFILE_RELATIONS), [models.Student.id], cursor, limit,
+    )
+    if skip and not cursor:
+        query = query.offset(skip)
+    return pagination.page(query.all(), limit, lambda s: (s.id,))
+
 def get_student_by_name(db: Session, name: str):
     """Retrieve a student by their unique name (used for login/registration)."""
     return db.query(models.Student).filter(models.Student.name == name).first()
@@ -48,24 +82,11 @@ def create_student(db: Session, student_data: Dict[str, Any]):
     
     # Add human skills (many-to-many)
     if human_skill_ids:
-        for skill_id in human_skill_ids:
-            try:
-                sid = int(skill_id)
-            except Exception:
-                continue
-            # Verify the skill exists before adding
-            skill = db.query(models.Skill).filter(models.Skill.id == sid).first()
-            if skill:
-                db_student.human_skills.append(skill)
+        replace_student_human_skills(db, db_student.id, human_skill_ids)
 
     # Add courses_taken if provided
     if courses_taken:
-        for course_id in courses_taken:
-            try:
-                cid = int(course_id)
-            except Exception:
-                continue
-            add_student_course(db, db_student.id, cid, status='completed')
+        replace_student_courses(db, db_student.id, courses_taken)
     
     db.commit()
     db.refresh(db_student)
@@ -104,29 +125,11 @@ def update_student(db: Session, student_id: int, student_data: Dict[str, Any]):
     
     # Update human skills if provided
     if human_skill_ids is not None:
-        # Clear existing skills
-        db_student.human_skills.clear()
-        # Add new skills
-        for skill_id in human_skill_ids:
-            try:
-                sid = int(skill_id)
-            except Exception:
-                continue
-            skill = db.query(models.Skill).filter(models.Skill.id == sid).first()
-            if skill:
-                db_student.human_skills.append(skill)
+        replace_student_human_skills(db, student_id, human_skill_ids)
     # Update courses_taken if provided
     courses_taken = student_data.pop('courses_taken', None)
     if courses_taken is not None:
-        # clear existing student_courses
-        db.query(models.StudentCourse).filter(models.StudentCourse.student_id == student_id).delete()
-        db.commit()
-        for course_id in courses_taken:
-            try:
-                cid = int(course_id)
-            except Exception:
-                continue
-            add_student_course(db, student_id, cid, status='completed')
+        replace_student_courses(db, student_id, courses_taken)
     
     db.commit()
     db.refresh(db_student)
@@ -142,6 +145,14 @@ def add_student_course(db: Session, student_id: int, course_id: int, status: str
     ).first()
     
     if existing:
+        if existing.status != status:
+            if existing.status == 'completed':
+                record_completion(db, course_id, -1, existing.created_at)
+            elif status == 'completed':
+                # created_at becomes the completion day, so a later removal
+                # takes the -1 from the same popularity slot
+                existing.created_at = datetime.utcnow()
+                record_completion(db, course_id, +1, existing.created_at)
         existing.status = status
     else:
         student_course = models.StudentCourse(
@@ -150,6 +161,8 @@ def add_student_course(db: Session, student_id: int, course_id: int, status: str
             status=status
         )
         db.add(student_course)
+        if status == 'completed':
+            record_completion(db, course_id, +1)
     
     db.commit()
     return existing if existing else student_course
@@ -157,13 +170,136 @@ def add_student_course(db: Session, student_id: int, course_id: int, status: str
 
 def remove_student_course(db: Session, student_id: int, course_id: int):
     """Remove a course from a student's courses."""
+    existing = db.query(models.StudentCourse).filter(
+        models.StudentCourse.student_id == student_id,
+        models.StudentCourse.course_id == course_id
+    ).first()
+    if existing and existing.status == 'completed':
+        record_completion(db, course_id, -1, existing.created_at)
     db.query(models.StudentCourse).filter(
         models.StudentCourse.student_id == student_id,
         models.StudentCourse.course_id == course_id
     ).delete()
+    peers.touch(db, student_id)
     db.commit()
 
 
+def clear_student_courses(db: Session, student_id: int):
+    """Remove all of a student's courses, keeping the popularity counters in step (caller commits)."""
+    rows = db.query(models.StudentCourse.course_id, models.StudentCourse.created_at).filter(
+        models.StudentCourse.student_id == student_id,
+        models.StudentCourse.status == 'completed'
+    ).all()
+    record_completions(db, [(course_id, -1, created_at) for course_id, created_at in rows])
+    db.query(models.StudentCourse).filter(models.StudentCourse.student_id == student_id).delete()
+    peers.touch(db, student_id)
+
+
+def _int_ids(values) -> List[int]:
+    """Distinct integer ids in submission order; values that are not integers are skipped."""
+    ids = []
+    for value in values:
+        try:
+            ids.append(int(value))
+        except (TypeError, ValueError):
+            continue
+    return list(dict.fromkeys(ids))
+
+
+def _expire_student_collection(db: Session, student_id: int, attribute: str):
+    # The bulk statements bypass the session; reload the collection on next access
+    student = db.identity_map.get(identity_key(models.Student, student_id))
+    if student is not None:
+        db.expire(student, [attribute])
+
+
+def replace_student_human_skills(db: Session, student_id: int, skill_ids):
+    """Make ``skill_ids`` the student's human skills (caller commits).
+
+    Unknown skill ids are dropped (resolved with one IN query); the
+    student_human_skills rows are then diffed and written with one DELETE
+    and one multi-row INSERT. Values that are not integers are skipped.
+    """
+    desired = _int_ids(skill_ids)
+    if desired:
+        known = set(db.scalars(select(models.Skill.id).where(models.Skill.id.in_(desired))))
+        desired = [skill_id for skill_id in desired if skill_id in known]
+
+    db.flush()
+    table = models.student_human_skills
+    existing = set(db.scalars(select(table.c.skill_id).where(table.c.student_id == student_id)))
+    removed = existing.difference(desired)
+    added = [skill_id for skill_id in desired if skill_id not in existing]
+
+    if removed:
+        db.execute(delete(table).where(table.c.student_id == student_id, table.c.skill_id.in_(removed)))
+    if added:
+        db.execute(insert(table), [{"student_id": student_id, "skill_id": skill_id} for skill_id in added])
+
+    if removed or added:
+        _expire_student_collection(db, student_id, "human_skills")
+        peers.touch(db, student_id)
+
+
+def replace_student_courses(db: Session, student_id: int, course_ids, status: str = "completed"):
+    """Make ``course_ids`` the student's courses, all with ``status`` (caller commits).
+
+    Diffs against the current rows and applies one DELETE, one UPDATE and one
+    multi-row INSERT, whatever the number of courses; unchanged enrollments
+    keep their created_at; an enrollment that becomes completed gets the
+    completion time as created_at. Values that are not integers are skipped.
+    The popularity counters and the peer index follow in the same transaction.
+    """
+    desired = _int_ids(course_ids)
+
+    # Pending ORM changes first: the statements below bypass the unit of work
+    db.flush()
+    existing = {
+        course_id: (current_status, created_at)
+        for course_id, current_status, created_at in db.query(
+            models.StudentCourse.course_id, models.StudentCourse.status, models.StudentCourse.created_at
+        ).filter(models.StudentCourse.student_id == student_id)
+    }
+    keep = set(desired)
+    removed = [course_id for course_id in existing if course_id not in keep]
+    restatused = [c for c in desired if c in existing and existing[c][0] != status]
+    added = [c for c in desired if c not in existing]
+
+    counter_changes = [
+        (course_id, -1, existing[course_id][1])
+        for course_id in removed + restatused
+        if existing[course_id][0] == 'completed'
+    ]
+    now = datetime.utcnow()
+    if status == 'completed':
+        counter_changes += [(course_id, +1, now) for course_id in restatused + added]
+    record_completions(db, counter_changes)
+
+    if removed:
+        db.query(models.StudentCourse).filter(
+            models.StudentCourse.student_id == student_id,
+            models.StudentCourse.course_id.in_(removed),
+        ).delete(synchronize_session=False)
+    if restatused:
+        db.query(models.StudentCourse).filter(
+            models.StudentCourse.student_id == student_id,
+            models.StudentCourse.course_id.in_(restatused),
+        ).update(
+            {models.StudentCourse.status: status, models.StudentCourse.created_at: now}
+            if status == 'completed' else {models.StudentCourse.status: status},
+            synchronize_session=False,
+        )
+    if added:
+        db.execute(insert(models.StudentCourse), [
+            {"student_id": student_id, "course_id": course_id, "status": status, "created_at": now}
+            for course_id in added
+        ])
+
+    if removed or restatused or added:
+        _expire_student_collection(db, student_id, "student_courses")
+        peers.touch(db, student_id)
+
+
 def get_student_courses(db: Session, student_id: int) -> List[models.StudentCourse]:
     """Get all courses for a student."""
     return db.query(models.StudentCourse).filter(
@@ -171,6 +307,246 @@ def get_student_courses(db: Session, student_id: int) -> List[models.StudentCour
     ).all()
 
 
+# ==================== Review Stats (time-decayed quality) ====================
+
+def decay_factor(elapsed_seconds: float, half_life_days: Optional[float] = None) -> float:
+    """Weight left after ``elapsed_seconds`` with the configured review half-life."""
+    half_life_days = half_life_days or recommendation_config.REVIEW_HALF_LIFE_DAYS
+    return 0.5 ** (elapsed_seconds / (half_life_days * 86400.0))
+
+
+def _fold_review(stats: models.CourseReviewStats, score: float, at: datetime):
+    """Add one review to a stats row in O(1).
+
+    Sum and weight are stored relative to ``updated_at``. Moving that reference
+    forward rescales both by the same decay factor, so older reviews fade
+    without being revisited. A review older than the reference is decayed
+    on its own instead.
+    """
+    if stats.updated_at is None or at >= stats.updated_at:
+        factor = decay_factor((at - stats.updated_at).total_seconds()) if stats.updated_at else 0.0
+        stats.decayed_sum = (stats.decayed_sum or 0.0) * factor + score
+        stats.decayed_weight = (stats.decayed_weight or 0.0) * factor + 1.0
+        stats.updated_at = at
+    else:
+        weight = decay_factor((stats.updated_at - at).total_seconds())
+        stats.decayed_sum = (stats.decayed_sum or 0.0) + score * weight
+        stats.decayed_weight = (stats.decayed_weight or 0.0) + weight
+
+
+def _insert_if_missing(db: Session, model, **values):
+    """INSERT ... ON CONFLICT DO NOTHING, so concurrent first writers do not collide."""
+    _insert_missing(db, model, [values])
+
+
+def _insert_missing(db: Session, model, rows: List[Dict[str, Any]]):
+    """Multi-row ``_insert_if_missing``."""
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    db.execute(dialect.insert(model).values(rows).on_conflict_do_nothing())
+
+
+def record_review_decay(db: Session, course_id: int, score: float, at: Optional[datetime] = None):
+    """Fold a new review into the course's decayed stats (caller commits)."""
+    at = at or datetime.utcnow()
+    query = db.query(models.CourseReviewStats).filter(
+        models.CourseReviewStats.course_id == course_id
+    ).with_for_update()
+    stats = query.first()
+    if stats is None:
+        # FOR UPDATE locks nothing while the row is missing; create it empty
+        # at this review's time (a no-op if another review just did) and lock it
+        _insert_if_missing(
+            db, models.CourseReviewStats, course_id=course_id, decayed_sum=0.0, decayed_weight=0.0, updated_at=at,
+        )
+        stats = query.one()
+    _fold_review(stats, score, at)
+    db.flush()
+    return stats
+
+
+def _decayed_stats_by_course(db: Session, course_ids=None) -> Dict[int, models.CourseReviewStats]:
+    """Decayed stats folded from the stored reviews, per course (new, unsaved rows)."""
+    query = db.query(models.CourseReview.course_id, models.CourseReview.final_score, models.CourseReview.created_at)
+    if course_ids is not None:
+        query = query.filter(models.CourseReview.course_id.in_(course_ids))
+
+    now = datetime.utcnow()
+    by_course = {}
+    for course_id, score, created_at in query.order_by(models.CourseReview.created_at).all():
+        stats = by_course.get(course_id)
+        if stats is None:
+            stats = models.CourseReviewStats(course_id=course_id, decayed_sum=0.0, decayed_weight=0.0, updated_at=None)
+            by_course[course_id] = stats
+        _fold_review(stats, score, created_at or now)
+    return by_course
+
+
+def rebuild_review_decay_stats(db: Session):
+    """Recompute course_review_stats from all reviews (for backfills and seeding)."""
+    db.query(models.CourseReviewStats).delete()
+    review_stats.touch(db)
+    by_course = _decayed_stats_by_course(db)
+    db.add_all(by_course.values())
+    db.commit()
+    return len(by_course)
+
+
+def remove_student_reviews(db: Session, student_id: int):
+    """Delete a student's reviews and refold the stats of the courses they reviewed (caller commits).
+
+    A decayed sum cannot drop one review exactly once later reviews have
+    rescaled it, so each affected course's stats are recomputed from its
+    remaining reviews.
+    """
+    course_ids = {
+        course_id for (course_id,) in db.query(models.CourseReview.course_id).filter(
+            models.CourseReview.student_id == student_id
+        ).distinct()
+    }
+    if not course_ids:
+        return
+    current = {
+        stats.course_id: stats
+        for stats in db.query(models.CourseReviewStats).filter(
+            models.CourseReviewStats.course_id.in_(course_ids)
+        ).with_for_update()
+    }
+    db.query(models.CourseReview).filter(models.CourseReview.student_id == student_id).delete()
+    _expire_student_collection(db, student_id, "course_reviews")
+    review_stats.touch(db)
+
+    refolded = _decayed_stats_by_course(db, course_ids)
+    for course_id in course_ids:
+        stats, fresh = current.get(course_id), refolded.get(course_id)
+        if fresh is None:
+            if stats is not None:
+                db.delete(stats)
+        elif stats is None:
+            db.add(fresh)
+        else:
+            stats.decayed_sum, stats.decayed_weight, stats.updated_at = (
+                fresh.decayed_sum, fresh.decayed_weight, fresh.updated_at,
+            )
+    db.flush()
+
+
+# ==================== Enrollment Counters (popularity) ====================
+
+def _window_slot(day: date) -> int:
+    return day.toordinal() % recommendation_config.POPULARITY_WINDOW_DAYS
+
+
+def record_completion(db: Session, course_id: int, delta: int, completed_at: Optional[datetime] = None):
+    """Apply +1/-1 to a course's completion counters (caller commits)."""
+    record_completions(db, [(course_id, delta, completed_at)])
+
+
+def record_completions(db: Session, changes: List[Tuple[int, int, Optional[datetime]]]):
+    """Apply (course_id, +1/-1, completed_at) changes to the completion counters (caller commits).
+
+    Additions land in the slot of the day the course was completed (today
+    unless given); a slot still holding a day from a previous cycle is reset
+    first. Removals only touch the slot if it still holds the day the course
+    was completed, so an enrollment older than the window only changes the
+    all-time total. The counter rows of all courses are read in two locking
+    queries; rows an addition needs but that do not exist yet are inserted
+    first (ON CONFLICT DO NOTHING, as concurrent first completions may race)
+    and then locked as well.
+    """
+    if not changes:
+        return
+    now = datetime.utcnow()
+    changes = [(course_id, delta, (completed_at or now).date()) for course_id, delta, completed_at in changes]
+    course_ids = {course_id for course_id, _, _ in changes}
+    slots = {_window_slot(day) for _, _, day in changes}
+
+    def lock_stats(ids):
+        return {
+            stats.course_id: stats
+            for stats in db.query(models.CourseEnrollmentStats).filter(
+                models.CourseEnrollmentStats.course_id.in_(ids)
+            ).with_for_update()
+        }
+
+    def lock_buckets(ids):
+        return {
+            (bucket.course_id, bucket.slot): bucket
+            for bucket in db.query(models.CourseEnrollmentDaily).filter(
+                models.CourseEnrollmentDaily.course_id.in_(ids),
+                models.CourseEnrollmentDaily.slot.in_(slots),
+            ).with_for_update()
+        }
+
+    stats_by_course = lock_stats(course_ids)
+    buckets = lock_buckets(course_ids)
+
+    missing_stats = course_ids - set(stats_by_course)
+    if missing_stats:
+        _insert_missing(db, models.CourseEnrollmentStats, [
+            {"course_id": course_id, "total_completions": 0} for course_id in missing_stats
+        ])
+        stats_by_course.update(lock_stats(missing_stats))
+    missing_buckets = {
+        (course_id, _window_slot(day)): day
+        for course_id, delta, day in changes
+        if delta > 0 and (course_id, _window_slot(day)) not in buckets
+    }
+    if missing_buckets:
+        _insert_missing(db, models.CourseEnrollmentDaily, [
+            {"course_id": course_id, "slot": slot, "day": day, "completions": 0}
+            for (course_id, slot), day in missing_buckets.items()
+        ])
+        buckets.update(lock_buckets({course_id for course_id, _ in missing_buckets}))
+
+    for course_id, delta, day in changes:
+        stats = stats_by_course[course_id]
+        stats.total_completions = max((stats.total_completions or 0) + delta, 0)
+
+        slot = _window_slot(day)
+        bucket = buckets.get((course_id, slot))
+        if delta > 0:
+            if bucket.day != day:
+                bucket.day = day
+                bucket.completions = 0
+            bucket.completions += delta
+        elif bucket is not None and bucket.day == day:
+            bucket.completions = max(bucket.completions + delta, 0)
+    db.flush()
+
+
+def rebuild_enrollment_stats(db: Session, today: Optional[date] = None):
+    """Recompute the popularity counters from student_courses (for backfills and seeding)."""
+    today = today or datetime.utcnow().date()
+    window_start = today - timedelta(days=recommendation_config.POPULARITY_WINDOW_DAYS - 1)
+    db.query(models.CourseEnrollmentDaily).delete()
+    db.query(models.CourseEnrollmentStats).delete()
+
+    completed = db.query(models.StudentCourse.course_id, models.StudentCourse.created_at).filter(
+        models.StudentCourse.status == 'completed'
+    ).all()
+    totals = {}
+    buckets = {}
+    for course_id, created_at in completed:
+        totals[course_id] = totals.get(course_id, 0) + 1
+        day = created_at.date() if created_at else today
+        if window_start <= day <= today:
+            key = (course_id, _window_slot(day))
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = models.CourseEnrollmentDaily(
+                    course_id=course_id, slot=key[1], day=day, completions=0
+                )
+            bucket.completions += 1
+
+    db.add_all(
+        models.CourseEnrollmentStats(course_id=course_id, total_completions=total)
+        for course_id, total in totals.items()
+    )
+    db.add_all(buckets.values())
+    db.commit()
+    return len(totals)
+
+
 # ==================== Course CRUD Operations (Example) ====================
 
 def get_course(db: Session, course_id: int):
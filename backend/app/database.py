@@ -1,6 +1,10 @@
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from . import pool_metrics
 
 # Read environment variables (Docker Compose will provide these)
 DB_USER = os.getenv("DB_USER", "admin")
@@ -9,15 +13,34 @@ DB_NAME = os.getenv("DB_NAME", "courses_db")
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = os.getenv("DB_PORT", "5432")
 
-# Build the database URL
+# Build the database URLs (sync psycopg2, async asyncpg)
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+ASYNC_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+# Pool size, overflow, timeout, recycle and pre-ping come from DB_POOL_* /
+# DB_MAX_OVERFLOW (see pool_metrics.pool_settings); both engines use them
+POOL_SETTINGS = pool_metrics.pool_settings()
 
 # Create SQLAlchemy engine
-engine = create_engine(DATABASE_URL)
+sync_pool_metrics = pool_metrics.register("sync")
+engine = create_engine(
+    DATABASE_URL, poolclass=sync_pool_metrics.pool_class(QueuePool), **POOL_SETTINGS,
+)
+sync_pool_metrics.listen(engine)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for read routes: waiting on Postgres does not hold a worker
+# thread. Objects stay usable after commit; relationships must be loaded
+# eagerly (lazy loads are not possible on an async session).
+async_pool_metrics = pool_metrics.register("async")
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, poolclass=async_pool_metrics.pool_class(AsyncAdaptedQueuePool), **POOL_SETTINGS,
+)
+async_pool_metrics.listen(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Base class for ORM models
 Base = declarative_base()
 
@@ -29,3 +52,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Async dependency - used in async def routes
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
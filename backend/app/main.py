@@ -1,10 +1,13 @@
 # backend/app/main.py
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles 
 from fastapi.middleware.cors import CORSMiddleware # <<< 1. IMPORT
 from .routes import students, courses, ratings, course_reviews, auth, career_goals, skills
 from .recommendation_engine import router as recommendations_router
+from . import pool_metrics, recompute_queue, warmup
 import os
 
 # Define the path to the React build directory (ensure this path matches your volume mount)
@@ -12,7 +15,19 @@ FRONTEND_BUILD_DIR = os.path.join(os.path.dirname(__file__), 'frontend_build')
 
 # seed_database() 
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm DB connections and recommendation caches in the background;
+    # /ready reports 503 until the caches are warm (the leaderboard fills after).
+    warmup.start()
+    # Recompute recommendations in the background after profile writes
+    recompute_queue.start()
+    yield
+    recompute_queue.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # 2. DEFINE ALLOWED ORIGINS
 # Since the frontend is running on localhost:3000 (usually) and the backend is 8000,
@@ -28,6 +43,7 @@ app.add_middleware(
     allow_credentials=True,             # Allow cookies/authorization headers
     allow_methods=["*"],                # Allow all methods (GET, POST, PUT, DELETE, OPTIONS, etc.)
     allow_headers=["*"],                # Allow all headers
+    expose_headers=["X-Next-Cursor"],   # Keyset pagination cursor of list endpoints
 )
 
 app.include_router(students.router)
@@ -39,6 +55,25 @@ app.include_router(career_goals.router)
 app.include_router(skills.router)
 app.include_router(recommendations_router.router)
 
+
+@app.get("/ready")
+def readiness():
+    """Readiness probe: 503 until the startup warm-up has finished."""
+    status = warmup.get_status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+
+@app.get("/recompute-queue")
+def recompute_queue_status():
+    """Depth and lag of the background recommendation recompute queue."""
+    return recompute_queue.get_status()
+
+
+@app.get("/metrics/db-pool")
+def db_pool_metrics():
+    """Connection pool settings, live state and counters per engine."""
+    return pool_metrics.snapshot_all()
+
 # Mount the StaticFiles directory to serve the frontend
 if os.path.isdir(FRONTEND_BUILD_DIR):
     app.mount("/", StaticFiles(directory=FRONTEND_BUILD_DIR, html=True), name="frontend")
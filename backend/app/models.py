@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Text, func, UniqueConstraint, Index, Table
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Date, Text, func, UniqueConstraint, Index, Table
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
@@ -98,6 +98,11 @@ class CoursePrerequisite(Base):
     course = relationship("Course", foreign_keys=[course_id], back_populates="prerequisites")
     required_course = relationship("Course", foreign_keys=[required_course_id])
 
+    __table_args__ = (
+        # A course's prerequisites (course detail view)
+        Index('ix_course_prerequisites_course_id', 'course_id'),
+    )
+
 
 # --------------------
 # Ratings Table
@@ -115,6 +120,12 @@ class Rating(Base):
     student = relationship("Student", back_populates="ratings")
     course = relationship("Course", back_populates="ratings")
 
+    __table_args__ = (
+        # /ratings/course/{id} and /ratings/student/{id}
+        Index('ix_ratings_course_id', 'course_id'),
+        Index('ix_ratings_student_id', 'student_id'),
+    )
+
 
 # --------------------
 # Career Goals Table
@@ -191,6 +202,67 @@ class CourseReview(Base):
     student = relationship("Student", back_populates="course_reviews")
     course = relationship("Course", back_populates="course_reviews")
 
+    __table_args__ = (
+        # Keyset pages of a course's reviews, newest first: (created_at, id) < cursor.
+        # Its course_id prefix also serves /reviews/course/{id}.
+        Index('ix_course_reviews_course_created', 'course_id', 'created_at', 'id'),
+        Index('ix_course_reviews_student_id', 'student_id'),
+    )
+
+
+# --------------------
+# Course Review Stats Table (time-decayed review quality)
+# --------------------
+class CourseReviewStats(Base):
+    __tablename__ = "course_review_stats"
+
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True)
+    decayed_sum = Column(Float, nullable=False, default=0.0)     # sum of final_score * decay weight
+    decayed_weight = Column(Float, nullable=False, default=0.0)  # sum of decay weights
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # time the decay is relative to
+
+
+# --------------------
+# Course Enrollment Stats Tables (popularity counters)
+# --------------------
+class CourseEnrollmentStats(Base):
+    __tablename__ = "course_enrollment_stats"
+
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True)
+    total_completions = Column(Integer, nullable=False, default=0)
+
+
+class CourseEnrollmentDaily(Base):
+    """Day-bucketed ring buffer: slot = day ordinal % window, reused when the day rolls over."""
+    __tablename__ = "course_enrollment_daily"
+
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True)
+    slot = Column(Integer, primary_key=True)
+    day = Column(Date, nullable=False)  # day the slot currently counts
+    completions = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('ix_course_enrollment_daily_day', 'day'),
+    )
+
+
+# --------------------
+# Leaderboard Entries ("most recommended" courses)
+# --------------------
+class LeaderboardEntry(Base):
+    """One course in a student's last recorded top-k, with the scopes the student counts in."""
+    __tablename__ = "leaderboard_entries"
+
+    student_id = Column(Integer, ForeignKey("students.id", ondelete="CASCADE"), primary_key=True)
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True)
+    career_goal_id = Column(Integer, nullable=True)
+    faculty = Column(String, nullable=True)
+
+    __table_args__ = (
+        Index('ix_leaderboard_entries_goal_faculty', 'career_goal_id', 'faculty'),
+        Index('ix_leaderboard_entries_faculty', 'faculty'),
+    )
+
 
 # --------------------
 # Course Skills (Junction Table)
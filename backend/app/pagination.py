@@ -0,0 +1,67 @@
+"""Keyset (cursor) pagination for list endpoints.
+
+A page is read with ``WHERE (sort columns) > (last row's values) ORDER BY
+sort columns LIMIT n + 1``, so a deep page costs the same index range scan
+as the first one and rows inserted meanwhile do not shift the pages. The
+client gets the last row's values back as an opaque cursor: in the
+``X-Next-Cursor`` header for plain list responses, absent on the last page.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import DateTime, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> Tuple:
+    """Values of ``columns`` encoded in ``cursor``; 400 if it is not one of ours."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(payload, list) or len(payload) != len(columns):
+            raise ValueError(cursor)
+        return tuple(
+            datetime.fromisoformat(value) if isinstance(column.type, DateTime) else column.type.python_type(value)
+            for column, value in zip(columns, payload)
+        )
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError, NotImplementedError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset(query, columns: Sequence, cursor: Optional[str], limit: int, descending: bool = False):
+    """Order ``query`` (a Query or select) by ``columns`` and start after ``cursor``.
+
+    Fetches one row more than ``limit`` so ``page`` can tell whether another
+    page follows. The last column must be unique (the primary key).
+    """
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        key = tuple_(*columns) if len(columns) > 1 else columns[0]
+        bound = tuple_(*values) if len(columns) > 1 else values[0]
+        query = query.filter(key < bound if descending else key > bound)
+    order = [c.desc() for c in columns] if descending else list(columns)
+    return query.order_by(*order).limit(limit + 1)
+
+
+def page(rows: Sequence, limit: int, key: Callable[[Any], Sequence]) -> Tuple[List, Optional[str]]:
+    """Split the rows of a ``keyset`` query into this page and the next page's cursor."""
+    rows = list(rows)
+    if len(rows) <= limit or limit <= 0:
+        return rows[:max(limit, 0)], None
+    rows = rows[:limit]
+    return rows, encode_cursor(key(rows[-1]))
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
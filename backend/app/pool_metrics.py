@@ -0,0 +1,160 @@
+"""Connection pool settings and live pool metrics.
+
+Pool sizing comes from the environment (``pool_settings``). Each engine gets
+a ``PoolMetrics``: pool event listeners count connects, checkouts, checkins
+and invalidations, and the pool class it provides times how long
+``Pool.connect()`` waited for a connection (including overflow use and
+timeouts when the pool is exhausted). ``snapshot()`` adds the pool's live
+state; ``/metrics/db-pool`` publishes every registered engine.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import event, exc
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes")
+
+
+def pool_settings() -> Dict:
+    """Keyword arguments for create_engine / create_async_engine, from the environment."""
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),  # seconds; -1 never recycles
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+    }
+
+
+class PoolMetrics:
+    """Counters for one engine's connection pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.engine = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidations = 0
+            self.soft_invalidations = 0
+            self.overflow_checkouts = 0  # checkouts that needed an overflow connection
+            self.timeouts = 0  # Pool.connect() gave up after pool_timeout
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.peak_checked_out = 0
+
+    def pool_class(self, base):
+        """Subclass of pool class ``base`` that times every Pool.connect() call."""
+        metrics = self
+
+        class MeteredPool(base):
+            def connect(self):
+                start = time.perf_counter()
+                try:
+                    connection = super().connect()
+                except exc.TimeoutError:
+                    metrics._record_wait(time.perf_counter() - start, timed_out=True)
+                    raise
+                metrics._record_wait(time.perf_counter() - start)
+                return connection
+
+        MeteredPool.__name__ = f"Metered{base.__name__}"
+        return MeteredPool
+
+    def _record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def listen(self, engine):
+        """Attach the pool event listeners to a (sync) engine."""
+        self.engine = engine
+
+        @event.listens_for(engine, "connect")
+        def _connect(dbapi_connection, connection_record):
+            with self._lock:
+                self.connects += 1
+
+        @event.listens_for(engine, "checkout")
+        def _checkout(dbapi_connection, connection_record, connection_proxy):
+            pool = engine.pool
+            checked_out = pool.checkedout() if hasattr(pool, "checkedout") else 0
+            with self._lock:
+                self.checkouts += 1
+                self.peak_checked_out = max(self.peak_checked_out, checked_out)
+                if hasattr(pool, "size") and checked_out > pool.size():
+                    self.overflow_checkouts += 1
+
+        @event.listens_for(engine, "checkin")
+        def _checkin(dbapi_connection, connection_record):
+            with self._lock:
+                self.checkins += 1
+
+        @event.listens_for(engine, "invalidate")
+        def _invalidate(dbapi_connection, connection_record, exception):
+            with self._lock:
+                self.invalidations += 1
+
+        @event.listens_for(engine, "soft_invalidate")
+        def _soft_invalidate(dbapi_connection, connection_record, exception):
+            with self._lock:
+                self.soft_invalidations += 1
+
+        return engine
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counters = {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "soft_invalidations": self.soft_invalidations,
+                "overflow_checkouts": self.overflow_checkouts,
+                "timeouts": self.timeouts,
+                "wait_total_ms": round(self.wait_total * 1000, 3),
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "wait_avg_ms": round(self.wait_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                "peak_checked_out": self.peak_checked_out,
+            }
+        pool = self.engine.pool if self.engine is not None else None
+        if pool is not None and hasattr(pool, "checkedout"):
+            counters["pool"] = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),  # connections beyond pool_size
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+                "recycle": pool._recycle,
+                "pre_ping": pool._pre_ping,
+            }
+        return counters
+
+
+_registry: Dict[str, PoolMetrics] = {}
+
+
+def register(name: str) -> PoolMetrics:
+    metrics = _registry[name] = PoolMetrics(name)
+    return metrics
+
+
+def get(name: str) -> Optional[PoolMetrics]:
+    return _registry.get(name)
+
+
+def snapshot_all() -> Dict[str, Dict]:
+    return {name: metrics.snapshot() for name, metrics in _registry.items()}
@@ -1,3 +1,3 @@
 """Recommendation engine package."""
 
-__all__ = ["config", "queries", "service", "schemas", "router"]
+__all__ = ["config", "queries", "snapshot", "profiles", "leaderboard", "peers", "service", "schemas", "router"]
@@ -1,5 +1,8 @@
 """Configuration constants for recommendation engine."""
 
+import os
+import tempfile
+
 # Final score weights (sum to 1.0)
 W1 = 0.80  # Role (career fit): technical skills overlap with required skills (increased)
 W2 = 0.10  # Affinity (course-to-course similarity based on completed courses) (reduced)
@@ -8,8 +11,89 @@ W5 = 0.10  # Review quality (smoothed review scores) (reduced)
 # Affinity similarity blending
 ALPHA = 0.6  # cluster_match weight; (1-alpha) for tech_overlap (Jaccard)
 
+# Named weight profiles (w1, w2, w5, alpha) selectable per request, see
+# profiles.py. 'default' always mirrors the constants above; missing keys
+# fall back to them. More profiles can be loaded from a JSON file.
+WEIGHT_PROFILE = "default"
+WEIGHT_PROFILES = {
+    "affinity_boost": {"w1": 0.60, "w2": 0.30, "w5": 0.10},
+}
+WEIGHT_PROFILES_FILE = os.getenv("RECOMMENDER_WEIGHT_PROFILES")
+
 # Affinity computation
 TOP_K_SIMILAR = 3  # Top K completed course similarities to average for affinity
 
+W_POP = 0.0  # Popularity (completion counters); off unless requested
+
+# Popularity: blend of all-time and recent completions, each log-scaled to [0..1]
+POPULARITY_WINDOW_DAYS = 30  # ring buffer length in course_enrollment_daily
+POPULARITY_TREND_WEIGHT = 0.5  # share of the recent-window count in the popularity score
+
+# Prerequisite-blocked courses returned with recommendations (fewest missing
+# prerequisites first); the full list is paginated separately
+BLOCKED_COURSES_LIMIT = 20
+BLOCKED_COURSES_MAX_LIMIT = 100  # largest page of blocked courses, inline or paginated
+
+# Budgeted selection (knapsack over the best-ranked candidates)
+KNAPSACK_TOP_N = 50  # candidates considered when a credit/workload budget is set
+KNAPSACK_CREDIT_UNITS = 2  # credits are counted in 1/2-credit units (rounded up per course)
+KNAPSACK_MAX_CELLS = 2_000_000  # DP table cap (items x (k+1) x capacities); larger requests are filled greedily
+BUDGET_MAX_CREDITS = 60  # largest accepted budget_credits
+BUDGET_MAX_WORKLOAD = 168  # largest accepted budget_workload (hours per week)
+BUDGET_MAX_K = 100  # largest accepted k when a budget is set (the DP table grows with k)
+RECOMMENDATIONS_MAX_K = 500  # largest accepted k for a JSON response
+RECOMMENDATIONS_STREAM_MAX_K = 5000  # largest accepted k for an NDJSON stream (explained as written)
+
+# "Most recommended" leaderboard: size of each student's counted top list
+LEADERBOARD_TOP_K = 10
+
+# "Similar courses": per-course neighbour lists precomputed in the snapshot,
+# scored as a blend of shared cluster, tech-skill Jaccard and co-enrollment
+# Jaccard (students who completed both)
+SIMILAR_COURSES_N = 20  # neighbours stored per course
+SIMILAR_W_CLUSTER = 0.4
+SIMILAR_W_SKILLS = 0.4
+SIMILAR_W_COENROLL = 0.2
+
+# "Students like me": each student is a sparse weighted vector over completed
+# courses, human skills and career goal; approximate neighbours come from a
+# random-projection LSH index kept in memory (see peers.py)
+PEER_W_COURSE = 1.0
+PEER_W_SKILL = 0.5
+PEER_W_GOAL = 1.5
+PEER_LSH_TABLES = 12  # hash tables (more tables: better recall, more candidates)
+PEER_LSH_BITS = 10  # hyperplanes per table (more bits: smaller buckets)
+PEER_LSH_SEED = 20240901
+PEER_EXACT_BELOW = 2000  # below this many indexed students, scan them all instead
+PEER_MAX_RESULTS = 50
+PEER_NEXT_COURSES = 5  # courses listed per peer that the requester has not taken
+PEER_LOG_MAX_BYTES = 1_000_000  # shared profile-write log size before it is replaced (workers then rebuild)
+
 # Review quality smoothing
 PRIOR_M = 5  # prior strength for Bayesian smoothing
+
+# Review quality mode: 'bayesian' (all reviews weigh the same) or 'decayed'
+# (exponentially time-decayed reviews, see course_review_stats)
+QUALITY_MODE = "bayesian"
+QUALITY_MODES = ("bayesian", "decayed")
+REVIEW_HALF_LIFE_DAYS = 365.0  # a review counts half as much after this many days
+
+# Catalog snapshot (memory-mapped .npy arrays shared by all workers)
+SNAPSHOT_DIR = os.getenv(
+    "RECOMMENDER_SNAPSHOT_DIR",
+    os.path.join(tempfile.gettempdir(), "recommender_snapshot"),
+)
+SNAPSHOT_KEEP_GENERATIONS = 2  # published generations kept on disk (current + previous)
+
+# Cold-start rankings (students with no completed courses), cached per goal
+# and snapshot generation
+COLD_START_CACHE_SIZE = 256  # cached (goal, options) rankings
+COLD_START_DECAYED_TTL = 3600  # seconds a quality=decayed ranking is reused
+
+# Unweighted score components, cached per (generation, goal, completed
+# courses, options) so switching weight profiles is a re-weighting only
+COMPONENT_CACHE_SIZE = 1024
+
+# /students/me/recommendations responses, cached per student and the state
+# they were computed from (also their ETag)
+STUDENT_RESPONSE_CACHE_SIZE = 4096
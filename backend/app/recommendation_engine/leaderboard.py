@@ -0,0 +1,106 @@
+"""Shared "most recommended courses" leaderboard.
+
+Counts how many students have each course in their top-k recommendations,
+overall, per career goal, per faculty and per (goal, faculty). Each student's
+last recorded top-k is stored in ``leaderboard_entries`` (one row per
+course, with the student's goal and faculty), so every worker reads the same
+board; recording a recomputed list only rewrites that student's rows when it
+changed, and the counts are aggregated from the rows when the board is read.
+
+The table is kept current by ``service.recommend_courses(..., record=True)``
+and filled for all students by ``service.rebuild_leaderboard``. Warm-up runs
+that rebuild in one worker per snapshot directory: the first worker to
+``claim_rebuild`` does it, the others skip it.
+"""
+
+import os
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, distinct, func, insert, select
+from sqlalchemy.orm import Session
+
+from .. import models
+from . import config
+
+REBUILD_FILE = "LEADERBOARD"
+
+_Entry = models.LeaderboardEntry
+
+
+def _in_scope(statement, career_goal_id: Optional[int], faculty: Optional[str]):
+    if career_goal_id is not None:
+        statement = statement.where(_Entry.career_goal_id == career_goal_id)
+    if faculty:
+        statement = statement.where(_Entry.faculty == faculty)
+    return statement
+
+
+def record(db: Session, student_id: int, career_goal_id: Optional[int], faculty: Optional[str],
+           course_ids: Sequence[int]):
+    """Replace a student's recorded top-k; rows are only written when it changed (caller commits)."""
+    # Serialise concurrent recordings of one student on their row
+    db.execute(select(models.Student.id).where(models.Student.id == student_id).with_for_update())
+    faculty = faculty or None
+    current = db.execute(
+        select(_Entry.course_id, _Entry.career_goal_id, _Entry.faculty).where(_Entry.student_id == student_id)
+    ).all()
+    if {row.course_id for row in current} == set(course_ids) and all(
+        (row.career_goal_id, row.faculty) == (career_goal_id, faculty) for row in current
+    ):
+        return
+    db.execute(delete(_Entry).where(_Entry.student_id == student_id))
+    if course_ids:
+        db.execute(insert(_Entry), [
+            {"student_id": student_id, "course_id": course_id, "career_goal_id": career_goal_id, "faculty": faculty}
+            for course_id in dict.fromkeys(course_ids)
+        ])
+
+
+def forget(db: Session, student_id: int):
+    """Drop a student's contribution, e.g. the student was deleted (caller commits)."""
+    db.execute(delete(_Entry).where(_Entry.student_id == student_id))
+
+
+def keep_only(db: Session, student_ids: Sequence[int]):
+    """Drop the rows of every student not in ``student_ids`` (caller commits)."""
+    db.execute(delete(_Entry).where(_Entry.student_id.not_in(student_ids)))
+
+
+def top(db: Session, limit: int = 10, career_goal_id: Optional[int] = None,
+        faculty: Optional[str] = None) -> List[Tuple[int, int]]:
+    """Return [(course_id, count), ...] for the scope, most recommended first.
+
+    Ties are ordered by course id.
+    """
+    count = func.count().label("count")
+    statement = _in_scope(select(_Entry.course_id, count), career_goal_id, faculty)
+    rows = db.execute(statement.group_by(_Entry.course_id).order_by(count.desc(), _Entry.course_id).limit(limit))
+    return [(course_id, n) for course_id, n in rows]
+
+
+def student_count(db: Session, career_goal_id: Optional[int] = None, faculty: Optional[str] = None) -> int:
+    """Number of recorded students in the scope."""
+    statement = _in_scope(select(func.count(distinct(_Entry.student_id))), career_goal_id, faculty)
+    return db.execute(statement).scalar_one()
+
+
+# ==================== ONE REBUILD PER DEPLOYMENT ====================
+
+def claim_rebuild(root: Optional[str] = None) -> bool:
+    """True for the first worker to ask (per snapshot directory), False for the rest."""
+    root = root or config.SNAPSHOT_DIR
+    os.makedirs(root, exist_ok=True)
+    try:
+        os.close(os.open(os.path.join(root, REBUILD_FILE), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        return False
+    return True
+
+
+def release_rebuild(root: Optional[str] = None):
+    """Let the next warm-up rebuild again (after a failed rebuild or a reseed)."""
+    root = root or config.SNAPSHOT_DIR
+    try:
+        os.remove(os.path.join(root, REBUILD_FILE))
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,348 @@
+"""In-memory "students like me" index (random-projection LSH).
+
+Each student is a sparse weighted vector over completed courses, human
+skills and career goal, compared by cosine similarity. Every feature has its
+own deterministic Gaussian vector, so a student's projection onto the
+``PEER_LSH_TABLES * PEER_LSH_BITS`` random hyperplanes is the sum of the
+vectors of their features; the signs of the projections form one bucket key
+per table. Students sharing a bucket with the requester in any table (or in a
+bucket one bit away, when that is too few) are the candidates, re-ranked by
+exact cosine. New courses or skills need no rebuild: their vectors are
+derived from the seed on first use.
+
+The index is built from the database on first use (or during warm-up) and
+then maintained incrementally: a session hook appends the ids of students
+whose profile rows were written to <SNAPSHOT_DIR>/PEERS, a log shared by all
+workers, and before each query a worker re-encodes only the students
+appended since it last read. The log starts with a random token; when it
+outgrows PEER_LOG_MAX_BYTES it is replaced by an empty one under a new token,
+and a worker that finds its token gone rebuilds the whole index.
+"""
+
+import math
+import os
+import threading
+import uuid
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from .. import models
+from . import config
+from .snapshot import _write_text_atomic
+
+Feature = Tuple[str, int]  # ('course' | 'skill' | 'goal', id)
+_KIND_CODES = {"course": 0, "skill": 1, "goal": 2}
+
+_lock = threading.Lock()
+_vectors: Dict[int, Dict[Feature, float]] = {}  # student -> sparse vector
+_norms: Dict[int, float] = {}
+_keys: Dict[int, Tuple[int, ...]] = {}  # student -> bucket key per table
+_buckets: List[Dict[int, Set[int]]] = [dict() for _ in range(config.PEER_LSH_TABLES)]  # table -> key -> students
+_built = False
+_log_position: Optional[Tuple[str, int]] = None  # (log token, bytes read) the index is current with
+_planes: Dict[Feature, np.ndarray] = {}
+
+
+def encode(course_ids: Iterable[int], skill_ids: Iterable[int], career_goal_id: Optional[int]) -> Dict[Feature, float]:
+    """Sparse profile vector of one student."""
+    vector: Dict[Feature, float] = {("course", int(c)): config.PEER_W_COURSE for c in course_ids}
+    vector.update({("skill", int(s)): config.PEER_W_SKILL for s in skill_ids})
+    if career_goal_id is not None:
+        vector[("goal", int(career_goal_id))] = config.PEER_W_GOAL
+    return vector
+
+
+def cosine(a: Dict[Feature, float], b: Dict[Feature, float]) -> float:
+    dot = _dot(a, b)
+    return dot / (_norm(a) * _norm(b)) if dot else 0.0
+
+
+def _dot(a: Dict[Feature, float], b: Dict[Feature, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b[feature] for feature, weight in a.items() if feature in b)
+
+
+def _norm(vector: Dict[Feature, float]) -> float:
+    return math.sqrt(sum(w * w for w in vector.values()))
+
+
+def _plane_matrix(features: Sequence[Feature]) -> np.ndarray:
+    """(len(features), tables * bits) hyperplane components, generated once per feature."""
+    dim = config.PEER_LSH_TABLES * config.PEER_LSH_BITS
+    rows = []
+    for feature in features:
+        plane = _planes.get(feature)
+        if plane is None or plane.shape[0] != dim:
+            rng = np.random.default_rng([config.PEER_LSH_SEED, _KIND_CODES[feature[0]], feature[1]])
+            plane = _planes[feature] = rng.standard_normal(dim)
+        rows.append(plane)
+    return np.array(rows).reshape(len(features), dim)
+
+
+def _bucket_keys(vectors: Sequence[Dict[Feature, float]]) -> np.ndarray:
+    """(len(vectors), tables) bucket keys: projection signs packed per table."""
+    tables, bits = config.PEER_LSH_TABLES, config.PEER_LSH_BITS
+    keys = np.zeros((len(vectors), tables), dtype=np.int64)
+    lengths = np.array([len(v) for v in vectors], dtype=np.int64)
+    nonempty = np.flatnonzero(lengths)
+    if not len(nonempty):
+        return keys
+
+    feature_ids: Dict[Feature, int] = {}
+    columns, weights = [], []
+    for i in nonempty:
+        for feature, weight in vectors[i].items():
+            columns.append(feature_ids.setdefault(feature, len(feature_ids)))
+            weights.append(weight)
+    planes = _plane_matrix(list(feature_ids))
+
+    # Projection of each student = weighted sum of the vectors of its features
+    contributions = planes[np.array(columns)] * np.array(weights)[:, None]
+    starts = np.concatenate(([0], np.cumsum(lengths[nonempty])[:-1]))
+    projections = np.add.reduceat(contributions, starts, axis=0)
+
+    signs = (projections > 0).reshape(len(nonempty), tables, bits)
+    keys[nonempty] = signs @ (1 << np.arange(bits, dtype=np.int64))
+    return keys
+
+
+def _load(db: Session, student_ids: Optional[Sequence[int]] = None) -> Dict[int, Dict[Feature, float]]:
+    """Encode students from the database (all of them when ``student_ids`` is None)."""
+    def only(column, query):
+        return query if student_ids is None else query.where(column.in_(student_ids))
+
+    goals = dict(db.execute(only(models.Student.id, select(models.Student.id, models.Student.career_goal_id))).all())
+    courses: Dict[int, List[int]] = defaultdict(list)
+    for student_id, course_id in db.execute(only(
+        models.StudentCourse.student_id,
+        select(models.StudentCourse.student_id, models.StudentCourse.course_id)
+        .where(models.StudentCourse.status == 'completed'),
+    )):
+        courses[student_id].append(course_id)
+    skills: Dict[int, List[int]] = defaultdict(list)
+    table = models.student_human_skills
+    for student_id, skill_id in db.execute(only(table.c.student_id, select(table.c.student_id, table.c.skill_id))):
+        skills[student_id].append(skill_id)
+
+    return {sid: encode(courses.get(sid, ()), skills.get(sid, ()), goal) for sid, goal in goals.items()}
+
+
+def _discard(student_id: int):
+    keys = _keys.pop(student_id, None)
+    _vectors.pop(student_id, None)
+    _norms.pop(student_id, None)
+    if keys is None:
+        return
+    for table, key in zip(_buckets, keys):
+        bucket = table.get(key)
+        if bucket is not None:
+            bucket.discard(student_id)
+            if not bucket:
+                del table[key]
+
+
+def _store(vectors: Dict[int, Dict[Feature, float]]):
+    student_ids = list(vectors)
+    keys = _bucket_keys([vectors[sid] for sid in student_ids])
+    for sid, row in zip(student_ids, keys.tolist()):
+        _discard(sid)
+        _vectors[sid] = vectors[sid]
+        _norms[sid] = _norm(vectors[sid])
+        _keys[sid] = tuple(row)
+        for table, key in zip(_buckets, row):
+            table.setdefault(key, set()).add(sid)
+
+
+def build(db: Session) -> int:
+    """Encode every student into a fresh index; returns the number indexed."""
+    global _built, _log_position
+    # Read the log position first: students written while loading are re-encoded on the next refresh
+    token, offset, _ = _read_log(None)
+    vectors = _load(db)
+    with _lock:
+        _clear()
+        _store(vectors)
+        _built = True
+        _log_position = (token, offset)
+    return len(vectors)
+
+
+def refresh(db: Session):
+    """Build the index on first use, then re-encode only students written since."""
+    global _log_position
+    with _lock:
+        built, position = _built, _log_position
+    if not built:
+        build(db)
+        return
+    token, offset, stale = _read_log(position)
+    if stale is None:
+        build(db)
+        return
+    vectors = _load(db, stale) if stale else {}
+    with _lock:
+        for sid in stale:
+            if sid not in vectors:
+                _discard(sid)  # deleted
+        _store(vectors)
+        if _log_position == position:
+            _log_position = (token, offset)
+
+
+def touch(session: Session, student_id: int):
+    """Mark a student for re-encoding when ``session`` commits.
+
+    For writes the flush hook cannot see (bulk ``Query.delete`` / Core
+    statements on the profile tables).
+    """
+    session.info.setdefault("peer_students", set()).add(student_id)
+
+
+def query(db: Session, student_id: int, limit: int = 10) -> List[Tuple[int, float]]:
+    """Return [(student_id, similarity), ...] for the students most similar to ``student_id``.
+
+    Most similar first, ties by student id; students with nothing in common
+    are left out.
+    """
+    refresh(db)
+    with _lock:
+        vector = _vectors.get(student_id)
+        if not vector:
+            return []
+        if len(_vectors) <= config.PEER_EXACT_BELOW:
+            candidates = set(_vectors)
+        else:
+            candidates = _candidates(_keys[student_id], probe=False)
+            if len(candidates) <= limit:
+                candidates |= _candidates(_keys[student_id], probe=True)
+        candidates.discard(student_id)
+        norm = _norms[student_id]
+        scored = []
+        for sid in candidates:
+            dot = _dot(vector, _vectors[sid])
+            if dot > 0:
+                scored.append((sid, dot / (norm * _norms[sid])))
+    scored.sort(key=lambda item: (-item[1], item[0]))
+    return scored[:limit]
+
+
+def _candidates(keys: Tuple[int, ...], probe: bool) -> Set[int]:
+    candidates: Set[int] = set()
+    for table, key in zip(_buckets, keys):
+        if probe:
+            for bit in range(config.PEER_LSH_BITS):
+                candidates |= table.get(key ^ (1 << bit), set())
+        else:
+            candidates |= table.get(key, set())
+    return candidates
+
+
+def size() -> int:
+    with _lock:
+        return len(_vectors)
+
+
+def _clear():
+    global _built, _buckets, _log_position
+    _vectors.clear()
+    _norms.clear()
+    _keys.clear()
+    _buckets = [dict() for _ in range(config.PEER_LSH_TABLES)]
+    _built = False
+    _log_position = None
+
+
+def clear():
+    with _lock:
+        _clear()
+
+
+# ==================== SHARED STALENESS LOG ====================
+
+LOG_FILE = "PEERS"
+
+
+def _log_path(root: Optional[str] = None) -> str:
+    return os.path.join(root or config.SNAPSHOT_DIR, LOG_FILE)
+
+
+def _new_log(path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _write_text_atomic(path, uuid.uuid4().hex + "\n")
+
+
+def _read_log(position: Optional[Tuple[str, int]], root: Optional[str] = None):
+    """Return (token, offset, student ids appended after ``position``).
+
+    The ids are None when ``position`` is not in the current log (first read,
+    or the log was replaced); the caller then rebuilds. Only complete lines
+    are consumed.
+    """
+    path = _log_path(root)
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        _new_log(path)
+        f = open(path, "rb")
+    with f:
+        header = f.readline()
+        token = header.strip().decode()
+        start = position[1] if position is not None and position[0] == token else len(header)
+        f.seek(start)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    offset = start + end
+    if position is None or position[0] != token:
+        return token, offset, None
+    return token, offset, [int(sid) for sid in data[:end].split()]
+
+
+def mark_stale(student_ids: Iterable[int], root: Optional[str] = None):
+    """Have every worker re-encode ``student_ids`` before its next query."""
+    path = _log_path(root)
+    if not os.path.exists(path):
+        _new_log(path)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+    except FileNotFoundError:
+        _new_log(path)  # a new token makes every worker rebuild, which covers these students
+        return
+    try:
+        # One write per commit: O_APPEND keeps concurrent writers' lines whole
+        os.write(fd, "".join(f"{int(sid)}\n" for sid in student_ids).encode())
+        size = os.fstat(fd).st_size
+    finally:
+        os.close(fd)
+    if size > config.PEER_LOG_MAX_BYTES:
+        _new_log(path)
+
+
+# ==================== PROFILE WRITE TRACKING ====================
+
+@event.listens_for(Session, "after_flush")
+def _track_profile_writes(session, flush_context):
+    touched = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, models.Student):
+            touched.add(obj.id)
+        elif isinstance(obj, models.StudentCourse):
+            touched.add(obj.student_id)
+    if touched:
+        session.info.setdefault("peer_students", set()).update(touched)
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_on_commit(session):
+    touched = session.info.pop("peer_students", None)
+    if touched:
+        mark_stale(touched)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("peer_students", None)
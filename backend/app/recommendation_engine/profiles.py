@@ -0,0 +1,121 @@
+"""Named weight profiles for the final score.
+
+A profile sets w1 (role), w2 (affinity), w5 (review quality) and alpha
+(cluster vs. tech-overlap share of course similarity). The 'default' profile
+always mirrors W1/W2/W5/ALPHA in config; more profiles are registered in
+config.WEIGHT_PROFILES and, optionally, in a JSON file named by the
+RECOMMENDER_WEIGHT_PROFILES environment variable:
+
+    {"role_heavy": {"w1": 0.9, "w2": 0.05, "w5": 0.05}, "low_alpha": {"alpha": 0.3}}
+
+Missing keys fall back to the config constants. The file is re-read whenever
+its modification time changes, so profiles can be added or tuned without a
+restart; a file that fails to parse is logged once per modification and the
+previous profiles stay in effect.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+PROFILE_KEYS = ("w1", "w2", "w5", "alpha")
+
+_lock = threading.Lock()
+_file_profiles: Dict[str, Dict[str, float]] = {}
+_file_mtime: Optional[float] = None  # mtime of the file version last read, valid or not
+
+
+def _default_profile() -> Dict[str, float]:
+    return {"w1": config.W1, "w2": config.W2, "w5": config.W5, "alpha": config.ALPHA}
+
+
+def _normalise(name: str, raw) -> Dict[str, float]:
+    """Validate a raw profile and fill in missing keys from config."""
+    if not isinstance(raw, dict):
+        raise ValueError(f"Weight profile '{name}' must be an object")
+    unknown = set(raw) - set(PROFILE_KEYS)
+    if unknown:
+        raise ValueError(f"Weight profile '{name}' has unknown keys: {sorted(unknown)}")
+
+    profile = _default_profile()
+    for key, value in raw.items():
+        value = float(value)
+        if not 0.0 <= value <= 1.0:
+            raise ValueError(f"Weight profile '{name}': {key} must be in [0, 1]")
+        profile[key] = value
+    return profile
+
+
+def reload(path: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    """Re-read the profiles file and replace the file-defined profiles.
+
+    Raises ValueError (or OSError) if the file cannot be used; the current
+    profiles are left untouched in that case.
+    """
+    global _file_profiles, _file_mtime
+    path = path or config.WEIGHT_PROFILES_FILE
+    if not path:
+        with _lock:
+            _file_profiles, _file_mtime = {}, None
+        return {}
+
+    mtime = os.path.getmtime(path)
+    with open(path) as f:
+        raw = json.load(f)
+    if not isinstance(raw, dict):
+        raise ValueError("Weight profiles file must contain an object of profiles")
+    loaded = {name: _normalise(name, values) for name, values in raw.items()}
+
+    with _lock:
+        _file_profiles, _file_mtime = loaded, mtime
+    logger.info("Loaded %d weight profile(s) from %s", len(loaded), path)
+    return loaded
+
+
+def _maybe_reload():
+    """Reload the profiles file if it changed since it was last read."""
+    global _file_mtime
+    path = config.WEIGHT_PROFILES_FILE
+    if not path:
+        return
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return
+    if mtime == _file_mtime:
+        return
+    try:
+        reload(path)
+    except (OSError, ValueError) as exc:
+        with _lock:
+            _file_mtime = mtime  # read a broken file once per change, not on every request
+        logger.warning("Ignoring invalid weight profiles file %s: %s", path, exc)
+
+
+def list_profiles() -> Dict[str, Dict[str, float]]:
+    """Return every available profile by name."""
+    _maybe_reload()
+    profiles = {"default": _default_profile()}
+    for name, raw in config.WEIGHT_PROFILES.items():
+        profiles[name] = _normalise(name, raw)
+    with _lock:
+        profiles.update(_file_profiles)
+    return profiles
+
+
+def get_profile(name: Optional[str] = None) -> Dict[str, float]:
+    """Return the named profile (default config.WEIGHT_PROFILE).
+
+    Raises ValueError if no profile has that name.
+    """
+    name = name or config.WEIGHT_PROFILE
+    profiles = list_profiles()
+    if name not in profiles:
+        raise ValueError(f"Unknown weight profile: {name}")
+    return profiles[name]
@@ -2,13 +2,22 @@ from sqlalchemy.orm import Session
 from .. import models
 from sqlalchemy import func
 from collections import defaultdict
+from datetime import datetime, timedelta
 from sqlalchemy import text
+from . import config
 
 
 def get_student(db: Session, student_id: int):
     return db.query(models.Student).filter(models.Student.id == student_id).first()
 
 
+def get_student_career_goal_id(db: Session, student_id: int):
+    """Return (career_goal_id,) for the student, or None if there is no such student.
+    Reads the single column, not the Student row.
+    """
+    return db.query(models.Student.career_goal_id).filter(models.Student.id == student_id).first()
+
+
 def get_student_human_skills(db: Session, student_id: int):
     """Return list of skill_ids that the student has marked as human skills.
     Queries the student_human_skills junction table via raw SQL.
@@ -60,6 +69,18 @@ def get_career_goal_skills(db: Session, career_goal_id: int):
     return tech_ids, human_ids
 
 
+def get_all_career_goal_technical_skills(db: Session):
+    """Return map career_goal_id -> set(skill_ids) for every career goal (empty set if none)."""
+    goal_ids = [r[0] for r in db.query(models.CareerGoal.id).all()]
+    m = {gid: set() for gid in goal_ids}
+    rows = db.query(
+        models.CareerGoalTechnicalSkill.career_goal_id, models.CareerGoalTechnicalSkill.skill_id
+    ).all()
+    for goal_id, skill_id in rows:
+        m.setdefault(goal_id, set()).add(skill_id)
+    return m
+
+
 def get_all_courses(db: Session):
     return db.query(models.Course).all()
 
@@ -92,6 +113,38 @@ def get_course_review_stats(db: Session):
     return stats, global_mean
 
 
+def get_course_review_decay_stats(db: Session):
+    """Return map course_id -> (decayed_sum, decayed_weight, updated_at) from course_review_stats."""
+    rows = db.query(
+        models.CourseReviewStats.course_id,
+        models.CourseReviewStats.decayed_sum,
+        models.CourseReviewStats.decayed_weight,
+        models.CourseReviewStats.updated_at,
+    ).all()
+    return {r.course_id: (r.decayed_sum, r.decayed_weight, r.updated_at) for r in rows}
+
+
+def get_course_popularity(db: Session, today=None):
+    """Return map course_id -> (total_completions, recent_completions).
+
+    Reads the maintained counters (course_enrollment_stats and the
+    course_enrollment_daily ring buffer) instead of counting student_courses.
+    """
+    today = today or datetime.utcnow().date()
+    cutoff = today - timedelta(days=config.POPULARITY_WINDOW_DAYS - 1)
+    totals = db.query(
+        models.CourseEnrollmentStats.course_id, models.CourseEnrollmentStats.total_completions
+    ).all()
+    recent = db.query(
+        models.CourseEnrollmentDaily.course_id, func.sum(models.CourseEnrollmentDaily.completions)
+    ).filter(models.CourseEnrollmentDaily.day >= cutoff).group_by(models.CourseEnrollmentDaily.course_id).all()
+
+    m = {course_id: (int(total or 0), 0) for course_id, total in totals}
+    for course_id, count in recent:
+        m[course_id] = (m.get(course_id, (0, 0))[0], int(count or 0))
+    return m
+
+
 def get_course_prereqs(db: Session):
     """Return map course_id -> set(required_course_id)."""
     rows = db.query(models.CoursePrerequisite.course_id, models.CoursePrerequisite.required_course_id).all()
@@ -101,6 +154,17 @@ def get_course_prereqs(db: Session):
     return m
 
 
+def get_completed_enrollments(db: Session):
+    """Return map student_id -> list of completed course_ids (all students)."""
+    rows = db.query(models.StudentCourse.student_id, models.StudentCourse.course_id).filter(
+        models.StudentCourse.status == 'completed'
+    ).all()
+    m = defaultdict(list)
+    for student_id, course_id in rows:
+        m[student_id].append(course_id)
+    return m
+
+
 def get_student_completed_course_ids(db: Session, student_id: int):
     """Return list of course_ids the student has completed (status='completed').
     Uses the `student_courses` junction table.
@@ -0,0 +1,139 @@
+"""Per-course review statistics for the recommendation engine.
+
+Reviews are written far more often than the rest of the catalog, so their
+aggregates are kept out of the catalog snapshot: a review would otherwise
+mark the snapshot DIRTY and make the next reader rebuild all of it. ``get``
+returns the review counts, averages and time-decayed sums aligned with a
+snapshot's course rows, read with two aggregate queries and kept in the
+worker until the review version or the snapshot generation changes.
+
+The review version is a token in <SNAPSHOT_DIR>/REVIEWS. A session hook
+replaces it when a commit writes a review or a course_review_stats row;
+every worker compares it on each read, so all of them reload after a review.
+"""
+
+import os
+import threading
+import uuid
+from datetime import timezone
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .. import models
+from . import config, queries
+from .snapshot import CatalogSnapshot, _read_text, _write_text_atomic
+
+VERSION_FILE = "REVIEWS"
+
+
+class ReviewStats:
+    """Review aggregates for the course rows of one snapshot generation."""
+
+    def __init__(self, version: str, global_mean: Optional[float], review_count: np.ndarray,
+                 review_avg: np.ndarray, decayed_sum: np.ndarray, decayed_weight: np.ndarray,
+                 decayed_at: np.ndarray):
+        self.version = version
+        self.global_mean = global_mean          # mean final_score over all reviews (None if none)
+        self.review_count = review_count        # int64   [C]
+        self.review_avg = review_avg            # float64 [C]  NaN when the course has no reviews
+        self.decayed_sum = decayed_sum          # float64 [C]  course_review_stats.decayed_sum
+        self.decayed_weight = decayed_weight    # float64 [C]
+        self.decayed_at = decayed_at            # float64 [C]  epoch seconds the decayed values refer to
+
+
+def load(db: Session, snap: CatalogSnapshot, version: str = "") -> ReviewStats:
+    """Read the review aggregates for ``snap``'s course rows from the database."""
+    n_courses = snap.num_courses
+    review_stats, global_mean = queries.get_course_review_stats(db)
+    review_count = np.zeros(n_courses, dtype=np.int64)
+    review_avg = np.full(n_courses, np.nan, dtype=np.float64)
+    for course_id, stats in review_stats.items():
+        i = snap.course_index.get(course_id)
+        if i is None:
+            continue
+        review_count[i] = stats["n"]
+        if stats["avg"] is not None:
+            review_avg[i] = stats["avg"]
+
+    decayed_sum = np.zeros(n_courses, dtype=np.float64)
+    decayed_weight = np.zeros(n_courses, dtype=np.float64)
+    decayed_at = np.zeros(n_courses, dtype=np.float64)
+    for course_id, (d_sum, d_weight, updated_at) in queries.get_course_review_decay_stats(db).items():
+        i = snap.course_index.get(course_id)
+        if i is None or updated_at is None:
+            continue
+        decayed_sum[i] = d_sum or 0.0
+        decayed_weight[i] = d_weight or 0.0
+        decayed_at[i] = updated_at.replace(tzinfo=timezone.utc).timestamp()
+
+    return ReviewStats(version, global_mean, review_count, review_avg, decayed_sum, decayed_weight, decayed_at)
+
+
+def read_version(root: Optional[str] = None) -> str:
+    """Current review version token ('' before the first review write)."""
+    root = root or config.SNAPSHOT_DIR
+    return _read_text(os.path.join(root, VERSION_FILE)) or ""
+
+
+def invalidate(root: Optional[str] = None):
+    """Give the reviews a new version so every worker reloads them."""
+    root = root or config.SNAPSHOT_DIR
+    os.makedirs(root, exist_ok=True)
+    _write_text_atomic(os.path.join(root, VERSION_FILE), uuid.uuid4().hex)
+
+
+# ==================== PER-WORKER ACCESS ====================
+
+_lock = threading.Lock()
+_current: Optional[ReviewStats] = None
+
+
+def get(db: Session, snap: CatalogSnapshot) -> ReviewStats:
+    """Review aggregates for ``snap``, reloaded when the reviews or the generation changed."""
+    global _current
+    version = f"{snap.generation}:{read_version()}"
+    with _lock:
+        if _current is None or _current.version != version:
+            _current = load(db, snap, version)
+        return _current
+
+
+def clear():
+    """Drop this worker's copy; the next ``get`` reloads it."""
+    global _current
+    with _lock:
+        _current = None
+
+
+# ==================== REVIEW WRITE TRACKING ====================
+
+_REVIEW_MODELS = (models.CourseReview, models.CourseReviewStats)
+
+
+def touch(session: Session):
+    """Bump the review version when ``session`` commits.
+
+    For writes the flush hook cannot see (bulk ``Query.delete`` / Core
+    statements on the review tables).
+    """
+    session.info["reviews_dirty"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _track_review_writes(session, flush_context):
+    if any(isinstance(obj, _REVIEW_MODELS) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info["reviews_dirty"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("reviews_dirty", False):
+        invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("reviews_dirty", None)
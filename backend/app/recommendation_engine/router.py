@@ -1,19 +1,92 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Dict, Optional
 from sqlalchemy.orm import Session
 from ..database import get_db
 from ..auth_utils import get_current_student
-from . import service, schemas
+from . import service, schemas, profiles, config, leaderboard, snapshot
 
 router = APIRouter(prefix="/recommendations", tags=["recommendations"])
 
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _check_profile(profile: Optional[str]):
+    if profile is not None and profile not in profiles.list_profiles():
+        raise HTTPException(status_code=400, detail=f"Unknown weight profile: {profile}")
+
+
+def _wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _check_k(k: int, ndjson: bool, budgeted: bool):
+    """Bound k by what the request builds: a budget table, a full JSON body or a stream."""
+    if budgeted:
+        limit = config.BUDGET_MAX_K
+    elif ndjson:
+        limit = config.RECOMMENDATIONS_STREAM_MAX_K
+    else:
+        limit = config.RECOMMENDATIONS_MAX_K
+    if k > limit:
+        raise HTTPException(status_code=422, detail=f"k must be at most {limit} for this request")
+
+
+def _recommendations_response(request: Request, db: Session, student_id: int, career_goal_id: int, **options):
+    """Build the full response, or stream it as NDJSON if the client asks for it.
+
+    NDJSON: the first line holds every response field except
+    'recommendations'; each following line is one recommendation, explained
+    only when it is written.
+    """
+    budgeted = options.get("budget_credits") is not None or options.get("budget_workload") is not None
+    _check_k(options["k"], _wants_ndjson(request), budgeted)
+    if not _wants_ndjson(request):
+        return service.recommend_courses(db, student_id, career_goal_id, **options)
+
+    header, items = service.stream_recommendations(db, student_id, career_goal_id, **options)
+
+    def lines():
+        yield json.dumps(header) + "\n"
+        for item in items:
+            yield json.dumps(item) + "\n"
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.get("/weight-profiles", response_model=Dict[str, schemas.WeightProfile])
+def get_weight_profiles(current_student = Depends(get_current_student)):
+    return profiles.list_profiles()
+
+
+@router.get("/blocked-courses", response_model=schemas.BlockedCoursesPage)
+def get_blocked_courses_for_current_student(
+    offset: int = Query(0, ge=0),
+    limit: int = Query(config.BLOCKED_COURSES_LIMIT, ge=1, le=config.BLOCKED_COURSES_MAX_LIMIT),
+    db: Session = Depends(get_db),
+    current_student = Depends(get_current_student),
+):
+    return service.get_blocked_courses(db, current_student.id, offset=offset, limit=limit)
+
+
 @router.get("/courses", response_model=schemas.RecommendationsResponse)
 def get_recommendations_for_current_student(
-    k: int = Query(10, ge=1),
+    request: Request,
+    k: int = Query(10, ge=1, le=config.RECOMMENDATIONS_STREAM_MAX_K),
     enforce_prereqs: bool = Query(True),
+    quality: Optional[str] = Query(None, pattern="^(bayesian|decayed)$"),
+    popularity_weight: Optional[float] = Query(None, ge=0.0, le=1.0),
+    profile: Optional[str] = Query(None),
+    blocked_limit: int = Query(config.BLOCKED_COURSES_LIMIT, ge=0, le=config.BLOCKED_COURSES_MAX_LIMIT),
+    budget_credits: Optional[float] = Query(None, gt=0, le=config.BUDGET_MAX_CREDITS),
+    budget_workload: Optional[float] = Query(None, gt=0, le=config.BUDGET_MAX_WORKLOAD),
     db: Session = Depends(get_db),
     current_student = Depends(get_current_student),
 ):
+    _check_profile(profile)
     # Determine career goal id from student
     student = current_student
     career_goal_id = getattr(student, 'career_goal_id', None)
@@ -32,17 +105,75 @@ def get_recommendations_for_current_student(
                 raise HTTPException(status_code=400, detail="Cannot resolve student's career goal")
             career_goal_id = cg.id
 
-    res = service.recommend_courses(db, student.id, career_goal_id, k=k, enforce_prereqs=enforce_prereqs)
-    return res
+    # The student's own goal with default options is "their" recommendation
+    # list; it feeds the leaderboard
+    record = (
+        career_goal_id == student.career_goal_id and enforce_prereqs and quality is None
+        and popularity_weight is None and profile is None and budget_credits is None and budget_workload is None
+    )
+    return _recommendations_response(
+        request, db, student.id, career_goal_id, k=k, enforce_prereqs=enforce_prereqs, quality_mode=quality,
+        popularity_weight=popularity_weight, weight_profile=profile, blocked_limit=blocked_limit,
+        budget_credits=budget_credits, budget_workload=budget_workload, record=record,
+    )
 
 
 @router.get("/courses/for-goal/{career_goal_id}", response_model=schemas.RecommendationsResponse)
 def get_recommendations_for_goal(
     career_goal_id: int,
-    k: int = Query(10, ge=1),
+    request: Request,
+    k: int = Query(10, ge=1, le=config.RECOMMENDATIONS_STREAM_MAX_K),
     enforce_prereqs: bool = Query(True),
+    quality: Optional[str] = Query(None, pattern="^(bayesian|decayed)$"),
+    popularity_weight: Optional[float] = Query(None, ge=0.0, le=1.0),
+    profile: Optional[str] = Query(None),
+    blocked_limit: int = Query(config.BLOCKED_COURSES_LIMIT, ge=0, le=config.BLOCKED_COURSES_MAX_LIMIT),
+    budget_credits: Optional[float] = Query(None, gt=0, le=config.BUDGET_MAX_CREDITS),
+    budget_workload: Optional[float] = Query(None, gt=0, le=config.BUDGET_MAX_WORKLOAD),
+    db: Session = Depends(get_db),
+    current_student = Depends(get_current_student),
+):
+    _check_profile(profile)
+    return _recommendations_response(
+        request, db, current_student.id, career_goal_id, k=k, enforce_prereqs=enforce_prereqs, quality_mode=quality,
+        popularity_weight=popularity_weight, weight_profile=profile, blocked_limit=blocked_limit,
+        budget_credits=budget_credits, budget_workload=budget_workload,
+    )
+
+
+@router.get("/skill-cover/{career_goal_id}", response_model=schemas.SkillCoverResponse)
+def get_skill_cover(
+    career_goal_id: int,
+    enforce_prereqs: bool = Query(True),
+    cost: str = Query("courses", pattern="^(courses|credits)$"),
+    db: Session = Depends(get_db),
+    current_student = Depends(get_current_student),
+):
+    return service.recommend_skill_cover(
+        db, current_student.id, career_goal_id, enforce_prereqs=enforce_prereqs, cost=cost,
+    )
+
+
+@router.get("/leaderboard", response_model=schemas.LeaderboardResponse)
+def get_leaderboard(
+    career_goal_id: Optional[int] = Query(None),
+    faculty: Optional[str] = Query(None),
+    limit: int = Query(10, ge=1, le=100),
     db: Session = Depends(get_db),
     current_student = Depends(get_current_student),
 ):
-    res = service.recommend_courses(db, current_student.id, career_goal_id, k=k, enforce_prereqs=enforce_prereqs)
-    return res
+    snap = snapshot.get_snapshot(db)
+    courses = []
+    for course_id, count in leaderboard.top(db, limit, career_goal_id, faculty or None):
+        ci = snap.course_index.get(course_id)
+        courses.append({
+            'course_id': course_id,
+            'name': snap.course_names[ci] if ci is not None else None,
+            'count': count,
+        })
+    return {
+        'career_goal_id': career_goal_id,
+        'faculty': faculty,
+        'students': leaderboard.student_count(db, career_goal_id, faculty or None),
+        'courses': courses,
+    }
@@ -49,5 +49,63 @@ class RecommendationsResponse(BaseModel):
     missing_human_skills: List[SkillInfo] = []  # required but student lacks
     recommendations: List[CourseExplain] = []  # empty if blocked
     blocked_reason: Optional[str] = None  # reason if recommendations are blocked
-    blocked_courses: Optional[List[Dict]] = None  # courses blocked by missing prereqs
+    blocked_courses: Optional[List[Dict]] = None  # courses blocked by missing prereqs, closest to unlocking first (capped)
+    blocked_total: Optional[int] = None  # number of courses blocked by missing prereqs
+    weight_profile: Optional[str] = None  # weight profile used for the final score
+    budget_used: Optional[Dict[str, float]] = None  # total credits/workload of the recommendations, when budgeted
 
+
+class WeightProfile(BaseModel):
+    """Weights of one named profile."""
+    w1: float  # role
+    w2: float  # affinity
+    w5: float  # review quality
+    alpha: float  # cluster_match share of course similarity
+
+
+
+class BlockedCourse(BaseModel):
+    """Course the student cannot take yet."""
+    course_id: int
+    course_name: str
+    missing_prereqs: List[int] = []  # ids of prerequisite courses not completed yet
+
+
+class BlockedCoursesPage(BaseModel):
+    """One page of prerequisite-blocked courses."""
+    total: int
+    offset: int
+    limit: int
+    blocked_courses: List[BlockedCourse] = []
+
+
+class SkillCoverCourse(BaseModel):
+    """Course picked for the skill cover, with the goal skills it adds."""
+    course_id: int
+    name: str
+    covers: List[SkillInfo] = []  # missing skills first covered by this course
+    q_smoothed: float  # review quality (tie-breaker)
+    credits: Optional[float] = None
+
+
+class SkillCoverResponse(BaseModel):
+    """Near-minimal set of courses covering a goal's missing technical skills."""
+    career_goal_id: int
+    missing_skills: List[SkillInfo] = []  # goal technical skills the student lacks
+    courses: List[SkillCoverCourse] = []  # in the order they were picked
+    uncovered_skills: List[SkillInfo] = []  # missing skills no eligible course teaches
+
+
+class LeaderboardEntry(BaseModel):
+    """Course and the number of students it is recommended to."""
+    course_id: int
+    name: Optional[str] = None
+    count: int  # students with this course in their top-k
+
+
+class LeaderboardResponse(BaseModel):
+    """Most recommended courses, overall or for one goal and/or faculty."""
+    career_goal_id: Optional[int] = None
+    faculty: Optional[str] = None
+    students: int  # students counted in this scope
+    courses: List[LeaderboardEntry] = []
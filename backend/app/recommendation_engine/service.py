@@ -3,13 +3,25 @@
 Implements the course recommendation algorithm based on:
 1. Role fit (career goal technical skills overlap)
 2. Affinity (similarity to completed courses using clusters + tech skills)
-3. Review quality (Bayesian smoothed scores)
+3. Review quality (Bayesian smoothed scores, optionally time-decayed)
 """
 
+import hashlib
+import heapq
+import threading
+import time
+import numpy as np
 from . import config
 from . import queries
-from typing import List, Dict, Any, Tuple, Set
+from . import snapshot
+from . import profiles
+from . import leaderboard
+from . import peers
+from . import review_stats
+from ..cache import LRUCache, etag_matches
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Set
 from sqlalchemy.orm import Session
+from .. import models
 
 
 def _compute_course_similarity(
@@ -19,6 +31,9 @@ def _compute_course_similarity(
     tech_skills_map: Dict[int, Set[int]],
 ) -> Tuple[float, bool, float]:
     """Compute similarity between two courses using clusters and technical skills.
+
+    Scalar reference for the similarity used by the engine; the catalog
+    snapshot precomputes both components for every course pair.
     
     Args:
         course_a_id, course_b_id: Course IDs to compare
@@ -53,55 +68,553 @@ def _compute_course_similarity(
     return similarity, bool(cluster_match), tech_overlap_score
 
 
-def recommend_courses(
+
+
+def _review_quality(
+    reviews: review_stats.ReviewStats,
+    candidate_idx: np.ndarray,
+    quality_mode: str,
+    now: float = None,
+) -> np.ndarray:
+    """Return the review quality component (q_smoothed) for the candidates.
+
+    'bayesian': q = (m*C + n*avg/10) / (m + n) over all reviews.
+    'decayed':  the same shrinkage, with n and avg taken from exponentially
+                time-decayed sums, so old reviews carry less evidence and
+                a course with only old reviews drifts back to the prior C.
+    """
+    C = (reviews.global_mean / 10.0) if reviews.global_mean is not None else 0.5
+    m = config.PRIOR_M
+
+    if quality_mode == 'decayed':
+        now = time.time() if now is None else now
+        d_sum = reviews.decayed_sum[candidate_idx]
+        d_weight = reviews.decayed_weight[candidate_idx]
+        elapsed = np.maximum(now - reviews.decayed_at[candidate_idx], 0.0)
+        # Bring the stored weight forward to now; sum/weight (the decayed
+        # average) is unchanged by the rescale.
+        n_reviews = d_weight * 0.5 ** (elapsed / (config.REVIEW_HALF_LIFE_DAYS * 86400.0))
+        q_raw = np.divide(d_sum, d_weight, out=np.full(len(candidate_idx), C * 10.0), where=d_weight > 0) / 10.0
+    elif quality_mode == 'bayesian':
+        n_reviews = reviews.review_count[candidate_idx]
+        avg_raw = reviews.review_avg[candidate_idx]
+        q_raw = np.where((n_reviews > 0) & ~np.isnan(avg_raw), avg_raw / 10.0, C)
+    else:
+        raise ValueError(f"Unknown quality mode: {quality_mode}")
+
+    return np.where(
+        m + n_reviews > 0, (m * C + n_reviews * q_raw) / np.maximum(m + n_reviews, 1e-12), C
+    )
+
+
+def _popularity(db: Session, snap: snapshot.CatalogSnapshot, candidate_idx: np.ndarray) -> np.ndarray:
+    """Return the popularity component in [0..1] for the candidates.
+
+    Blend of all-time and recent-window completions, each log-scaled against
+    the most completed course in the catalog.
+    """
+    total = np.zeros(snap.num_courses)
+    recent = np.zeros(snap.num_courses)
+    for course_id, (n_total, n_recent) in queries.get_course_popularity(db).items():
+        ci = snap.course_index.get(course_id)
+        if ci is not None:
+            total[ci] = n_total
+            recent[ci] = n_recent
+
+    def scaled(counts):
+        top = counts.max() if len(counts) else 0
+        return np.log1p(counts) / np.log1p(top) if top > 0 else np.zeros_like(counts)
+
+    t = config.POPULARITY_TREND_WEIGHT
+    return ((1 - t) * scaled(total) + t * scaled(recent))[candidate_idx]
+
+
+def _explain_course(
+    snap: snapshot.CatalogSnapshot,
+    reviews: review_stats.ReviewStats,
+    ci: int,
+    R_tech: Set[int],
+    completed_idx: List[int],
+    final_score: float,
+    s_role: float,
+    s_affinity: float,
+    q_smoothed: float,
+    s_popularity: float = None,
+    alpha: float = None,
+) -> Dict[str, Any]:
+    """Build the explained recommendation entry for catalog row ``ci``."""
+    alpha = config.ALPHA if alpha is None else alpha
+    # ===== EXPLAINABILITY: Matched and missing technical skills =====
+    matched_technical = []
+    missing_technical = []
+    for sid in R_tech:
+        j = snap.skill_index.get(sid)
+        relevance = float(snap.relevance[ci, j]) if j is not None else 0.0
+
+        if relevance > 0:
+            matched_technical.append({
+                'skill_id': sid,
+                'name': snap.skill_names.get(sid, ''),
+                'relevance_score': relevance,
+            })
+        else:
+            missing_technical.append({
+                'skill_id': sid,
+                'name': snap.skill_names.get(sid, ''),
+                'relevance_score': 0.0,
+            })
+
+    # ===== EXPLAINABILITY: Top contributing completed courses =====
+    affinity_details = []
+    if completed_idx:
+        cluster_row = snap.cluster_match[ci, completed_idx]
+        tech_row = snap.tech_overlap[ci, completed_idx]
+        sims = alpha * cluster_row + (1 - alpha) * tech_row
+        top_k = min(config.TOP_K_SIMILAR, len(completed_idx))
+        for pos in np.argsort(-sims, kind='stable')[:top_k]:
+            cj = completed_idx[pos]
+            affinity_details.append({
+                'completed_course_id': int(snap.course_ids[cj]),
+                'completed_course_name': snap.course_names[cj],
+                'similarity_score': float(sims[pos]),
+                'cluster_matched': bool(cluster_row[pos]),
+                'tech_overlap_score': float(tech_row[pos]),
+            })
+
+    # Raw average score
+    n_reviews = int(reviews.review_count[ci])
+    avg_raw = reviews.review_avg[ci]
+    avg_score_raw = float(avg_raw) if n_reviews and not np.isnan(avg_raw) else None
+
+    breakdown = {
+        's_role': s_role,
+        's_affinity': s_affinity,
+        'q_smoothed': q_smoothed,
+    }
+    if s_popularity is not None:
+        breakdown['s_popularity'] = s_popularity
+
+    return {
+        'course_id': int(snap.course_ids[ci]),
+        'name': snap.course_names[ci],
+        'final_score': final_score,
+        'breakdown': breakdown,
+        'avg_score_raw': avg_score_raw,
+        'review_count': n_reviews,
+        'matched_technical_skills': matched_technical,
+        'missing_technical_skills': missing_technical,
+        'affinity_explanation': {
+            'top_contributing_courses': affinity_details,
+        } if affinity_details else None,
+    }
+
+
+class _BlockedCourses:
+    """Candidates held back by missing prerequisites, closest to unlocking first.
+
+    Ordered by the number of missing prerequisites, then course id; entries
+    (with their missing prerequisite ids) are only built for the requested page.
+    """
+
+    def __init__(self, snap: snapshot.CatalogSnapshot, completed_mask: np.ndarray, blocked_idx: np.ndarray):
+        self.snap = snap
+        self.completed_mask = completed_mask
+        missing_counts = (snap.prereq_mask[blocked_idx] & ~completed_mask).sum(axis=1)
+        order = np.lexsort((snap.course_ids[blocked_idx], missing_counts))
+        self.rows = blocked_idx[order]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def page(self, offset: int = 0, limit: int = None) -> List[Dict[str, Any]]:
+        end = len(self.rows) if limit is None else offset + limit
+        snap = self.snap
+        return [
+            {
+                'course_id': int(snap.course_ids[ci]),
+                'course_name': snap.course_names[ci],
+                'missing_prereqs': [
+                    int(snap.course_ids[j]) for j in np.flatnonzero(snap.prereq_mask[ci] & ~self.completed_mask)
+                ],
+            }
+            for ci in self.rows[offset:end]
+        ]
+
+
+def _split_blocked(snap: snapshot.CatalogSnapshot, completed_mask: np.ndarray, candidate_idx: np.ndarray):
+    """Split candidates into (eligible, blocked) catalog rows by their prerequisites."""
+    if not len(candidate_idx):
+        return candidate_idx, candidate_idx
+    is_blocked = (snap.prereq_mask[candidate_idx] & ~completed_mask).any(axis=1)
+    return candidate_idx[~is_blocked], candidate_idx[is_blocked]
+
+
+class _Components:
+    """Unweighted score components for one (goal, completed courses, options) key.
+
+    s_role and q_smoothed do not depend on the weights. s_affinity depends on
+    alpha through the top-K selection, so the candidate x completed cluster and
+    tech-overlap blocks are kept and the affinity vector is memoised per alpha.
+    """
+
+    def __init__(self, snap, reviews, R_tech, completed_idx, candidate_idx, s_role, q_smoothed,
+                 cluster_sims, tech_sims, completed_mask, blocked_idx):
+        self.snap = snap
+        self.reviews = reviews
+        self.R_tech = R_tech
+        self.completed_idx = completed_idx
+        self.candidate_idx = candidate_idx
+        self.s_role = s_role
+        self.q_smoothed = q_smoothed
+        self.cluster_sims = cluster_sims
+        self.tech_sims = tech_sims
+        self.completed_mask = completed_mask
+        self.blocked_idx = blocked_idx
+        self._blocked = None
+        self._affinity = {}
+        self._lock = threading.Lock()
+
+    def affinity(self, alpha: float) -> np.ndarray:
+        """S_AFFINITY: mean of the top K similarities to completed courses."""
+        with self._lock:
+            s_affinity = self._affinity.get(alpha)
+            if s_affinity is None:
+                if self.cluster_sims is not None:
+                    sims = alpha * self.cluster_sims + (1 - alpha) * self.tech_sims
+                    top_k = min(config.TOP_K_SIMILAR, len(self.completed_idx))
+                    s_affinity = -np.sort(-sims, axis=1)[:, :top_k].mean(axis=1)
+                else:
+                    s_affinity = np.zeros(len(self.candidate_idx))
+                self._affinity[alpha] = s_affinity
+            return s_affinity
+
+    def blocked(self) -> _BlockedCourses:
+        """Blocked candidates, ordered on first use."""
+        with self._lock:
+            if self._blocked is None:
+                self._blocked = _BlockedCourses(self.snap, self.completed_mask, self.blocked_idx)
+            return self._blocked
+
+
+def _compute_components(
+    snap: snapshot.CatalogSnapshot,
+    reviews: review_stats.ReviewStats,
+    career_goal_id: int,
+    R_tech: Set[int],
+    completed_idx: List[int],
+    enforce_prereqs: bool,
+    quality_mode: str,
+) -> _Components:
+    """Filter the candidate courses and compute their unweighted components."""
+    # ===== CANDIDATE FILTERING =====
+    completed_mask = np.zeros(snap.num_courses, dtype=bool)
+    completed_mask[completed_idx] = True
+    candidate_idx = np.flatnonzero(~completed_mask)
+
+    blocked_idx = np.empty(0, dtype=candidate_idx.dtype)
+    if enforce_prereqs:
+        candidate_idx, blocked_idx = _split_blocked(snap, completed_mask, candidate_idx)
+
+    # ===== COMPUTE COMPONENTS FOR ALL CANDIDATES =====
+    # S_ROLE: mean relevance over the goal's technical skills (missing = 0)
+    goal_row = snap.goal_index.get(career_goal_id)
+    if goal_row is not None:
+        s_role = snap.role_fit[goal_row, candidate_idx]
+    elif R_tech:
+        cols = [snap.skill_index[sid] for sid in R_tech if sid in snap.skill_index]
+        s_role = snap.relevance[np.ix_(candidate_idx, cols)].sum(axis=1) / len(R_tech)
+    else:
+        s_role = np.zeros(len(candidate_idx))
+
+    # Pairwise similarity blocks for S_AFFINITY (blended per alpha later)
+    cluster_sims = tech_sims = None
+    if completed_idx and len(candidate_idx):
+        cluster_sims = snap.cluster_match[np.ix_(candidate_idx, completed_idx)].astype(float)
+        tech_sims = snap.tech_overlap[np.ix_(candidate_idx, completed_idx)]
+
+    # Q_SMOOTHED: Review quality with Bayesian smoothing (optionally time-decayed)
+    q_smoothed = _review_quality(reviews, candidate_idx, quality_mode)
+
+    return _Components(
+        snap, reviews, R_tech, completed_idx, candidate_idx, s_role, q_smoothed,
+        cluster_sims, tech_sims, completed_mask, blocked_idx,
+    )
+
+
+_components_cache = LRUCache(config.COMPONENT_CACHE_SIZE)
+
+
+def _components_key(reviews: review_stats.ReviewStats, career_goal_id: int, completed_idx: List[int],
+                    enforce_prereqs: bool, quality_mode: str):
+    """Cache key for the score components of a request.
+
+    The review version also names the snapshot generation. Decayed review
+    quality drifts with the clock; its entries are bucketed by
+    config.COLD_START_DECAYED_TTL seconds.
+    """
+    bucket = int(time.time() // config.COLD_START_DECAYED_TTL) if quality_mode == 'decayed' else None
+    return (reviews.version, career_goal_id, tuple(sorted(completed_idx)), enforce_prereqs, quality_mode, bucket)
+
+
+def _get_components(snap, reviews, career_goal_id, R_tech, completed_idx, enforce_prereqs,
+                    quality_mode) -> _Components:
+    key = _components_key(reviews, career_goal_id, completed_idx, enforce_prereqs, quality_mode)
+    return _components_cache.get_or_create(key, lambda: _compute_components(
+        snap, reviews, career_goal_id, R_tech, completed_idx, enforce_prereqs, quality_mode,
+    ))
+
+
+class _Ranking:
+    """Weighted, best-first ranking of a request's candidates.
+
+    Entries are explained on demand and memoised, so a cached ranking only
+    pays for the explanations that were actually served.
+    """
+
+    def __init__(self, components: _Components, profile: Dict[str, float], final_scores, s_popularity,
+                 memoise: bool = True):
+        self.memoise = memoise
+        self.components = components
+        self.snap = components.snap
+        self.alpha = profile['alpha']
+        self.candidate_idx = components.candidate_idx
+        self.s_affinity = components.affinity(self.alpha)
+        self.final_scores = final_scores
+        self.s_popularity = s_popularity
+        self.order = np.argsort(-final_scores, kind='stable')
+        self._explained = {}
+        self._lock = threading.Lock()
+
+    def _explain_at(self, rank: int) -> Dict[str, Any]:
+        c = self.components
+        pos = self.order[rank]
+        return _explain_course(
+            self.snap,
+            c.reviews,
+            self.candidate_idx[pos],
+            c.R_tech,
+            c.completed_idx,
+            float(self.final_scores[pos]),
+            float(c.s_role[pos]),
+            float(self.s_affinity[pos]),
+            float(c.q_smoothed[pos]),
+            float(self.s_popularity[pos]) if self.s_popularity is not None else None,
+            alpha=self.alpha,
+        )
+
+    def explain(self, rank: int) -> Dict[str, Any]:
+        """Return the explained entry at position ``rank`` of the ranking."""
+        if not self.memoise:
+            return self._explain_at(rank)
+        with self._lock:
+            entry = self._explained.get(rank)
+            if entry is None:
+                entry = self._explained[rank] = self._explain_at(rank)
+            return entry
+
+    def iter_ranks(self, ranks: List[int]) -> Iterator[Dict[str, Any]]:
+        """Yield the entries at ``ranks``, explaining each one as it is reached."""
+        for rank in ranks:
+            yield self.explain(rank)
+
+    def course_ids(self, n: int) -> List[int]:
+        """Ids of the n best-ranked courses (nothing is explained)."""
+        return [int(cid) for cid in self.snap.course_ids[self.candidate_idx[self.order[:n]]]]
+
+    def top_ranks(self, k: int) -> List[int]:
+        return list(range(min(k, len(self.order))))
+
+    def budget_ranks(self, k: int, budget_credits: float = None, budget_workload: float = None) -> List[int]:
+        """Ranks of the best-scoring subset of the top candidates within the budgets.
+
+        Runs ``_budget_knapsack`` over the first config.KNAPSACK_TOP_N ranks.
+        Courses with unknown credits (workload) are left out when a credit
+        (workload) budget is set.
+        """
+        ranks = np.arange(min(config.KNAPSACK_TOP_N, len(self.order)))
+        rows = self.candidate_idx[self.order[ranks]]
+        weights = []
+        for budget, values, scale in (
+            (budget_credits, self.snap.credits, config.KNAPSACK_CREDIT_UNITS),
+            (budget_workload, self.snap.workload, 1),
+        ):
+            if budget is None:
+                continue
+            item_weights = values[rows]
+            known = ~np.isnan(item_weights)
+            ranks, rows, item_weights = ranks[known], rows[known], item_weights[known]
+            weights = [(w[known], cap) for w, cap in weights]
+            weights.append((np.ceil(item_weights * scale - 1e-9).astype(np.int64), int(np.floor(budget * scale + 1e-9))))
+        picked = _budget_knapsack(self.final_scores[self.order[ranks]], weights, k)
+        return [int(ranks[i]) for i in picked]
+
+
+def _rank_candidates(
+    db: Session,
+    components: _Components,
+    profile: Dict[str, float],
+    popularity_weight: float,
+    memoise: bool = True,
+) -> _Ranking:
+    """Weight the cached components with ``profile`` and rank the candidates."""
+    # Summed term by term (not as a matrix product) so exact ties keep the
+    # same floating-point order as before
+    final_scores = (
+        (profile['w1'] * components.s_role)
+        + (profile['w2'] * components.affinity(profile['alpha']))
+        + (profile['w5'] * components.q_smoothed)
+    )
+
+    s_popularity = None
+    if popularity_weight > 0:
+        s_popularity = _popularity(db, components.snap, components.candidate_idx)
+        final_scores = (1 - popularity_weight) * final_scores + popularity_weight * s_popularity
+
+    return _Ranking(components, profile, final_scores, s_popularity, memoise=memoise)
+
+
+def _budget_knapsack(values: np.ndarray, weights: List[Tuple[np.ndarray, int]], k: int) -> List[int]:
+    """0/1 knapsack: positions of the highest-value subset of at most k items.
+
+    ``weights`` holds one (integer item weights, capacity) pair per budget.
+    Bounded DP over (items taken, used capacity per budget): each item is one
+    vectorised NumPy max over the whole table, and the take decisions are kept
+    for backtracking. Capacities are clamped to what k items could use. When
+    the table would exceed config.KNAPSACK_MAX_CELLS, ``_budget_greedy`` fills
+    the budgets instead.
+    """
+    n = len(values)
+    k = min(k, n)
+    if k <= 0:
+        return []
+
+    dims = []
+    for w, cap in weights:
+        usable = int(np.sort(w)[::-1][:k].sum())
+        dims.append(max(min(cap, usable), 0) + 1)
+    if n * (k + 1) * int(np.prod(dims)) > config.KNAPSACK_MAX_CELLS:
+        return _budget_greedy(n, weights, k)
+
+    dp = np.zeros((k + 1, *dims))
+    keep = np.zeros((n, k + 1, *dims), dtype=bool)
+    for i in range(n):
+        wi = [int(w[i]) for w, _ in weights]
+        if any(x >= d for x, d in zip(wi, dims)):
+            continue  # does not fit even on its own
+        dst = (slice(1, None), *(slice(x, None) for x in wi))
+        src = (slice(None, -1), *(slice(0, d - x) for x, d in zip(wi, dims)))
+        candidate = dp[src] + values[i]
+        better = candidate > dp[dst]
+        dp[dst] = np.where(better, candidate, dp[dst])
+        keep[i][dst] = better
+
+    state = [k, *(d - 1 for d in dims)]
+    chosen = []
+    for i in range(n - 1, -1, -1):
+        if keep[(i, *state)]:
+            chosen.append(i)
+            state[0] -= 1
+            for j, (w, _) in enumerate(weights):
+                state[j + 1] -= int(w[i])
+    return sorted(chosen)
+
+
+def _budget_greedy(n: int, weights: List[Tuple[np.ndarray, int]], k: int) -> List[int]:
+    """Positions of the first (best-ranked) of n items that still fit, up to k."""
+    remaining = [cap for _, cap in weights]
+    chosen = []
+    for i in range(n):
+        if len(chosen) == k:
+            break
+        wi = [int(w[i]) for w, _ in weights]
+        if all(x <= r for x, r in zip(wi, remaining)):
+            chosen.append(i)
+            remaining = [r - x for x, r in zip(wi, remaining)]
+    return chosen
+
+
+def _select_ranks(ranking: _Ranking, k: int, budget_credits: float = None, budget_workload: float = None):
+    """Return (ranks to serve, budget_used) for the request."""
+    if budget_credits is None and budget_workload is None:
+        return ranking.top_ranks(k), None
+
+    ranks = ranking.budget_ranks(k, budget_credits, budget_workload)
+    rows = ranking.candidate_idx[ranking.order[ranks]]
+    budget_used = {
+        'credits': float(np.nansum(ranking.snap.credits[rows])),
+        'workload': float(np.nansum(ranking.snap.workload[rows])),
+    }
+    return ranks, budget_used
+
+
+def _record_leaderboard(db: Session, student, career_goal_id: int, ranking: Optional[_Ranking]):
+    course_ids = ranking.course_ids(config.LEADERBOARD_TOP_K) if ranking is not None else []
+    leaderboard.record(db, student.id, career_goal_id, student.faculty, course_ids)
+    db.commit()
+
+
+# Cold-start rankings (students with no completed courses) depend only on the
+# goal, the catalog and the request options, so they are shared by every such
+# student until the snapshot generation or the reviews change.
+_cold_start_cache = LRUCache(config.COLD_START_CACHE_SIZE)
+
+
+def _cold_start_key(reviews: review_stats.ReviewStats, career_goal_id: int, enforce_prereqs: bool,
+                    quality_mode: str, popularity_weight: float, profile: Dict[str, float]):
+    """Cache key for a cold-start ranking, or None when it must not be cached.
+
+    The popularity term moves with every enrollment, so rankings that use it
+    are never cached. The profile's values (not its name) are part of the key,
+    so reloading a profile takes effect immediately.
+    """
+    if popularity_weight > 0:
+        return None
+    return (
+        _components_key(reviews, career_goal_id, [], enforce_prereqs, quality_mode),
+        tuple(profile[key] for key in profiles.PROFILE_KEYS),
+    )
+
+
+def clear_caches():
+    """Drop every cached ranking and component set."""
+    _cold_start_cache.clear()
+    _components_cache.clear()
+    _student_response_cache.clear()
+
+
+def _prepare_ranking(
     db: Session,
     student_id: int,
     career_goal_id: int,
-    k: int = 10,
     enforce_prereqs: bool = True,
-) -> Dict[str, Any]:
-    """Generate top-K course recommendations for a student based on career goal.
-    
-    Algorithm:
-    1. Filter candidate courses (exclude completed, optionally enforce prereqs)
-    2. Compute S_role: technical fit with career goal
-    3. Compute S_affinity: similarity to completed courses (clusters + tech overlap)
-    4. Compute soft_readiness: human skills overlap with goal
-    5. Apply blocker: if R_human > 0 and overlap == 0, return empty
-    6. Compute review quality with Bayesian smoothing
-    7. Final score = w1*S_role + w2*S_affinity + w5*q_smoothed
-    8. Return top K with full explainability
-    
-    Args:
-        db: Database session
-        student_id: Student ID
-        career_goal_id: Career goal ID to recommend for
-        k: Number of recommendations to return (default 10)
-        enforce_prereqs: Whether to enforce prerequisites (default True)
-    
-    Returns:
-        Dict with recommendations, soft_readiness, blocked_reason if applicable
+    quality_mode: str = None,
+    popularity_weight: float = None,
+    weight_profile: str = None,
+    blocked_limit: int = None,
+    memoise: bool = True,
+) -> Tuple[Dict[str, Any], Optional[_Ranking], Any]:
+    """Return the response header (readiness, blocked courses), the ranking and the student.
+
+    The ranking is None when the student is blocked by the human-skill check.
+    All database reads happen here; explaining the ranking's entries only
+    touches the snapshot. ``memoise=False`` keeps explained entries out of
+    uncached rankings, so streaming them needs no memory proportional to k.
     """
+    quality_mode = quality_mode or config.QUALITY_MODE
+    popularity_weight = config.W_POP if popularity_weight is None else popularity_weight
+    if quality_mode not in config.QUALITY_MODES:
+        raise ValueError(f"Unknown quality mode: {quality_mode}")
+    weight_profile = weight_profile or config.WEIGHT_PROFILE
+    profile = profiles.get_profile(weight_profile)
+    blocked_limit = config.BLOCKED_COURSES_LIMIT if blocked_limit is None else blocked_limit
+
     # ===== BULK FETCH =====
     student = queries.get_student(db, student_id)
     if not student:
         raise ValueError("Student not found")
 
-    all_courses = queries.get_all_courses(db)
-    all_skills = queries.get_all_skills(db)
-    
-    # Maps for efficient lookup
-    skill_map = {s.id: s.name for s in all_skills}
-    skill_by_type = {'technical': set(), 'human': set()}
-    for s in all_skills:
-        if s.type in skill_by_type:
-            skill_by_type[s.type].add(s.id)
-
-    course_clusters_map = queries.get_course_clusters_map(db)
-    course_tech_skills_map = queries.get_course_technical_skills_map(db)
-    course_skills_rows = queries.get_all_course_skills(db)
-    review_stats, global_mean = queries.get_course_review_stats(db)
-    prereq_map = queries.get_course_prereqs(db)
+    snap = snapshot.get_snapshot(db)
+    reviews = review_stats.get(db, snap)
 
     # Student state
     student_completed_ids = queries.get_student_completed_course_ids(db, student_id)
@@ -123,8 +636,8 @@ def recommend_courses(
         missing_human_ids = R_human - student_human_skills
         soft_readiness = len(overlap_human_ids) / len(R_human) if R_human else 1.0
         
-        overlap_human = [{'skill_id': sid, 'name': skill_map.get(sid, '')} for sid in overlap_human_ids]
-        missing_human = [{'skill_id': sid, 'name': skill_map.get(sid, '')} for sid in missing_human_ids]
+        overlap_human = [{'skill_id': sid, 'name': snap.skill_names.get(sid, '')} for sid in overlap_human_ids]
+        missing_human = [{'skill_id': sid, 'name': snap.skill_names.get(sid, '')} for sid in missing_human_ids]
         
         # BLOCKER: If student has 0 overlap with required human skills
         if soft_readiness == 0:
@@ -133,157 +646,445 @@ def recommend_courses(
                 'soft_readiness': soft_readiness,
                 'overlap_human_skills': overlap_human,
                 'missing_human_skills': missing_human,
-                'recommendations': [],
                 'blocked_reason': blocked_reason,
                 'blocked_courses': [] if enforce_prereqs else None,
-            }
+                'blocked_total': None,
+                'weight_profile': weight_profile,
+            }, None, student
 
-    # ===== CANDIDATE FILTERING =====
-    candidate_courses = [c for c in all_courses if c.id not in student_completed_ids]
+    completed_idx = [snap.course_index[cid] for cid in student_completed_ids if cid in snap.course_index]
+
+    # Students without history share one ranking per goal; only the
+    # readiness fields above are specific to them.
+    key = None
+    if not student_completed_ids:
+        key = _cold_start_key(reviews, career_goal_id, enforce_prereqs, quality_mode, popularity_weight, profile)
 
-    blocked_courses = []
+    def rank():
+        components = _get_components(
+            snap, reviews, career_goal_id, R_tech, completed_idx, enforce_prereqs, quality_mode,
+        )
+        # Shared cold-start rankings always keep their explanations
+        return _rank_candidates(db, components, profile, popularity_weight, memoise=memoise or key is not None)
+
+    ranking = _cold_start_cache.get_or_create(key, rank) if key is not None else rank()
+
+    # Blocked courses are only ordered and explained if some are asked for
+    blocked_courses = blocked_total = None
     if enforce_prereqs:
-        filtered = []
-        for c in candidate_courses:
-            reqs = prereq_map.get(c.id, set())
-            missing = [r for r in reqs if r not in student_completed_ids]
-            if missing:
-                blocked_courses.append({
-                    'course_id': c.id,
-                    'course_name': c.name,
-                    'missing_prereqs': missing,
-                })
-            else:
-                filtered.append(c)
-        candidate_courses = filtered
-
-    # ===== COMPUTE SCORES FOR EACH CANDIDATE =====
-    results = []
-
-    # Normalize review quality baseline
-    C = (global_mean / 10.0) if global_mean is not None else 0.5
-
-    # Build course_skills lookup map for efficiency
-    course_skills_lookup = {}
-    for course_id, skill_id, relevance in course_skills_rows:
-        if course_id not in course_skills_lookup:
-            course_skills_lookup[course_id] = {}
-        course_skills_lookup[course_id][skill_id] = float(relevance) if relevance is not None else 0.0
-
-    for c in candidate_courses:
-        # ===== S_ROLE: Technical fit with career goal =====
-        if not R_tech:
-            s_role = 0.0
-        else:
-            scores = []
-            for sid in R_tech:
-                # Find relevance_score in course_skills for this skill
-                relevance = course_skills_lookup.get(c.id, {}).get(sid, 0.0)
-                scores.append(relevance)
-            s_role = float(sum(scores) / len(scores)) if scores else 0.0
-
-        # ===== S_AFFINITY: Course-to-course similarity =====
-        if not student_completed_ids:
-            s_affinity = 0.0
-            affinity_details = []
-        else:
-            # Compute similarity to each completed course
-            sims = []
-            affinity_details_raw = []
-            for completed_id in student_completed_ids:
-                completed_course = next((co for co in all_courses if co.id == completed_id), None)
-                if not completed_course:
-                    continue
-                
-                sim, cluster_match, tech_overlap = _compute_course_similarity(
-                    c.id, completed_id, course_clusters_map, course_tech_skills_map
-                )
-                sims.append((sim, completed_id, completed_course.name, cluster_match, tech_overlap))
-
-            # Top K similarities
-            if sims:
-                sims_sorted = sorted(sims, key=lambda x: x[0], reverse=True)
-                top_k = min(config.TOP_K_SIMILAR, len(sims_sorted))
-                s_affinity = float(sum(s[0] for s in sims_sorted[:top_k]) / top_k)
-                
-                affinity_details = [
-                    {
-                        'completed_course_id': s[1],
-                        'completed_course_name': s[2],
-                        'similarity_score': s[0],
-                        'cluster_matched': s[3],
-                        'tech_overlap_score': s[4],
-                    }
-                    for s in sims_sorted[:top_k]
-                ]
-            else:
-                s_affinity = 0.0
-                affinity_details = []
-
-        # ===== Q_SMOOTHED: Review quality with Bayesian smoothing =====
-        stats = review_stats.get(c.id)
-        if stats:
-            n_reviews = stats['n']
-            avg_raw = stats['avg']
-            q_raw = (avg_raw / 10.0) if avg_raw is not None else C
-        else:
-            n_reviews = 0
-            q_raw = C
-
-        m = config.PRIOR_M
-        q_smoothed = float((m * C + n_reviews * q_raw) / (m + n_reviews)) if (m + n_reviews) > 0 else C
-
-        # ===== FINAL SCORE =====
-        final_score = (config.W1 * s_role) + (config.W2 * s_affinity) + (config.W5 * q_smoothed)
-
-        # ===== EXPLAINABILITY: Matched and missing technical skills =====
-        matched_technical = []
-        missing_technical = []
-        for sid in R_tech:
-            relevance = course_skills_lookup.get(c.id, {}).get(sid, 0.0)
-            
-            if relevance > 0:
-                matched_technical.append({
-                    'skill_id': sid,
-                    'name': skill_map.get(sid, ''),
-                    'relevance_score': relevance,
-                })
-            else:
-                missing_technical.append({
-                    'skill_id': sid,
-                    'name': skill_map.get(sid, ''),
-                    'relevance_score': 0.0,
-                })
-
-        # Raw average score
-        avg_score_raw = stats['avg'] if stats and stats.get('avg') is not None else None
-
-        results.append({
-            'course_id': c.id,
-            'name': c.name,
-            'final_score': final_score,
-            'breakdown': {
-                's_role': s_role,
-                's_affinity': s_affinity,
-                'q_smoothed': q_smoothed,
-            },
-            'avg_score_raw': float(avg_score_raw) if avg_score_raw is not None else None,
-            'review_count': n_reviews,
-            'matched_technical_skills': matched_technical,
-            'missing_technical_skills': missing_technical,
-            'affinity_explanation': {
-                'top_contributing_courses': affinity_details,
-            } if affinity_details else None,
-        })
-
-    # ===== SORT & RETURN TOP K =====
-    sorted_results = sorted(results, key=lambda x: x['final_score'], reverse=True)[:k]
+        blocked_total = len(ranking.components.blocked_idx)
+        blocked_courses = ranking.components.blocked().page(0, blocked_limit) if blocked_limit > 0 else []
 
     return {
         'soft_readiness': soft_readiness,
         'overlap_human_skills': overlap_human,
         'missing_human_skills': missing_human,
-        'recommendations': sorted_results,
         'blocked_reason': None,
-        'blocked_courses': blocked_courses if enforce_prereqs else None,
+        'blocked_courses': blocked_courses,
+        'blocked_total': blocked_total,
+        'weight_profile': weight_profile,
+    }, ranking, student
+
+
+def recommend_courses(
+    db: Session,
+    student_id: int,
+    career_goal_id: int,
+    k: int = 10,
+    enforce_prereqs: bool = True,
+    quality_mode: str = None,
+    popularity_weight: float = None,
+    weight_profile: str = None,
+    blocked_limit: int = None,
+    budget_credits: float = None,
+    budget_workload: float = None,
+    record: bool = False,
+) -> Dict[str, Any]:
+    """Generate top-K course recommendations for a student based on career goal.
+    
+    Algorithm:
+    1. Filter candidate courses (exclude completed, optionally enforce prereqs)
+    2. Compute S_role: technical fit with career goal
+    3. Compute S_affinity: similarity to completed courses (clusters + tech overlap)
+    4. Compute soft_readiness: human skills overlap with goal
+    5. Apply blocker: if R_human > 0 and overlap == 0, return empty
+    6. Compute review quality with Bayesian smoothing (or its time-decayed variant)
+    7. Final score = w1*S_role + w2*S_affinity + w5*q_smoothed (weights and
+       alpha from the selected weight profile),
+       optionally blended with popularity: (1-w_pop)*score + w_pop*S_popularity
+    8. Return top K with full explainability, or, with a credit/workload
+       budget, the best-scoring subset of at most K of the top
+       config.KNAPSACK_TOP_N candidates that fits it
+
+    Catalog data comes from the memory-mapped snapshot (see ``snapshot``);
+    only the student's state and the goal's skills are read from the
+    database. Scores are computed for all candidates at once with NumPy and
+    only the returned top K are explained. The unweighted components are
+    cached per request key, so another weight profile only re-weights them;
+    students with no completed courses get the goal's cached cold-start
+    ranking.
+    
+    Args:
+        db: Database session
+        student_id: Student ID
+        career_goal_id: Career goal ID to recommend for
+        k: Number of recommendations to return (default 10)
+        enforce_prereqs: Whether to enforce prerequisites (default True)
+        quality_mode: 'bayesian' or 'decayed' (default config.QUALITY_MODE)
+        popularity_weight: share of the popularity term in [0..1] (default config.W_POP)
+        weight_profile: name of the weight profile (default config.WEIGHT_PROFILE)
+        blocked_limit: max blocked courses returned, fewest missing prereqs
+            first; 0 skips them (default config.BLOCKED_COURSES_LIMIT)
+        budget_credits: max total Course.credits of the recommendations
+        budget_workload: max total Course.workload (hours per week)
+        record: store the student's top config.LEADERBOARD_TOP_K in the
+            leaderboard; only for the student's own goal with default options
+    
+    Returns:
+        Dict with recommendations, soft_readiness, blocked_reason if applicable
+    """
+    header, ranking, student = _prepare_ranking(
+        db, student_id, career_goal_id, enforce_prereqs, quality_mode, popularity_weight, weight_profile,
+        blocked_limit,
+    )
+    if record:
+        _record_leaderboard(db, student, career_goal_id, ranking)
+    if ranking is None:
+        header['recommendations'] = []
+        return header
+    ranks, header['budget_used'] = _select_ranks(ranking, k, budget_credits, budget_workload)
+    header['recommendations'] = list(ranking.iter_ranks(ranks))
+    return header
+
+
+def stream_recommendations(
+    db: Session,
+    student_id: int,
+    career_goal_id: int,
+    k: int = 10,
+    enforce_prereqs: bool = True,
+    quality_mode: str = None,
+    popularity_weight: float = None,
+    weight_profile: str = None,
+    blocked_limit: int = None,
+    budget_credits: float = None,
+    budget_workload: float = None,
+    record: bool = False,
+) -> Tuple[Dict[str, Any], Iterator[Dict[str, Any]]]:
+    """Streaming variant of ``recommend_courses``.
+
+    Returns the response fields other than 'recommendations' together with an
+    iterator that explains the top K one at a time. The iterator does not use
+    ``db``, so it can be consumed after the session is closed.
+    """
+    header, ranking, student = _prepare_ranking(
+        db, student_id, career_goal_id, enforce_prereqs, quality_mode, popularity_weight, weight_profile,
+        blocked_limit, memoise=False,
+    )
+    if record:
+        _record_leaderboard(db, student, career_goal_id, ranking)
+    if ranking is None:
+        return header, iter(())
+    ranks, header['budget_used'] = _select_ranks(ranking, k, budget_credits, budget_workload)
+    return header, ranking.iter_ranks(ranks)
+
+
+def get_blocked_courses(db: Session, student_id: int, offset: int = 0, limit: int = None) -> Dict[str, Any]:
+    """Page through the courses a student cannot take yet for missing prerequisites.
+
+    Ordered by the number of missing prerequisites (closest to unlocking
+    first), then course id. Independent of the career goal.
+    """
+    limit = config.BLOCKED_COURSES_LIMIT if limit is None else limit
+    student = queries.get_student(db, student_id)
+    if not student:
+        raise ValueError("Student not found")
+
+    snap = snapshot.get_snapshot(db)
+    completed_ids = queries.get_student_completed_course_ids(db, student_id)
+    completed_mask = np.zeros(snap.num_courses, dtype=bool)
+    completed_mask[[snap.course_index[cid] for cid in completed_ids if cid in snap.course_index]] = True
+
+    _, blocked_idx = _split_blocked(snap, completed_mask, np.flatnonzero(~completed_mask))
+    blocked = _BlockedCourses(snap, completed_mask, blocked_idx)
+    return {
+        'total': len(blocked),
+        'offset': offset,
+        'limit': limit,
+        'blocked_courses': blocked.page(offset, limit),
+    }
+
+
+def _greedy_cover(masks: List[int], costs: np.ndarray, quality: np.ndarray, course_ids: np.ndarray,
+                  target: int) -> Tuple[List[Tuple[int, int]], int]:
+    """Greedy weighted set cover over bitmask skill sets.
+
+    Repeatedly picks the course with the most newly covered skills per unit of
+    cost, ties going to higher review quality, then lower course id. Gains
+    only shrink as skills get covered, so stale heap entries are re-scored
+    lazily instead of rescanning every course each round.
+
+    Returns ([(position, newly covered mask), ...] in pick order, uncovered mask).
+    """
+    heap = []
+    for pos, mask in enumerate(masks):
+        gain = (mask & target).bit_count()
+        if gain:
+            heap.append((-gain / costs[pos], -quality[pos], int(course_ids[pos]), pos))
+    heapq.heapify(heap)
+
+    chosen = []
+    uncovered = target
+    while uncovered and heap:
+        _, neg_q, course_id, pos = heapq.heappop(heap)
+        gain = (masks[pos] & uncovered).bit_count()
+        if not gain:
+            continue
+        entry = (-gain / costs[pos], neg_q, course_id, pos)
+        if heap and entry > heap[0]:
+            heapq.heappush(heap, entry)
+            continue
+        chosen.append((pos, masks[pos] & uncovered))
+        uncovered &= ~masks[pos]
+    return chosen, uncovered
+
+
+def recommend_skill_cover(
+    db: Session,
+    student_id: int,
+    career_goal_id: int,
+    enforce_prereqs: bool = True,
+    cost: str = 'courses',
+) -> Dict[str, Any]:
+    """Near-minimal set of eligible courses covering the goal's missing technical skills.
+
+    A goal skill counts as acquired when a completed course teaches it
+    (relevance > 0). Candidates are the courses the student can take now;
+    each covers the missing skills it teaches. The cover is built greedily
+    (see ``_greedy_cover``), minimising the number of courses or, with
+    ``cost='credits'``, the total credits (courses without credits count as 1).
+
+    Returns:
+        Dict with missing_skills, courses (in pick order, with the skills each
+        one adds) and uncovered_skills no eligible course teaches.
+    """
+    if cost not in ('courses', 'credits'):
+        raise ValueError(f"Unknown cost: {cost}")
+
+    student = queries.get_student(db, student_id)
+    if not student:
+        raise ValueError("Student not found")
+
+    snap = snapshot.get_snapshot(db)
+    completed_ids = queries.get_student_completed_course_ids(db, student_id)
+    tech_ids, _ = queries.get_career_goal_skills(db, career_goal_id)
+
+    masks = snap.skill_masks()
+    completed_idx = [snap.course_index[cid] for cid in completed_ids if cid in snap.course_index]
+    acquired = 0
+    for ci in completed_idx:
+        acquired |= masks[ci]
+
+    # Missing goal skills as a bitmask over the snapshot's skill columns
+    missing_ids = []
+    target = 0
+    for sid in sorted(set(tech_ids)):
+        j = snap.skill_index.get(sid)
+        if j is None:
+            missing_ids.append(sid)
+        elif not acquired >> j & 1:
+            missing_ids.append(sid)
+            target |= 1 << j
+
+    completed_mask = np.zeros(snap.num_courses, dtype=bool)
+    completed_mask[completed_idx] = True
+    candidate_idx = np.flatnonzero(~completed_mask)
+    if enforce_prereqs:
+        candidate_idx, _ = _split_blocked(snap, completed_mask, candidate_idx)
+
+    if cost == 'credits':
+        credits = snap.credits[candidate_idx]
+        costs = np.where(np.isnan(credits) | (credits <= 0), 1.0, credits)
+    else:
+        costs = np.ones(len(candidate_idx))
+    quality = _review_quality(review_stats.get(db, snap), candidate_idx, 'bayesian')
+
+    chosen, uncovered = _greedy_cover(
+        [masks[ci] for ci in candidate_idx], costs, quality, snap.course_ids[candidate_idx], target,
+    )
+
+    def skills_in(mask):
+        return [
+            {'skill_id': int(snap.skill_ids[j]), 'name': snap.skill_names.get(int(snap.skill_ids[j]), '')}
+            for j in range(mask.bit_length()) if mask >> j & 1
+        ]
+
+    unknown = [sid for sid in missing_ids if sid not in snap.skill_index]
+    return {
+        'career_goal_id': career_goal_id,
+        'missing_skills': [{'skill_id': sid, 'name': snap.skill_names.get(sid, '')} for sid in missing_ids],
+        'courses': [
+            {
+                'course_id': int(snap.course_ids[candidate_idx[pos]]),
+                'name': snap.course_names[candidate_idx[pos]],
+                'covers': skills_in(added),
+                'q_smoothed': float(quality[pos]),
+                'credits': None if np.isnan(snap.credits[candidate_idx[pos]]) else float(snap.credits[candidate_idx[pos]]),
+            }
+            for pos, added in chosen
+        ],
+        'uncovered_skills': skills_in(uncovered) + [{'skill_id': sid, 'name': ''} for sid in unknown],
     }
+
+
+def refresh_student_recommendations(db: Session, student_id: int, k: int = 10) -> Optional[Dict[str, Any]]:
+    """Recompute a student's recommendations for their own career goal.
+
+    Uses the default options and records the result in the leaderboard;
+    students without a career goal are removed from it. The top k are stored
+    as the student's /students/me/recommendations response. Returns the
+    recommendations, or None if the student has no goal.
+    """
+    student = queries.get_student(db, student_id)
+    if not student:
+        raise ValueError("Student not found")
+    if student.career_goal_id is None:
+        leaderboard.forget(db, student_id)
+        db.commit()
+        return None
+    if k == 0:
+        return recommend_courses(db, student_id, student.career_goal_id, k=0, record=True)
+    return get_student_recommendations(db, student_id, student.career_goal_id, limit=k)[1]
+
+
+# Own-goal, default-option responses per student, keyed by everything they
+# are computed from, so a profile or catalog change simply misses
+_student_response_cache = LRUCache(config.STUDENT_RESPONSE_CACHE_SIZE)
+
+
+def _student_state_key(db: Session, student_id: int, career_goal_id: int, limit: int):
+    reviews = review_stats.get(db, snapshot.get_snapshot(db))
+    profile = profiles.get_profile(config.WEIGHT_PROFILE)
+    return (
+        student_id,
+        limit,
+        _components_key(
+            reviews, career_goal_id, queries.get_student_completed_course_ids(db, student_id), True, config.QUALITY_MODE,
+        ),
+        tuple(sorted(queries.get_student_human_skills(db, student_id))),
+        tuple(profile[key] for key in profiles.PROFILE_KEYS),
+    )
+
+
+def get_student_recommendations(
+    db: Session,
+    student_id: int,
+    career_goal_id: int,
+    limit: int = 10,
+    if_none_match: Optional[str] = None,
+) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """Cache-first recommendations for the student's own goal with default options.
+
+    Returns (etag, response). The ETag is a digest of the snapshot
+    generation and review version, the student's completed courses and human skills, the goal,
+    the default weight profile and ``limit``; finding it takes a few indexed
+    reads and no ranking. ``response`` is None when ``if_none_match`` already
+    names the ETag. With a popularity weight configured the response changes
+    with every enrollment, so it is neither cached nor tagged.
+    """
+    if config.W_POP > 0:
+        return None, recommend_courses(db, student_id, career_goal_id, k=limit, record=True)
+
+    key = _student_state_key(db, student_id, career_goal_id, limit)
+    etag = '"' + hashlib.sha1(repr(key).encode()).hexdigest() + '"'
+    if etag_matches(if_none_match, etag):
+        return etag, None
+    response = _student_response_cache.get_or_create(
+        key, lambda: recommend_courses(db, student_id, career_goal_id, k=limit, record=True),
+    )
+    return etag, response
+
+
+def rebuild_leaderboard(db: Session) -> int:
+    """Recompute every student with a career goal into the leaderboard; returns the count.
+
+    Students are re-recorded one by one, so readers never see an empty board;
+    rows of students without a goal (or deleted) are dropped at the end.
+    """
+    student_ids = [
+        sid for (sid,) in db.query(models.Student.id).filter(models.Student.career_goal_id.isnot(None))
+    ]
+    for student_id in student_ids:
+        refresh_student_recommendations(db, student_id, k=0)
+    leaderboard.keep_only(db, student_ids)
+    db.commit()
+    return len(student_ids)
+
+
+def get_similar_courses(db: Session, course_id: int, n: int = 5) -> Optional[List[Dict[str, Any]]]:
+    """Return the n courses most similar to ``course_id`` (None if it is unknown).
+
+    Read from the neighbour lists precomputed with the catalog snapshot, so
+    the cost does not depend on the catalog size.
+    """
+    snap = snapshot.get_snapshot(db)
+    ci = snap.course_index.get(course_id)
+    if ci is None:
+        return None
+    return [
+        {
+            'course_id': int(snap.course_ids[cj]),
+            'name': snap.course_names[cj],
+            'similarity': float(score),
+        }
+        for cj, score in zip(snap.neighbours[ci, :n], snap.neighbour_scores[ci, :n])
+        if cj >= 0
+    ]
+
+
+def get_peers(db: Session, student_id: int, limit: int = 10) -> List[Dict[str, Any]]:
+    """Return the students most similar to ``student_id`` and the courses they took next.
+
+    Candidates come from the LSH index in peers.py; for each peer, up to
+    PEER_NEXT_COURSES completed courses the student has not taken are listed
+    in the order the peer completed them.
+    """
+    matches = peers.query(db, student_id, limit)
+    if not matches:
+        return []
+    peer_ids = [sid for sid, _ in matches]
+    students = {
+        s.id: s for s in db.query(models.Student.id, models.Student.name, models.Student.faculty)
+        .filter(models.Student.id.in_(peer_ids))
+    }
+    taken = set(queries.get_student_completed_course_ids(db, student_id))
+    completed = db.query(models.StudentCourse.student_id, models.StudentCourse.course_id).filter(
+        models.StudentCourse.student_id.in_(peer_ids),
+        models.StudentCourse.status == 'completed',
+    ).order_by(models.StudentCourse.created_at, models.StudentCourse.course_id)
+    shared: Dict[int, int] = {sid: 0 for sid in peer_ids}
+    next_ids: Dict[int, List[int]] = {sid: [] for sid in peer_ids}
+    for sid, course_id in completed:
+        if course_id in taken:
+            shared[sid] += 1
+        elif len(next_ids[sid]) < config.PEER_NEXT_COURSES:
+            next_ids[sid].append(course_id)
+
+    snap = snapshot.get_snapshot(db)
+
+    def course(course_id):
+        ci = snap.course_index.get(course_id)
+        return {'course_id': course_id, 'name': snap.course_names[ci] if ci is not None else None}
+
+    return [
+        {
+            'student_id': sid,
+            'name': students[sid].name,
+            'faculty': students[sid].faculty,
+            'similarity': similarity,
+            'shared_courses': shared[sid],
+            'next_courses': [course(c) for c in next_ids[sid]],
+        }
+        for sid, similarity in matches
+        if sid in students
+    ]
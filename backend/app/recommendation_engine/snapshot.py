@@ -0,0 +1,466 @@
+"""Versioned, memory-mapped catalog snapshot for the recommendation engine.
+
+The catalog side of the recommendation input (course skills, clusters and
+prerequisites) changes rarely compared to how often it is read, so it is
+exported to a directory of NumPy ``.npy`` files:
+
+    <SNAPSHOT_DIR>/
+        GENERATION              number of the current generation
+        DIRTY                   present when the catalog changed since the last build
+        gen-000001/
+            meta.json           id map: course/skill/goal ids and names
+            course_ids.npy      int64   [C]     sorted course ids (row/column order)
+            skill_ids.npy       int64   [S]     sorted skill ids (column order)
+            relevance.npy       float64 [C, S]  course_skills.relevance_score (0 if unset)
+            cluster_match.npy   bool    [C, C]  courses share at least one cluster
+            tech_overlap.npy    float64 [C, C]  Jaccard overlap of technical skills
+            prereq_mask.npy     bool    [C, C]  row course requires column course
+            role_fit.npy        float64 [G, C]  S_role of every course for every career goal
+            credits.npy         float64 [C]     courses.credits (NaN if unset)
+            workload.npy        float64 [C]     courses.workload, hours per week (NaN if unset)
+            neighbours.npy      int64   [C, N]  rows of each course's most similar courses (-1 = none)
+            neighbour_scores.npy float64 [C, N] their similarity (clusters, skills, co-enrollment)
+
+Workers map the arrays read-only (``mmap_mode='r'``), so the pages are shared
+through the OS page cache and memory stays flat as uvicorn workers are added.
+A worker that starts while a snapshot exists loads it without touching the
+database.
+
+Review aggregates change with every review and are not part of the
+snapshot; see ``review_stats``.
+
+Catalog writes are detected by a session hook that drops the DIRTY marker on
+commit. The next ``get_snapshot`` call in any worker rebuilds and publishes a
+new generation; the other workers remap when they see GENERATION change.
+"""
+
+import json
+import os
+import shutil
+import threading
+import uuid
+from itertools import chain
+from typing import Dict, Optional
+
+import numpy as np
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from .. import models
+from . import config, queries
+
+GENERATION_FILE = "GENERATION"
+DIRTY_FILE = "DIRTY"
+META_FILE = "meta.json"
+
+ARRAY_NAMES = (
+    "course_ids",
+    "skill_ids",
+    "relevance",
+    "cluster_match",
+    "tech_overlap",
+    "prereq_mask",
+    "role_fit",
+    "credits",
+    "workload",
+    "neighbours",
+    "neighbour_scores",
+)
+
+
+class CatalogSnapshot:
+    """Read-only view over one published snapshot generation."""
+
+    def __init__(self, generation: int, path: str, meta: Dict, arrays: Dict[str, np.ndarray]):
+        self.generation = generation
+        self.path = path
+        self.course_names = meta["course_names"]
+        self.skill_names = {
+            int(sid): name for sid, name in zip(meta["skill_ids"], meta["skill_names"])
+        }
+
+        self.course_ids = arrays["course_ids"]
+        self.skill_ids = arrays["skill_ids"]
+        self.relevance = arrays["relevance"]
+        self.cluster_match = arrays["cluster_match"]
+        self.tech_overlap = arrays["tech_overlap"]
+        self.prereq_mask = arrays["prereq_mask"]
+        self.role_fit = arrays["role_fit"]
+        self.credits = arrays["credits"]
+        self.workload = arrays["workload"]
+        self.neighbours = arrays["neighbours"]
+        self.neighbour_scores = arrays["neighbour_scores"]
+
+        # Id map: database id -> row/column index
+        self.course_index = {int(cid): i for i, cid in enumerate(meta["course_ids"])}
+        self.skill_index = {int(sid): j for j, sid in enumerate(meta["skill_ids"])}
+        self.goal_index = {int(gid): g for g, gid in enumerate(meta["goal_ids"])}
+
+        self._skill_masks = None
+
+    @property
+    def num_courses(self) -> int:
+        return len(self.course_index)
+
+    def skill_masks(self) -> list:
+        """Per-course skill sets as Python int bitmasks (bit j = skill column j).
+
+        Built from ``relevance > 0`` on first use and kept for the lifetime of
+        this generation.
+        """
+        if self._skill_masks is None:
+            packed = np.packbits(self.relevance > 0, axis=1, bitorder="little")
+            self._skill_masks = [int.from_bytes(row.tobytes(), "little") for row in packed]
+        return self._skill_masks
+
+    def touch(self, *names: str) -> int:
+        """Fault the given arrays (all by default) into the page cache; returns bytes read."""
+        total = 0
+        for name in names or ARRAY_NAMES:
+            arr = getattr(self, name)
+            np.add.reduce(arr.ravel(), dtype=np.float64)
+            total += arr.nbytes
+        return total
+
+
+# ==================== BUILD ====================
+
+def _coenrollment(db: Session, course_index: Dict[int, int]) -> np.ndarray:
+    """Jaccard overlap of the sets of students who completed each pair of courses."""
+    n_courses = len(course_index)
+    both = np.zeros((n_courses, n_courses), dtype=np.float64)
+    for course_ids in queries.get_completed_enrollments(db).values():
+        rows = sorted({course_index[cid] for cid in course_ids if cid in course_index})
+        if rows:
+            both[np.ix_(rows, rows)] += 1.0
+    sizes = np.diag(both).copy()
+    union = sizes[:, None] + sizes[None, :] - both
+    return np.divide(both, union, out=np.zeros_like(both), where=union > 0)
+
+
+def _top_neighbours(similarity: np.ndarray, course_ids: np.ndarray, n: int):
+    """Per row, the n most similar other rows (score > 0), best first, ties by course id."""
+    n_courses = len(similarity)
+    neighbours = np.full((n_courses, n), -1, dtype=np.int64)
+    scores = np.zeros((n_courses, n), dtype=np.float64)
+    for i in range(n_courses):
+        row = similarity[i].copy()
+        row[i] = 0.0
+        candidates = np.flatnonzero(row > 0)
+        if len(candidates) > n:
+            # keep everything tied with the n-th best so the id tie-break is exact
+            cutoff = np.partition(row[candidates], len(candidates) - n)[len(candidates) - n]
+            candidates = candidates[row[candidates] >= cutoff]
+        order = np.lexsort((course_ids[candidates], -row[candidates]))[:n]
+        picked = candidates[order]
+        neighbours[i, :len(picked)] = picked
+        scores[i, :len(picked)] = row[picked]
+    return neighbours, scores
+
+
+def build_arrays(db: Session):
+    """Read the catalog from the database and return (arrays, meta)."""
+    courses = sorted(queries.get_all_courses(db), key=lambda c: c.id)
+    skills = sorted(queries.get_all_skills(db), key=lambda s: s.id)
+
+    course_index = {c.id: i for i, c in enumerate(courses)}
+    skill_index = {s.id: j for j, s in enumerate(skills)}
+    n_courses, n_skills = len(courses), len(skills)
+
+    # Per-course skill relevance (any skill type, as used by S_role)
+    relevance = np.zeros((n_courses, n_skills), dtype=np.float64)
+    for course_id, skill_id, score in queries.get_all_course_skills(db):
+        i, j = course_index.get(course_id), skill_index.get(skill_id)
+        if i is None or j is None:
+            continue
+        relevance[i, j] = float(score) if score is not None else 0.0
+
+    # Shared cluster: binary, via the course x cluster incidence matrix
+    clusters_map = queries.get_course_clusters_map(db)
+    cluster_index = {}
+    for cluster_list in clusters_map.values():
+        for cl in cluster_list:
+            cluster_index.setdefault(cl.id, len(cluster_index))
+    cluster_incidence = np.zeros((n_courses, len(cluster_index)), dtype=np.float64)
+    for course_id, cluster_list in clusters_map.items():
+        i = course_index.get(course_id)
+        if i is None:
+            continue
+        for cl in cluster_list:
+            cluster_incidence[i, cluster_index[cl.id]] = 1.0
+    cluster_match = (cluster_incidence @ cluster_incidence.T) > 0
+
+    # Jaccard overlap of technical skill sets
+    tech_incidence = np.zeros((n_courses, n_skills), dtype=np.float64)
+    for course_id, skill_ids in queries.get_course_technical_skills_map(db).items():
+        i = course_index.get(course_id)
+        if i is None:
+            continue
+        for sid in skill_ids:
+            j = skill_index.get(sid)
+            if j is not None:
+                tech_incidence[i, j] = 1.0
+    intersection = tech_incidence @ tech_incidence.T
+    sizes = tech_incidence.sum(axis=1)
+    union = sizes[:, None] + sizes[None, :] - intersection
+    tech_overlap = np.divide(
+        intersection, union, out=np.zeros_like(intersection), where=union > 0
+    )
+
+    prereq_mask = np.zeros((n_courses, n_courses), dtype=bool)
+    for course_id, required_ids in queries.get_course_prereqs(db).items():
+        i = course_index.get(course_id)
+        if i is None:
+            continue
+        for req_id in required_ids:
+            j = course_index.get(req_id)
+            if j is not None:
+                prereq_mask[i, j] = True
+
+    # S_role for every (goal, course): mean relevance over the goal's technical skills
+    goal_skills = queries.get_all_career_goal_technical_skills(db)
+    goal_ids = sorted(goal_skills)
+    role_fit = np.zeros((len(goal_ids), n_courses), dtype=np.float64)
+    for g, goal_id in enumerate(goal_ids):
+        required = goal_skills[goal_id]
+        if not required:
+            continue
+        cols = [skill_index[sid] for sid in required if sid in skill_index]
+        role_fit[g] = relevance[:, cols].sum(axis=1) / len(required)
+
+    course_ids = np.array([c.id for c in courses], dtype=np.int64)
+    similarity = (
+        config.SIMILAR_W_CLUSTER * cluster_match
+        + config.SIMILAR_W_SKILLS * tech_overlap
+        + config.SIMILAR_W_COENROLL * _coenrollment(db, course_index)
+    )
+    neighbours, neighbour_scores = _top_neighbours(similarity, course_ids, config.SIMILAR_COURSES_N)
+
+    arrays = {
+        "course_ids": course_ids,
+        "skill_ids": np.array([s.id for s in skills], dtype=np.int64),
+        "relevance": relevance,
+        "cluster_match": cluster_match,
+        "tech_overlap": tech_overlap,
+        "prereq_mask": prereq_mask,
+        "role_fit": role_fit,
+        "credits": np.array([c.credits if c.credits is not None else np.nan for c in courses], dtype=np.float64),
+        "workload": np.array([c.workload if c.workload is not None else np.nan for c in courses], dtype=np.float64),
+        "neighbours": neighbours,
+        "neighbour_scores": neighbour_scores,
+    }
+    meta = {
+        "course_ids": [c.id for c in courses],
+        "course_names": [c.name for c in courses],
+        "skill_ids": [s.id for s in skills],
+        "skill_names": [s.name for s in skills],
+        "goal_ids": goal_ids,
+    }
+    return arrays, meta
+
+
+# ==================== PUBLISH / LOAD ====================
+
+def _generation_dir(root: str, generation: int) -> str:
+    return os.path.join(root, f"gen-{generation:06d}")
+
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def _write_text_atomic(path: str, text: str):
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def read_generation(root: Optional[str] = None) -> Optional[int]:
+    """Return the currently published generation number, or None."""
+    root = root or config.SNAPSHOT_DIR
+    value = _read_text(os.path.join(root, GENERATION_FILE))
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+def publish_snapshot(arrays: Dict[str, np.ndarray], meta: Dict, root: Optional[str] = None) -> int:
+    """Write a new generation directory and point GENERATION at it.
+
+    The arrays are written to a temporary directory that is renamed into
+    place, so readers never observe a half-written generation.
+    """
+    root = root or config.SNAPSHOT_DIR
+    os.makedirs(root, exist_ok=True)
+
+    tmp_dir = os.path.join(root, f"tmp-{uuid.uuid4().hex}")
+    os.makedirs(tmp_dir)
+    for name in ARRAY_NAMES:
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), arrays[name])
+    with open(os.path.join(tmp_dir, META_FILE), "w") as f:
+        json.dump(meta, f)
+
+    generation = (read_generation(root) or 0) + 1
+    while True:
+        try:
+            os.rename(tmp_dir, _generation_dir(root, generation))
+            break
+        except OSError:
+            # Another worker published this generation number first
+            generation += 1
+
+    if generation > (read_generation(root) or 0):
+        _write_text_atomic(os.path.join(root, GENERATION_FILE), str(generation))
+    _prune(root, generation)
+    return generation
+
+
+def _prune(root: str, current: int):
+    """Remove generations older than the ones we keep.
+
+    Workers still mapping a removed generation keep working: the unlinked
+    files stay alive until their last mapping is closed.
+    """
+    keep_from = current - config.SNAPSHOT_KEEP_GENERATIONS + 1
+    for entry in os.listdir(root):
+        if not entry.startswith("gen-"):
+            continue
+        try:
+            generation = int(entry[len("gen-"):])
+        except ValueError:
+            continue
+        if generation < keep_from:
+            shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+
+
+def load_snapshot(generation: int, root: Optional[str] = None) -> CatalogSnapshot:
+    """Memory-map a published generation read-only."""
+    root = root or config.SNAPSHOT_DIR
+    path = _generation_dir(root, generation)
+    with open(os.path.join(path, META_FILE)) as f:
+        meta = json.load(f)
+    arrays = {
+        name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+        for name in ARRAY_NAMES
+    }
+    return CatalogSnapshot(generation, path, meta, arrays)
+
+
+def rebuild_snapshot(db: Session, root: Optional[str] = None) -> int:
+    """Build the snapshot from the database and publish it as a new generation."""
+    arrays, meta = build_arrays(db)
+    return publish_snapshot(arrays, meta, root)
+
+
+# ==================== PER-WORKER ACCESS ====================
+
+_lock = threading.Lock()
+_current: Optional[CatalogSnapshot] = None
+
+
+def get_snapshot(db: Session) -> CatalogSnapshot:
+    """Return the current snapshot, rebuilding it first if the catalog changed.
+
+    ``db`` is only used when no usable generation exists or the DIRTY marker
+    is set; otherwise this reads GENERATION and returns the mapped arrays.
+    """
+    global _current
+    root = config.SNAPSHOT_DIR
+    with _lock:
+        dirty_token = _read_text(os.path.join(root, DIRTY_FILE))
+        generation = read_generation(root)
+        if (
+            dirty_token is not None
+            or generation is None
+            or not os.path.isdir(_generation_dir(root, generation))
+        ):
+            generation = rebuild_snapshot(db, root)
+            _clear_dirty(root, dirty_token)
+
+        if _current is None or _current.path != _generation_dir(root, generation):
+            _current = load_snapshot(generation, root)
+        return _current
+
+
+def invalidate(root: Optional[str] = None):
+    """Mark the published snapshot stale so the next reader rebuilds it."""
+    root = root or config.SNAPSHOT_DIR
+    os.makedirs(root, exist_ok=True)
+    _write_text_atomic(os.path.join(root, DIRTY_FILE), uuid.uuid4().hex)
+
+
+def catalog_version(root: Optional[str] = None) -> str:
+    """Identifier of the catalog state, shared by all workers.
+
+    Changes on every committed catalog write (a new DIRTY token) and on every
+    rebuild (a new generation). Reads two small files; never rebuilds.
+    """
+    root = root or config.SNAPSHOT_DIR
+    return f"{read_generation(root) or 0}:{_read_text(os.path.join(root, DIRTY_FILE)) or ''}"
+
+
+def _clear_dirty(root: str, token: Optional[str]):
+    # Only clear the marker we rebuilt for; a newer write keeps it set
+    if token is None:
+        return
+    path = os.path.join(root, DIRTY_FILE)
+    if _read_text(path) == token:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+# ==================== CATALOG WRITE TRACKING ====================
+
+_CATALOG_MODELS = (
+    models.Course,
+    models.CoursePrerequisite,
+    models.CourseSkill,
+    models.CourseCluster,
+    models.Cluster,
+    models.Skill,
+    models.CareerGoal,
+    models.CareerGoalTechnicalSkill,
+    models.CareerGoalHumanSkill,
+)
+
+# Back-references that change when a student profile is edited or a review is
+# written; they do not affect the catalog.
+_IGNORED_ATTRS = {"students", "ratings", "course_reviews"}
+
+
+def _touches_catalog(obj) -> bool:
+    if not isinstance(obj, _CATALOG_MODELS):
+        return False
+    state = inspect(obj)
+    return any(
+        attr.history.has_changes()
+        for attr in state.attrs
+        if attr.key not in _IGNORED_ATTRS
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _track_catalog_writes(session, flush_context):
+    if any(isinstance(obj, _CATALOG_MODELS) for obj in chain(session.new, session.deleted)) or any(
+        _touches_catalog(obj) for obj in session.dirty
+    ):
+        session.info["catalog_dirty"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("catalog_dirty", False):
+        invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("catalog_dirty", None)
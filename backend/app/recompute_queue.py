@@ -0,0 +1,142 @@
+"""Background recomputation of recommendations after profile writes.
+
+Profile write paths (student update, course list update) enqueue the student
+id; a daemon worker thread recomputes the student's recommendations for their
+own career goal, so the components cache and the leaderboard are already
+current when the student opens the recommendations page. A student queued
+twice before the worker gets to them is recomputed once, with the lag
+measured from the first write.
+
+Started from the app lifespan (unless SKIP_RECOMMENDATION_QUEUE is set);
+depth and lag are reported by ``get_status`` and ``/recompute-queue``.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from . import database
+from .recommendation_engine import service
+
+logger = logging.getLogger(__name__)
+
+_cond = threading.Condition()
+_pending: "OrderedDict[int, float]" = OrderedDict()  # student id -> monotonic enqueue time
+_state = {
+    "running": False,
+    "processed": 0,
+    "failed": 0,
+    "deduplicated": 0,
+    "last_lag_seconds": None,
+    "max_lag_seconds": None,
+}
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def enqueue(student_id: int) -> bool:
+    """Queue a student for recomputation; False if they were already queued."""
+    with _cond:
+        if student_id in _pending:
+            _state["deduplicated"] += 1
+            return False
+        _pending[student_id] = time.monotonic()
+        _cond.notify()
+        return True
+
+
+def get_status() -> Dict:
+    with _cond:
+        oldest = next(iter(_pending.values()), None)
+        return {
+            **_state,
+            "depth": len(_pending),
+            "oldest_wait_seconds": round(time.monotonic() - oldest, 4) if oldest is not None else None,
+        }
+
+
+def _process(session_factory, student_id: int, enqueued_at: float):
+    failed = False
+    db = session_factory()
+    try:
+        service.refresh_student_recommendations(db, student_id)
+    except ValueError:
+        pass  # deleted since it was queued
+    except Exception:
+        logger.exception("recomputing recommendations for student %s failed", student_id)
+        failed = True
+    finally:
+        db.close()
+    lag = round(time.monotonic() - enqueued_at, 4)
+    with _cond:
+        _state["failed" if failed else "processed"] += 1
+        _state["last_lag_seconds"] = lag
+        _state["max_lag_seconds"] = max(lag, _state["max_lag_seconds"] or 0.0)
+
+
+def _pop() -> Optional[tuple]:
+    with _cond:
+        return _pending.popitem(last=False) if _pending else None
+
+
+def run_pending(session_factory=None) -> int:
+    """Recompute everything queued in the calling thread; returns the number processed."""
+    session_factory = session_factory or database.SessionLocal
+    count = 0
+    item = _pop()
+    while item is not None:
+        _process(session_factory, *item)
+        count += 1
+        item = _pop()
+    return count
+
+
+def _worker(session_factory):
+    while True:
+        with _cond:
+            while not _pending and not _stop.is_set():
+                _cond.wait()
+            if _stop.is_set():
+                return
+            student_id, enqueued_at = _pending.popitem(last=False)
+        _process(session_factory, student_id, enqueued_at)
+
+
+def start(session_factory=None) -> Optional[threading.Thread]:
+    """Start the worker in a daemon thread (not at all if SKIP_RECOMMENDATION_QUEUE is set)."""
+    global _thread
+    if os.getenv("SKIP_RECOMMENDATION_QUEUE", "false").lower() == "true":
+        return None
+    if _thread is not None and _thread.is_alive():
+        return _thread
+    _stop.clear()
+    _thread = threading.Thread(
+        target=_worker, args=(session_factory or database.SessionLocal,), name="recompute-queue", daemon=True
+    )
+    _thread.start()
+    with _cond:
+        _state["running"] = True
+    return _thread
+
+
+def stop(timeout: Optional[float] = 5.0):
+    """Stop the worker after the student it is working on; queued students stay queued."""
+    global _thread
+    with _cond:
+        _stop.set()
+        _cond.notify_all()
+    if _thread is not None:
+        _thread.join(timeout)
+        _thread = None
+    with _cond:
+        _state["running"] = False
+
+
+def reset():
+    """Drop queued students and counters."""
+    with _cond:
+        _pending.clear()
+        _state.update(processed=0, failed=0, deduplicated=0, last_lag_seconds=None, max_lag_seconds=None)
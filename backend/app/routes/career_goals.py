@@ -1,42 +1,81 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from ..database import get_db
+import hashlib
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..cache import LRUCache, etag_matches
+from ..database import get_async_db
 from ..models import CareerGoal, CareerGoalTechnicalSkill, CareerGoalHumanSkill, Skill
+from ..recommendation_engine import snapshot
 from typing import List, Dict
 
 router = APIRouter(prefix="/career-goals", tags=["career-goals"])
 
+# Same for every user; browsers keep it and revalidate with If-None-Match
+CAREER_GOALS_CACHE_CONTROL = "public, no-cache"
+
+# (etag, goals) per catalog version; career goals and skills are catalog rows,
+# so any write to them changes the version
+_catalog_cache = LRUCache(4)
+
+
+async def _load_catalog(db: AsyncSession) -> List[Dict]:
+    """All career goals with their skill names, from one joined query."""
+    links = union_all(
+        select(
+            literal("technical").label("kind"),
+            CareerGoalTechnicalSkill.career_goal_id.label("career_goal_id"),
+            CareerGoalTechnicalSkill.skill_id.label("skill_id"),
+        ),
+        select(literal("human"), CareerGoalHumanSkill.career_goal_id, CareerGoalHumanSkill.skill_id),
+    ).subquery()
+    rows = (await db.execute(
+        select(CareerGoal.id, CareerGoal.name, CareerGoal.description, links.c.kind, Skill.name)
+        .outerjoin(links, links.c.career_goal_id == CareerGoal.id)
+        .outerjoin(Skill, Skill.id == links.c.skill_id)
+        .order_by(CareerGoal.id, links.c.skill_id)
+    )).all()
+
+    # Goals sharing a name are listed once (the first one)
+    goals, seen_names = {}, set()
+    for goal_id, name, description, kind, skill_name in rows:
+        if goal_id not in goals:
+            if name in seen_names:
+                continue
+            seen_names.add(name)
+            goals[goal_id] = {
+                "id": goal_id,
+                "name": name,
+                "description": description,
+                "technical_skills": [],
+                "human_skills": [],
+            }
+        # Links to missing skills are skipped
+        if skill_name is not None:
+            goals[goal_id][f"{kind}_skills"].append(skill_name)
+    return list(goals.values())
+
+
 @router.get("/", response_model=List[Dict])
-def get_all_career_goals(db: Session = Depends(get_db)):
+async def get_all_career_goals(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get all career goals with their technical and human skill names.
+
+    Built once per catalog version; a matching If-None-Match gets 304.
+    """
     try:
-        goals = db.query(CareerGoal).all()
-        # Gather technical/human skills as list-of-names for each goal
-        def skill_names(goal, relation_attr):
-            names = []
-            for rel in getattr(goal, relation_attr):
-                # Use Session.get to fetch by PK and handle missing skills gracefully
-                skill = db.get(Skill, rel.skill_id)
-                if skill is not None:
-                    names.append(skill.name)
-            return names
-
-        seen_names = set()
-        filtered = []
-        for goal in goals:
-            if goal.name not in seen_names:
-                seen_names.add(goal.name)
-                filtered.append(goal)
-
-        return [
-            {
-                "id": goal.id,
-                "name": goal.name,
-                "description": goal.description,
-                "technical_skills": skill_names(goal, 'technical_skills'),
-                "human_skills": skill_names(goal, 'human_skills'),
-            }
-            for goal in filtered
-        ]
+        version = snapshot.catalog_version()
+        cached = _catalog_cache.get(version)
+        if cached is None:
+            goals = await _load_catalog(db)
+            etag = '"' + hashlib.sha1(json.dumps(goals, sort_keys=True).encode()).hexdigest() + '"'
+            cached = (etag, goals)
+            _catalog_cache.put(version, cached)
+        etag, goals = cached
     except Exception as e:
         # Ensure we return a proper HTTP error instead of None (which
         # causes FastAPI response validation to fail with 'Input should
@@ -45,5 +84,8 @@ def get_all_career_goals(db: Session = Depends(get_db)):
         print(f"Exception {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-    
-
+    headers = {"ETag": etag, "Cache-Control": CAREER_GOALS_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return goals
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from ..database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from ..database import get_async_db, get_db
 from ..models import CourseReview, Student, Course
+from .. import crud, pagination
 from ..schemas import CourseReviewCreate, CourseReviewResponse
 from ..auth_utils import get_current_student
+from typing import Optional
 
 
 # ==================== SCORE CALCULATION ====================
@@ -28,11 +32,32 @@ def calculate_final_score(industry: int, instructor: int, useful: int) -> float:
 # ==================== ROUTER ====================
 router = APIRouter(prefix="/reviews", tags=["Course Reviews"])
 
+# Relationships serialized with each review; an async session cannot
+# lazy-load them
+REVIEW_RELATIONS = (
+    selectinload(CourseReview.student).selectinload(Student.career_goal),
+    selectinload(CourseReview.course),
+)
+
 
 @router.get("/", response_model=list[CourseReviewResponse])
-def get_all_reviews(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all course reviews with pagination."""
-    reviews = db.query(CourseReview).offset(skip).limit(limit).all()
+async def get_all_reviews(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get all course reviews with keyset pagination, by id.
+
+    Pass a response's X-Next-Cursor header as ``cursor`` for the next page;
+    ``skip`` (an offset) is kept for older clients.
+    """
+    query = pagination.keyset(select(CourseReview).options(*REVIEW_RELATIONS), [CourseReview.id], cursor, limit)
+    if skip and not cursor:
+        query = query.offset(skip)
+    reviews, next_cursor = pagination.page((await db.scalars(query)).all(), limit, lambda r: (r.id,))
+    pagination.set_next_cursor(response, next_cursor)
     return reviews
 
 
@@ -75,6 +100,8 @@ def create_course_review(
     )
 
     db.add(new_review)
+    # Keep the time-decayed quality signal current in the same transaction
+    crud.record_review_decay(db, review_data.course_id, final_score)
     db.commit()
     db.refresh(new_review)
 
@@ -82,34 +109,34 @@ def create_course_review(
 
 
 @router.get("/course/{course_id}", response_model=list[CourseReviewResponse])
-def get_reviews_by_course(
+async def get_reviews_by_course(
     course_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all reviews for a specific course."""
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = await db.get(Course, course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
 
-    reviews = db.query(CourseReview).filter(
-        CourseReview.course_id == course_id
-    ).all()
+    reviews = (await db.scalars(
+        select(CourseReview).where(CourseReview.course_id == course_id).options(*REVIEW_RELATIONS)
+    )).all()
 
     return reviews
 
 
 @router.get("/student/{student_id}", response_model=list[CourseReviewResponse])
-def get_reviews_by_student(
+async def get_reviews_by_student(
     student_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all reviews submitted by a specific student."""
-    student = db.query(Student).filter(Student.id == student_id).first()
+    student = await db.get(Student, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
-    reviews = db.query(CourseReview).filter(
-        CourseReview.student_id == student_id
-    ).all()
+    reviews = (await db.scalars(
+        select(CourseReview).where(CourseReview.student_id == student_id).options(*REVIEW_RELATIONS)
+    )).all()
 
     return reviews
@@ -1,137 +1,186 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
-from .. import models, schemas
-from ..database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, select
+from typing import Optional
+from .. import course_details, models, pagination, schemas
+from ..database import get_async_db, get_db
+from ..recommendation_engine import config as recommendation_config, service as recommendation_service
 
 router = APIRouter(prefix="/courses", tags=["courses"])
 
 
 @router.get("/", response_model=list[schemas.CourseResponse])
-def get_all_courses(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all courses with pagination."""
-    courses = db.query(models.Course).offset(skip).limit(limit).all()
+async def get_all_courses(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = Query(None, pattern="^popular$"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get all courses with keyset pagination, by id.
+
+    Pass a response's X-Next-Cursor header as ``cursor`` for the next page;
+    ``skip`` (an offset) is kept for older clients. sort=popular orders by
+    all-time completions (from the maintained enrollment counters), most
+    completed first. Only the id order is an index range scan; the popular
+    order is an expression over an outer join that no index covers, so each
+    of its pages sorts the joined course rows (one row per course).
+    """
+    if sort == "popular":
+        # Negated so both sort keys ascend (one row-value comparison)
+        popularity = -func.coalesce(models.CourseEnrollmentStats.total_completions, 0)
+        query = select(models.Course, popularity).outerjoin(
+            models.CourseEnrollmentStats,
+            models.CourseEnrollmentStats.course_id == models.Course.id,
+        )
+        query = pagination.keyset(query, [popularity, models.Course.id], cursor, limit)
+        if skip and not cursor:
+            query = query.offset(skip)
+        rows, next_cursor = pagination.page((await db.execute(query)).all(), limit, lambda r: (r[1], r[0].id))
+        courses = [course for course, _ in rows]
+    else:
+        query = pagination.keyset(select(models.Course), [models.Course.id], cursor, limit)
+        if skip and not cursor:
+            query = query.offset(skip)
+        courses, next_cursor = pagination.page((await db.scalars(query)).all(), limit, lambda c: (c.id,))
+    pagination.set_next_cursor(response, next_cursor)
     return courses
 
 
-@router.get("/{course_id}", response_model=schemas.CourseDetailsResponse)
-def get_course_details(course_id: int, db: Session = Depends(get_db)):
-    """Get detailed course information including prerequisites, skills, and clusters."""
-    course = db.query(models.Course).filter(models.Course.id == course_id).first()
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-    
-    # Build response with proper prerequisite mapping
-    # The prerequisites relationship returns CoursePrerequisite objects
-    # We need to map them to PrerequisiteCourseResponse objects
-    prerequisites = [
-        schemas.PrerequisiteCourseResponse(
-            id=cp.required_course_id,
-            name=db.query(models.Course).filter(
-                models.Course.id == cp.required_course_id
-            ).first().name
-        )
-        for cp in course.prerequisites
-    ]
-    
-    # Map skills
-    skills = [
-        schemas.SkillResponse(
-            id=skill.id,
-            name=skill.name,
-            type=skill.type,
-            description=skill.description
+# Most course ids accepted by one GET /courses/stats request
+COURSE_STATS_MAX_IDS = 200
+
+
+async def _aggregate_stats(db: AsyncSession, course_ids: list[int]) -> dict:
+    """Review count and rating averages per existing course, from one aggregate query.
+
+    Courses without reviews get zeros; unknown ids are left out.
+    """
+    review = models.CourseReview
+    rows = (await db.execute(
+        select(
+            models.Course.id,
+            func.count(review.id),
+            func.avg(review.final_score),
+            func.avg(review.industry_relevance_rating),
+            func.avg(review.instructor_rating),
+            func.avg(review.useful_learning_rating),
         )
-        for skill in course.skills
-    ]
-    
-    # Map clusters
-    clusters = [
-        schemas.ClusterResponse(
-            id=cluster.id,
-            name=cluster.name,
-            description=cluster.description
+        .outerjoin(review, review.course_id == models.Course.id)
+        .where(models.Course.id.in_(course_ids))
+        .group_by(models.Course.id)
+    )).all()
+
+    def rounded(value):
+        # avg() of an integer column is NUMERIC (Decimal) on Postgres
+        return round(float(value), 2) if value is not None else 0.0
+
+    return {
+        course_id: schemas.CourseStatsResponse(
+            review_count=count,
+            avg_final_score=rounded(final_score),
+            avg_industry_relevance=rounded(industry_relevance),
+            avg_instructor_quality=rounded(instructor_quality),
+            avg_useful_learning=rounded(useful_learning),
         )
-        for cluster in course.clusters
+        for course_id, count, final_score, industry_relevance, instructor_quality, useful_learning in rows
+    }
+
+
+@router.get("/stats", response_model=list[schemas.CourseStatsItemResponse])
+async def get_courses_stats(
+    ids: str = Query(..., description="Comma-separated course ids, e.g. 1,2,3"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get aggregated statistics for several courses in one request.
+
+    Results follow the order of ``ids``; unknown course ids are left out.
+    """
+    try:
+        course_ids = list(dict.fromkeys(int(i) for i in ids.split(",") if i.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    if len(course_ids) > COURSE_STATS_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {COURSE_STATS_MAX_IDS} ids per request")
+    if not course_ids:
+        return []
+
+    stats = await _aggregate_stats(db, course_ids)
+    return [
+        schemas.CourseStatsItemResponse(course_id=course_id, **stats[course_id].model_dump())
+        for course_id in course_ids
+        if course_id in stats
     ]
-    
-    return schemas.CourseDetailsResponse(
-        id=course.id,
-        name=course.name,
-        description=course.description,
-        workload=course.workload,
-        credits=course.credits,
-        status=course.status,
-        prerequisites=prerequisites,
-        skills=skills,
-        clusters=clusters,
-        created_at=course.created_at
-    )
+
+
+@router.get("/{course_id}", response_model=schemas.CourseDetailsResponse)
+async def get_course_details(course_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get detailed course information including prerequisites, skills, and clusters."""
+    # Two queries on a miss; cached until one of the course's rows is written
+    details = await course_details.get(db, course_id)
+    if details is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    return details
 
 
 @router.get("/{course_id}/stats", response_model=schemas.CourseStatsResponse)
-def get_course_stats(course_id: int, db: Session = Depends(get_db)):
+async def get_course_stats(course_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get aggregated statistics for a course."""
-    # Check if course exists
-    course = db.query(models.Course).filter(models.Course.id == course_id).first()
-    if not course:
+    stats = await _aggregate_stats(db, [course_id])
+    if course_id not in stats:
         raise HTTPException(status_code=404, detail="Course not found")
-    
-    # Query reviews for this course
-    reviews = db.query(models.CourseReview).filter(
-        models.CourseReview.course_id == course_id
-    ).all()
-    
-    if not reviews:
-        return schemas.CourseStatsResponse(
-            review_count=0,
-            avg_final_score=0.0,
-            avg_industry_relevance=0.0,
-            avg_instructor_quality=0.0,
-            avg_useful_learning=0.0
-        )
-    
-    # Calculate averages
-    review_count = len(reviews)
-    avg_final_score = sum(r.final_score for r in reviews) / review_count
-    avg_industry_relevance = sum(r.industry_relevance_rating for r in reviews) / review_count
-    avg_instructor_quality = sum(r.instructor_rating for r in reviews) / review_count
-    avg_useful_learning = sum(r.useful_learning_rating for r in reviews) / review_count
-    
-    return schemas.CourseStatsResponse(
-        review_count=review_count,
-        avg_final_score=round(avg_final_score, 2),
-        avg_industry_relevance=round(avg_industry_relevance, 2),
-        avg_instructor_quality=round(avg_instructor_quality, 2),
-        avg_useful_learning=round(avg_useful_learning, 2)
-    )
+    return stats[course_id]
+
+
+@router.get("/{course_id}/similar", response_model=list[schemas.SimilarCourseResponse])
+def get_similar_courses(
+    course_id: int,
+    n: int = Query(5, ge=1, le=recommendation_config.SIMILAR_COURSES_N),
+    db: Session = Depends(get_db),
+):
+    """Get the courses most similar to this one (clusters, skills, co-enrollment)."""
+    similar = recommendation_service.get_similar_courses(db, course_id, n)
+    if similar is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    return similar
 
 
 @router.get("/{course_id}/reviews", response_model=schemas.PaginatedCourseReviewsResponse)
-def get_course_reviews(
+async def get_course_reviews(
     course_id: int, 
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get paginated reviews for a specific course."""
+    """Get paginated reviews for a specific course, newest first.
+
+    ``next_cursor`` of a response, passed as ``cursor``, reads the following
+    page with a keyset query (no OFFSET); ``page`` alone jumps by offset.
+    """
     # Check if course exists
-    course = db.query(models.Course).filter(models.Course.id == course_id).first()
+    course = await db.get(models.Course, course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     
-    # Calculate offset
-    offset = (page - 1) * page_size
-    
     # Query total count
-    total = db.query(models.CourseReview).filter(
-        models.CourseReview.course_id == course_id
-    ).count()
+    total = await db.scalar(
+        select(func.count()).select_from(models.CourseReview).where(models.CourseReview.course_id == course_id)
+    )
     
-    # Query reviews (newest first)
-    reviews = db.query(models.CourseReview).filter(
-        models.CourseReview.course_id == course_id
-    ).order_by(desc(models.CourseReview.created_at)).offset(offset).limit(page_size).all()
+    # Query reviews (newest first), with their students for the names
+    query = pagination.keyset(
+        select(models.CourseReview).where(models.CourseReview.course_id == course_id)
+        .options(selectinload(models.CourseReview.student)),
+        [models.CourseReview.created_at, models.CourseReview.id], cursor, page_size, descending=True,
+    )
+    if not cursor:
+        query = query.offset((page - 1) * page_size)
+    reviews, next_cursor = pagination.page(
+        (await db.scalars(query)).all(), page_size, lambda r: (r.created_at, r.id),
+    )
     
     # Build response items with student names
     items = [
@@ -158,7 +207,8 @@ def get_course_reviews(
         items=items,
         page=page,
         page_size=page_size,
-        total=total
+        total=total,
+        next_cursor=next_cursor,
     )
 
 
@@ -1,16 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from .. import models, schemas
+from .. import models, pagination, schemas
 from ..database import get_db
 from ..auth_utils import get_current_student
+from typing import Optional
 
 router = APIRouter(prefix="/ratings", tags=["ratings"])
 
 
 @router.get("/", response_model=list[schemas.RatingResponse])
-def get_all_ratings(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all ratings with pagination."""
-    ratings = db.query(models.Rating).offset(skip).limit(limit).all()
+def get_all_ratings(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Get all ratings with keyset pagination, by id.
+
+    Pass a response's X-Next-Cursor header as ``cursor`` for the next page;
+    ``skip`` (an offset) is kept for older clients.
+    """
+    query = pagination.keyset(db.query(models.Rating), [models.Rating.id], cursor, limit)
+    if skip and not cursor:
+        query = query.offset(skip)
+    ratings, next_cursor = pagination.page(query.all(), limit, lambda r: (r.id,))
+    pagination.set_next_cursor(response, next_cursor)
     return ratings
 
 
@@ -1,16 +1,17 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..models import Skill
 from ..schemas import SkillResponse
-from ..database import get_db
+from ..database import get_async_db
 from typing import List, Optional
 
 router = APIRouter(prefix="/skills", tags=["skills"])
 
 @router.get("/", response_model=List[SkillResponse])
-def get_skills(type: Optional[str] = Query(None, description="Filter by skill type: 'technical' or 'human'"), db: Session = Depends(get_db)):
-    query = db.query(Skill)
+async def get_skills(type: Optional[str] = Query(None, description="Filter by skill type: 'technical' or 'human'"), db: AsyncSession = Depends(get_async_db)):
+    query = select(Skill)
     if type:
-        query = query.filter(Skill.type == type)
-    return query.all()
+        query = query.where(Skill.type == type)
+    return (await db.scalars(query)).all()
 
@@ -1,69 +1,115 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from .. import models, schemas, crud
+from .. import models, schemas, crud, pagination, recompute_queue
 from ..database import get_db
-from ..auth_utils import get_current_student
-from typing import List
+from ..auth_utils import get_current_student, get_current_student_id
+from ..recommendation_engine import (
+    config as recommendation_config,
+    leaderboard,
+    queries as recommendation_queries,
+    schemas as recommendation_schemas,
+    service as recommendation_service,
+)
+from typing import List, Optional
 
 router = APIRouter(prefix="/students", tags=["students"])
 
+# Browsers keep the response but revalidate it with If-None-Match every time
+RECOMMENDATIONS_CACHE_CONTROL = "private, no-cache"
+
+
+def _student_response(student: models.Student) -> dict:
+    """StudentResponse fields of a student loaded with crud.STUDENT_PROFILE_RELATIONS."""
+    return {
+        'id': student.id,
+        'name': student.name,
+        'faculty': student.faculty,
+        'year': student.year,
+        'career_goal_id': student.career_goal_id,
+        'career_goal': student.career_goal,
+        'human_skill_ids': [sk.id for sk in student.human_skills],
+        'courses_taken': [sc.course_id for sc in student.student_courses],
+        'created_at': student.created_at,
+    }
+
 
 @router.get("/", response_model=List[schemas.StudentResponse])
-def get_all_students(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all students with pagination."""
-    students = db.query(models.Student).offset(skip).limit(limit).all()
-    def serialize(s):
-        return {
-            'id': s.id,
-            'name': s.name,
-            'faculty': s.faculty,
-            'year': s.year,
-            'career_goal': s.career_goal if hasattr(s, 'career_goal') else None,
-            'human_skill_ids': [sk.id for sk in getattr(s, 'human_skills', [])],
-            'courses_taken': [sc.course_id for sc in getattr(s, 'student_courses', [])],
-            'created_at': s.created_at,
-        }
-    return [serialize(s) for s in students]
+def get_all_students(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Get all students with keyset pagination, by id.
+
+    Pass a response's X-Next-Cursor header as ``cursor`` for the next page;
+    ``skip`` (an offset) is kept for older clients.
+    """
+    students, next_cursor = crud.get_student_profiles(db, skip=skip, limit=limit, cursor=cursor)
+    pagination.set_next_cursor(response, next_cursor)
+    return [_student_response(s) for s in students]
 
 
 @router.get("/me", response_model=schemas.StudentResponse)
 def get_current_user_profile(
-    current_student = Depends(get_current_student),
+    student_id: int = Depends(get_current_student_id),
     db: Session = Depends(get_db),
 ):
     """Get the current authenticated student's profile."""
-    student = db.query(models.Student).filter(models.Student.id == current_student.id).first()
+    student = crud.get_student_profile(db, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
-    return {
-        'id': student.id,
-        'name': student.name,
-        'faculty': student.faculty,
-        'year': student.year,
-        'career_goal_id': student.career_goal_id,
-        'career_goal': student.career_goal if hasattr(student, 'career_goal') else None,
-        'human_skill_ids': [sk.id for sk in getattr(student, 'human_skills', [])],
-        'courses_taken': [sc.course_id for sc in getattr(student, 'student_courses', [])],
-        'created_at': student.created_at,
-    }
+    return _student_response(student)
+
+
+@router.get("/me/peers", response_model=List[schemas.PeerResponse])
+def get_my_peers(
+    limit: int = Query(10, ge=1, le=recommendation_config.PEER_MAX_RESULTS),
+    current_student = Depends(get_current_student),
+    db: Session = Depends(get_db),
+):
+    """Get the students most similar to the current student and the courses they took next."""
+    return recommendation_service.get_peers(db, current_student.id, limit)
+
+
+@router.get("/me/recommendations", response_model=recommendation_schemas.RecommendationsResponse)
+def get_my_recommendations(
+    request: Request,
+    response: Response,
+    limit: int = Query(10, ge=1, le=100),
+    student_id: int = Depends(get_current_student_id),
+    db: Session = Depends(get_db),
+):
+    """Get recommendations for the current student's career goal (default options).
+
+    Served from cache while the student's profile and the catalog are
+    unchanged; a matching If-None-Match gets 304 without any recomputation.
+    """
+    row = recommendation_queries.get_student_career_goal_id(db, student_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Student not found")
+    if row.career_goal_id is None:
+        raise HTTPException(status_code=400, detail="Student has no career goal set")
+    etag, body = recommendation_service.get_student_recommendations(
+        db, student_id, row.career_goal_id, limit=limit, if_none_match=request.headers.get("if-none-match"),
+    )
+    headers = {"Cache-Control": RECOMMENDATIONS_CACHE_CONTROL}
+    if etag is not None:
+        headers["ETag"] = etag
+    if body is None:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return body
 
 
 @router.get("/{student_id}", response_model=schemas.StudentResponse)
 def get_student(student_id: int, db: Session = Depends(get_db)):
     """Get a specific student by ID."""
-    student = db.query(models.Student).filter(models.Student.id == student_id).first()
+    student = crud.get_student_profile(db, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
-    return {
-        'id': student.id,
-        'name': student.name,
-        'faculty': student.faculty,
-        'year': student.year,
-        'career_goal': student.career_goal if hasattr(student, 'career_goal') else None,
-        'human_skill_ids': [sk.id for sk in getattr(student, 'human_skills', [])],
-        'courses_taken': [sc.course_id for sc in getattr(student, 'student_courses', [])],
-        'created_at': student.created_at,
-    }
+    return _student_response(student)
 
 
 @router.post("/", response_model=schemas.StudentResponse)
@@ -73,16 +119,7 @@ def create_student(student: schemas.StudentCreateAuth, db: Session = Depends(get
     student_data = student.model_dump()
     student_data['hashed_password'] = get_password_hash(student_data.pop('password'))
     db_student = crud.create_student(db, student_data)
-    return {
-        'id': db_student.id,
-        'name': db_student.name,
-        'faculty': db_student.faculty,
-        'year': db_student.year,
-        'career_goal': db_student.career_goal if hasattr(db_student, 'career_goal') else None,
-        'human_skill_ids': [sk.id for sk in getattr(db_student, 'human_skills', [])],
-        'courses_taken': [sc.course_id for sc in getattr(db_student, 'student_courses', [])],
-        'created_at': db_student.created_at,
-    }
+    return _student_response(crud.get_student_profile(db, db_student.id))
 
 
 @router.put("/{student_id}", response_model=schemas.StudentResponse)
@@ -92,16 +129,8 @@ def update_student(student_id: int, student: schemas.StudentCreate, db: Session
     db_student = crud.update_student(db, student_id, student_data)
     if not db_student:
         raise HTTPException(status_code=404, detail="Student not found")
-    return {
-        'id': db_student.id,
-        'name': db_student.name,
-        'faculty': db_student.faculty,
-        'year': db_student.year,
-        'career_goal': db_student.career_goal if hasattr(db_student, 'career_goal') else None,
-        'human_skill_ids': [sk.id for sk in getattr(db_student, 'human_skills', [])],
-        'courses_taken': [sc.course_id for sc in getattr(db_student, 'student_courses', [])],
-        'created_at': db_student.created_at,
-    }
+    recompute_queue.enqueue(student_id)
+    return _student_response(crud.get_student_profile(db, student_id))
 
 
 @router.put("/{student_id}/courses", response_model=schemas.StudentResponse)
@@ -111,24 +140,12 @@ def update_student_courses(student_id: int, enrollment: schemas.EnrollmentUpdate
     if not db_student:
         raise HTTPException(status_code=404, detail="Student not found")
     
-    # Clear existing courses and add new ones with 'completed' status
-    db.query(models.StudentCourse).filter(models.StudentCourse.student_id == student_id).delete()
+    # Diff against the current courses; one transaction, status='completed'
+    crud.replace_student_courses(db, student_id, enrollment.courses_taken)
     db.commit()
     
-    for course_id in enrollment.courses_taken:
-        crud.add_student_course(db, student_id, course_id, status="completed")
-    
-    db.refresh(db_student)
-    return {
-        'id': db_student.id,
-        'name': db_student.name,
-        'faculty': db_student.faculty,
-        'year': db_student.year,
-        'career_goal': db_student.career_goal if hasattr(db_student, 'career_goal') else None,
-        'human_skill_ids': [sk.id for sk in getattr(db_student, 'human_skills', [])],
-        'courses_taken': [sc.course_id for sc in getattr(db_student, 'student_courses', [])],
-        'created_at': db_student.created_at,
-    }
+    recompute_queue.enqueue(student_id)
+    return _student_response(crud.get_student_profile(db, student_id))
 
 
 @router.delete("/{student_id}")
@@ -136,6 +153,11 @@ def delete_student(student_id: int, db: Session = Depends(get_db)):
     """Delete a student."""
     db_student = crud.get_student(db, student_id)
     
+    # The cascade would drop the enrollments and reviews without touching the
+    # popularity counters and the decayed review stats
+    crud.clear_student_courses(db, student_id)
+    crud.remove_student_reviews(db, student_id)
+    leaderboard.forget(db, student_id)
     db.delete(db_student)
     db.commit()
     return {"message": "Student deleted successfully"}
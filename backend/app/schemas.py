@@ -88,6 +88,22 @@ class StudentResponse(StudentBase):
         return v if v else []
 
 
+class PeerCourse(BaseModel):
+    """Schema for a course a peer completed."""
+    course_id: int
+    name: Optional[str] = None
+
+
+class PeerResponse(BaseModel):
+    """Schema for a student with a similar profile."""
+    student_id: int
+    name: str
+    faculty: Optional[str] = None
+    similarity: float  # cosine over completed courses, human skills and career goal, 0..1
+    shared_courses: int
+    next_courses: List[PeerCourse] = []  # completed by the peer, not yet by the requester
+
+
 # ==================== COURSE SCHEMAS ====================
 class CourseBase(BaseModel):
     """Base schema for Course."""
@@ -269,6 +285,18 @@ class CourseStatsResponse(BaseModel):
     avg_useful_learning: Optional[float] = 0.0
 
 
+class CourseStatsItemResponse(CourseStatsResponse):
+    """Schema for one course's statistics in a bulk stats response."""
+    course_id: int
+
+
+class SimilarCourseResponse(BaseModel):
+    """Schema for a course similar to another one."""
+    course_id: int
+    name: str
+    similarity: float  # blend of shared cluster, tech skills and co-enrollment, 0..1
+
+
 class CourseReviewDetailedResponse(CourseReviewBase):
     """Schema for detailed course review with student name."""
     id: int
@@ -288,6 +316,7 @@ class PaginatedCourseReviewsResponse(BaseModel):
     page: int
     page_size: int
     total: int
+    next_cursor: Optional[str] = None  # pass as cursor for the next page; None on the last page
 
 
 # Rebuild models to resolve forward references
@@ -643,6 +643,10 @@ def seed_database():
     db.add_all(demo_courses + datascientist_courses)
     db.commit()
     print("Demo student courses added successfully.")
+
+    # --- POPULARITY COUNTERS ---
+    from .crud import rebuild_enrollment_stats
+    rebuild_enrollment_stats(db)
     
     # --- ADD STUDENT HUMAN SKILLS ---
     # Assign human skills to demo student
@@ -757,6 +761,10 @@ def seed_database():
     db.add_all(sample_reviews)
     db.commit()
     print("Sample course reviews added successfully.")
+
+    # --- TIME-DECAYED REVIEW STATS ---
+    from .crud import rebuild_review_decay_stats
+    rebuild_review_decay_stats(db)
     
     # --- BACKFILL CAREER GOAL HUMAN SKILLS ---
     backfill_career_goal_human_skills(db)
@@ -772,6 +780,12 @@ def seed_database():
     from .seed_clusters import seed_clusters
     seed_clusters()
 
+    # Tables were dropped and recreated; force workers to rebuild the recommendation snapshot
+    from .recommendation_engine import leaderboard, review_stats, snapshot
+    snapshot.invalidate()
+    review_stats.invalidate()
+    leaderboard.release_rebuild()
+
 
 if __name__ == "__main__":
     seed_database()
\ No newline at end of file
@@ -0,0 +1,195 @@
+"""Startup warm-up of database connections and recommendation caches.
+
+Run once per worker from the app lifespan, in a background thread so the
+worker can answer ``/ready`` (503) while it warms up. Each step is timed and
+logged; the readiness endpoint reports the timings. The "most recommended"
+leaderboard (a shared table) is refilled after the worker is ready, in the
+same thread, and only by the first worker of a deployment to claim it: it
+recomputes every student, while the board keeps serving the rows recorded
+so far.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import text
+
+from . import database
+from .recommendation_engine import leaderboard, peers, service, snapshot
+
+logger = logging.getLogger(__name__)
+
+WARMUP_ATTEMPTS = 3
+WARMUP_RETRY_DELAY_SECONDS = 2.0
+
+_state = {
+    "ready": False,
+    "steps": {},      # step name -> seconds
+    "error": None,
+}
+_state_lock = threading.Lock()
+
+
+def is_ready() -> bool:
+    return _state["ready"]
+
+
+def get_status() -> Dict:
+    with _state_lock:
+        return {
+            "ready": _state["ready"],
+            "steps": dict(_state["steps"]),
+            "error": _state["error"],
+        }
+
+
+def mark_ready():
+    with _state_lock:
+        _state["ready"] = True
+        _state["error"] = None
+
+
+def reset():
+    with _state_lock:
+        _state["ready"] = False
+        _state["steps"] = {}
+        _state["error"] = None
+
+
+def _timed(name: str, step: Callable[[], object]):
+    start = time.perf_counter()
+    result = step()
+    elapsed = time.perf_counter() - start
+    with _state_lock:
+        _state["steps"][name] = round(elapsed, 4)
+    logger.info("warm-up step %s took %.1f ms (%s)", name, elapsed * 1000, result)
+    return result
+
+
+def _prime_pool(engine) -> str:
+    """Open the pool's base connections at once and ping each of them."""
+    size = engine.pool.size() if hasattr(engine.pool, "size") else 1
+    connections = []
+    try:
+        for _ in range(size):
+            conn = engine.connect()
+            conn.execute(text("SELECT 1"))
+            connections.append(conn)
+    finally:
+        for conn in connections:
+            conn.close()  # back to the pool, already connected
+    return f"{len(connections)} connections"
+
+
+async def _open_async_pool(async_engine) -> int:
+    size = async_engine.pool.size() if hasattr(async_engine.pool, "size") else 1
+    connections = []
+    try:
+        for _ in range(size):
+            conn = await async_engine.connect()
+            connections.append(conn)
+            await conn.execute(text("SELECT 1"))
+    finally:
+        for conn in connections:
+            await conn.close()
+    return len(connections)
+
+
+def _prime_async_pool(async_engine, loop: Optional[asyncio.AbstractEventLoop]) -> str:
+    """``_prime_pool`` for the async engine, run on the worker's event loop.
+
+    Async driver connections belong to the loop that opened them, so without
+    the serving loop the pool is left to open on first use.
+    """
+    if loop is None:
+        return "skipped, no event loop"
+    opened = asyncio.run_coroutine_threadsafe(_open_async_pool(async_engine), loop).result()
+    return f"{opened} connections"
+
+
+def run_warmup(session_factory=None, engine=None, async_engine=None, loop=None):
+    """Run all warm-up steps; marks the worker ready when they succeed.
+
+    ``loop`` is the worker's event loop, on which the async pool is primed.
+    """
+    session_factory = session_factory or database.SessionLocal
+    engine = engine or database.engine
+    async_engine = async_engine or database.async_engine
+    total_start = time.perf_counter()
+
+    _timed("db_pool", lambda: _prime_pool(engine))
+    _timed("async_db_pool", lambda: _prime_async_pool(async_engine, loop))
+
+    db = session_factory()
+    try:
+        snap = _timed("catalog_snapshot", lambda: snapshot.get_snapshot(db))
+        _timed("peer_index", lambda: f"{peers.build(db)} students")
+    finally:
+        db.close()
+    _timed("goal_role_fit", lambda: f"{snap.touch('role_fit')} bytes")
+    _timed(
+        "similarity",
+        lambda: f"{snap.touch('cluster_match', 'tech_overlap', 'prereq_mask', 'relevance')} bytes",
+    )
+
+    logger.info("warm-up finished in %.1f ms", (time.perf_counter() - total_start) * 1000)
+    mark_ready()
+    _fill_leaderboard(session_factory)
+
+
+def _fill_leaderboard(session_factory):
+    """Rebuild the leaderboard once the worker is serving, unless another worker claimed it.
+
+    A failure is logged and releases the claim, so the next worker to start
+    warm-up tries again.
+    """
+    if not leaderboard.claim_rebuild():
+        logger.info("leaderboard rebuild claimed by another worker")
+        return
+    db = session_factory()
+    try:
+        _timed("leaderboard", lambda: f"{service.rebuild_leaderboard(db)} students")
+    except Exception as e:
+        leaderboard.release_rebuild()
+        logger.warning("leaderboard rebuild failed: %s", e)
+    finally:
+        db.close()
+
+
+def _run_with_retries(session_factory=None, engine=None, async_engine=None, loop=None):
+    for attempt in range(1, WARMUP_ATTEMPTS + 1):
+        try:
+            run_warmup(session_factory, engine, async_engine, loop)
+            return
+        except Exception as e:
+            with _state_lock:
+                _state["error"] = f"{type(e).__name__}: {e}"
+            logger.warning("warm-up attempt %d/%d failed: %s", attempt, WARMUP_ATTEMPTS, e)
+            if attempt < WARMUP_ATTEMPTS:
+                time.sleep(WARMUP_RETRY_DELAY_SECONDS)
+    logger.error("warm-up failed; worker stays not ready")
+
+
+def start(session_factory=None, engine=None, async_engine=None) -> Optional[threading.Thread]:
+    """Start warm-up in a daemon thread (or mark ready at once if SKIP_WARMUP is set).
+
+    Called from the app lifespan, so the running event loop is the one the
+    async routes use.
+    """
+    reset()
+    if os.getenv("SKIP_WARMUP", "false").lower() == "true":
+        mark_ready()
+        return None
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    thread = threading.Thread(
+        target=_run_with_retries, args=(session_factory, engine, async_engine, loop), name="warmup", daemon=True
+    )
+    thread.start()
+    return thread
@@ -0,0 +1,92 @@
+"""Read-route load test.
+
+Sends requests to the read-heavy endpoints from a fixed number of concurrent
+clients for a fixed time and prints throughput and latency percentiles per
+endpoint. No results are recorded in the repository; they depend on the
+database and the hardware. To compare two revisions (such as the sync and
+async read routes), start the API against the same PostgreSQL data with the
+same worker count on each revision, e.g.
+
+    uvicorn app.main:app --workers 2
+
+and run
+
+    python load_test.py --url http://localhost:8000 --concurrency 200 --duration 30
+
+Course ids are taken from GET /courses/ unless given with --course-ids.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import defaultdict
+
+import httpx
+
+
+ENDPOINTS = [
+    "/courses/?limit=50",
+    "/courses/{id}",
+    "/courses/{id}/stats",
+    "/courses/{id}/reviews?page=1&page_size=10",
+    "/reviews/course/{id}",
+    "/skills/",
+    "/career-goals/",
+]
+
+
+async def _client(http, course_ids, deadline, latencies, errors):
+    while time.perf_counter() < deadline:
+        endpoint = random.choice(ENDPOINTS)
+        path = endpoint.replace("{id}", str(random.choice(course_ids)))
+        start = time.perf_counter()
+        try:
+            response = await http.get(path)
+            ok = response.status_code < 500
+        except httpx.HTTPError:
+            ok = False
+        elapsed = time.perf_counter() - start
+        if ok:
+            latencies[endpoint].append(elapsed)
+        else:
+            errors[endpoint] += 1
+
+
+async def run(url: str, concurrency: int, duration: float, course_ids):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as http:
+        if not course_ids:
+            course_ids = [c["id"] for c in (await http.get("/courses/?limit=500")).json()]
+        if not course_ids:
+            raise SystemExit("no courses to request; seed the database or pass --course-ids")
+
+        latencies, errors = defaultdict(list), defaultdict(int)
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*[
+            _client(http, course_ids, deadline, latencies, errors) for _ in range(concurrency)
+        ])
+
+    total = sum(len(v) for v in latencies.values())
+    print(f"{total} requests in {duration:.0f}s with {concurrency} clients: {total / duration:.1f} req/s")
+    print(f"{'endpoint':<44}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+    for endpoint in sorted(set(latencies) | set(errors)):
+        values = sorted(latencies[endpoint])
+        p50 = statistics.median(values) * 1000 if values else float("nan")
+        p95 = values[min(len(values) - 1, int(len(values) * 0.95))] * 1000 if values else float("nan")
+        print(f"{endpoint:<44}{len(values):>8}{p50:>10.1f}{p95:>10.1f}{errors[endpoint]:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--course-ids", type=int, nargs="*", default=None)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.concurrency, args.duration, args.course_ids))
+
+
+if __name__ == "__main__":
+    main()
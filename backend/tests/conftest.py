@@ -4,19 +4,26 @@ Pytest configuration and shared fixtures for all tests.
 import os
 import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 from fastapi.testclient import TestClient
 
-from app.database import Base, get_db
+from app.database import Base, get_async_db, get_db
 
 # Import app but prevent seed_database from running during tests
 import os
+import tempfile
 os.environ['SKIP_SEED'] = 'true'
+os.environ['SKIP_WARMUP'] = 'true'
+os.environ['SKIP_RECOMMENDATION_QUEUE'] = 'true'
+# Keep recommendation catalog snapshots out of the shared temp directory
+os.environ.setdefault('RECOMMENDER_SNAPSHOT_DIR', tempfile.mkdtemp(prefix='recommender_snapshot_'))
 
 from app.main import app
-from app import models
+from app import course_details, models, recompute_queue
 from app.auth_utils import get_password_hash, create_access_token
+from app.recommendation_engine import leaderboard, peers, review_stats, snapshot
 
 
 # Test database configuration
@@ -30,19 +37,28 @@ TEST_DB_PORT = os.getenv("TEST_DB_PORT", "5432")
 USE_SQLITE = os.getenv("USE_SQLITE", "true").lower() == "true"
 
 if USE_SQLITE:
-    # SQLite in-memory database for fast tests
-    SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+    # SQLite in-memory database for fast tests. Shared-cache mode lets the
+    # async routes' aiosqlite connections see the same database, which lives
+    # as long as the sync engine's single connection.
+    SQLITE_MEMORY_DB = f"file:{TEST_DB_NAME}?mode=memory&cache=shared&uri=true"
+    SQLALCHEMY_DATABASE_URL = f"sqlite:///{SQLITE_MEMORY_DB}"
     engine = create_engine(
         SQLALCHEMY_DATABASE_URL,
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{SQLITE_MEMORY_DB}", poolclass=NullPool)
 else:
     # PostgreSQL test database
     SQLALCHEMY_DATABASE_URL = f"postgresql://{TEST_DB_USER}:{TEST_DB_PASSWORD}@{TEST_DB_HOST}:{TEST_DB_PORT}/{TEST_DB_NAME}"
     engine = create_engine(SQLALCHEMY_DATABASE_URL)
+    async_engine = create_async_engine(
+        f"postgresql+asyncpg://{TEST_DB_USER}:{TEST_DB_PASSWORD}@{TEST_DB_HOST}:{TEST_DB_PORT}/{TEST_DB_NAME}",
+        poolclass=NullPool,
+    )
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 
 @pytest.fixture(scope="function")
@@ -53,6 +69,13 @@ def db_session():
     """
     # Create all tables
     Base.metadata.create_all(bind=engine)
+    # Tables were recreated, so any catalog snapshot from a previous test is stale
+    snapshot.invalidate()
+    review_stats.clear()
+    leaderboard.release_rebuild()
+    peers.clear()
+    recompute_queue.reset()
+    course_details.clear()
     
     # Create session
     session = TestingSessionLocal()
@@ -76,7 +99,13 @@ def client(db_session: Session):
         finally:
             pass  # Don't close session here, handled by fixture
     
+    async def override_get_async_db():
+        # Async routes read what the test committed through db_session
+        async with TestingAsyncSessionLocal() as db:
+            yield db
+    
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     
     with TestClient(app) as test_client:
         yield test_client
@@ -3,9 +3,13 @@ REST API Tests for Career Goals Endpoints
 
 Tests:
 - GET /career-goals/
+- one joined query per catalog version, ETag / If-None-Match revalidation
 """
 import pytest
 from fastapi import status
+from sqlalchemy import event
+
+from .conftest import async_engine
 
 
 @pytest.mark.api
@@ -55,3 +59,68 @@ class TestGetCareerGoals:
         assert len(goal["technical_skills"]) >= 1
         assert len(goal["human_skills"]) >= 1
 
+
+@pytest.mark.api
+class TestCareerGoalCatalogCache:
+    """Test the cached career-goal catalog."""
+
+    @pytest.fixture
+    def goals_with_skills(self, db_session, test_career_goal, test_skill_technical, test_skill_human):
+        from app import models
+
+        db_session.add_all([
+            models.CareerGoal(name=test_career_goal.name, description="duplicate"),
+            models.CareerGoalTechnicalSkill(career_goal_id=test_career_goal.id, skill_id=test_skill_technical.id),
+            models.CareerGoalHumanSkill(career_goal_id=test_career_goal.id, skill_id=test_skill_human.id),
+        ])
+        db_session.commit()
+        return test_career_goal
+
+    @staticmethod
+    def count_queries(call):
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+        try:
+            call()
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", listener)
+        return len(statements)
+
+    def test_one_query_then_cached(self, client, goals_with_skills):
+        """Test that the catalog is built with one query and then served from memory."""
+        responses = []
+
+        assert self.count_queries(lambda: responses.append(client.get("/career-goals/"))) == 1
+        assert self.count_queries(lambda: responses.append(client.get("/career-goals/"))) == 0
+        assert responses[0].json() == responses[1].json() == [{
+            "id": goals_with_skills.id,
+            "name": goals_with_skills.name,
+            "description": goals_with_skills.description,
+            "technical_skills": ["Python"],
+            "human_skills": ["Communication"],
+        }]
+
+    def test_revalidation_returns_304(self, client, goals_with_skills):
+        """Test the ETag and Cache-Control headers and a 304 on a matching If-None-Match."""
+        first = client.get("/career-goals/")
+        etag = first.headers["etag"]
+
+        response = client.get("/career-goals/", headers={"If-None-Match": etag})
+
+        assert first.headers["cache-control"] == "public, no-cache"
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+
+    def test_catalog_write_changes_etag(self, client, db_session, goals_with_skills):
+        """Test that renaming a goal rebuilds the catalog with a new ETag."""
+        etag = client.get("/career-goals/").headers["etag"]
+
+        goals_with_skills.name = "Renamed Goal"
+        db_session.commit()
+        response = client.get("/career-goals/", headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] != etag
+        assert [g["name"] for g in response.json()] == ["Renamed Goal", "Software Engineer"]
@@ -5,6 +5,7 @@ Tests:
 - GET /courses/
 - GET /courses/{course_id}
 - GET /courses/{course_id}/stats
+- GET /courses/stats?ids=
 - GET /courses/{course_id}/reviews
 - POST /courses/
 - PUT /courses/{course_id}
@@ -128,6 +129,55 @@ class TestGetCourseStats:
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
 
+@pytest.mark.api
+class TestGetCoursesStats:
+    """Test GET /courses/stats bulk endpoint."""
+
+    def test_bulk_stats(self, client, db_session, test_course, test_student):
+        """Test stats for several courses in request order, unknown ids left out."""
+        from app import models
+
+        other = models.Course(name="Course Without Reviews")
+        db_session.add(other)
+        db_session.add_all([
+            models.CourseReview(
+                student_id=test_student.id, course_id=test_course.id, final_score=score,
+                industry_relevance_rating=rating, instructor_rating=rating, useful_learning_rating=rating,
+            )
+            for score, rating in ((9.0, 5), (6.0, 2), (7.5, 4))
+        ])
+        db_session.commit()
+
+        response = client.get(f"/courses/stats?ids={other.id},99999,{test_course.id},{other.id}")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == [
+            {
+                "course_id": other.id, "review_count": 0, "avg_final_score": 0.0,
+                "avg_industry_relevance": 0.0, "avg_instructor_quality": 0.0, "avg_useful_learning": 0.0,
+            },
+            {
+                "course_id": test_course.id, "review_count": 3, "avg_final_score": 7.5,
+                "avg_industry_relevance": 3.67, "avg_instructor_quality": 3.67, "avg_useful_learning": 3.67,
+            },
+        ]
+
+    def test_bulk_stats_invalid_ids(self, client):
+        """Test that non-integer ids are rejected."""
+        response = client.get("/courses/stats?ids=1,abc")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_bulk_stats_too_many_ids(self, client):
+        """Test the per-request id limit."""
+        from app.routes.courses import COURSE_STATS_MAX_IDS
+
+        ids = ",".join(str(i) for i in range(COURSE_STATS_MAX_IDS + 1))
+        response = client.get(f"/courses/stats?ids={ids}")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
 @pytest.mark.api
 class TestGetCourseReviews:
     """Test GET /courses/{course_id}/reviews endpoint."""
@@ -260,3 +260,140 @@ class TestDeleteStudent:
         # Should return 404 or 200 with error message
         assert response.status_code in [status.HTTP_404_NOT_FOUND, status.HTTP_200_OK]
 
+
+
+@pytest.fixture
+def capture_statements(db_session):
+    """Run a callable and return the SQL statements it issued."""
+    from sqlalchemy import event
+
+    def capture(call):
+        statements = []
+        engine = db_session.get_bind()
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            call()
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+        return statements
+
+    return capture
+
+
+@pytest.fixture
+def count_selects(capture_statements):
+    """Run a callable and return the number of SELECT statements it issued."""
+    def count(call):
+        return sum(1 for s in capture_statements(call) if s.lstrip().upper().startswith("SELECT"))
+
+    return count
+
+
+@pytest.fixture
+def make_profiles(db_session, test_career_goal, test_skill_human, test_course):
+    """Create students with a career goal, a human skill and a completed course."""
+    from app import models
+
+    made = []
+
+    def make(n):
+        students = [
+            models.Student(name=f"profile_{len(made) + i}", hashed_password="x", career_goal_id=test_career_goal.id)
+            for i in range(n)
+        ]
+        made.extend(students)
+        for student in students:
+            student.human_skills.append(test_skill_human)
+            student.student_courses.append(models.StudentCourse(course_id=test_course.id, status="completed"))
+        db_session.add_all(students)
+        db_session.commit()
+        db_session.expire_all()
+        return students
+
+    return make
+
+
+@pytest.mark.api
+class TestStudentQueryCount:
+    """Test that student responses load their relationships eagerly."""
+
+    def test_listing_query_count_is_constant(self, client, make_profiles, count_selects, test_career_goal):
+        """Test that a page of 12 students takes as many queries as a page of 2."""
+        make_profiles(2)
+        small = count_selects(lambda: client.get("/students/"))
+        make_profiles(10)
+        response = client.get("/students/")
+        large = count_selects(lambda: client.get("/students/"))
+
+        assert large == small
+        assert len(response.json()) == 12
+        assert all(s["career_goal"]["id"] == test_career_goal.id for s in response.json())
+        assert all(len(s["human_skill_ids"]) == 1 and len(s["courses_taken"]) == 1 for s in response.json())
+
+    def test_detail_query_count(self, client, make_profiles, count_selects, test_course):
+        """Test that one student is loaded with four queries."""
+        student_id = make_profiles(1)[0].id
+
+        assert count_selects(lambda: client.get(f"/students/{student_id}")) == 4
+        assert client.get(f"/students/{student_id}").json()["courses_taken"] == [test_course.id]
+
+
+@pytest.mark.api
+class TestProfileSaveStatements:
+    """Test that profile saves write human skills and courses in bulk."""
+
+    @pytest.fixture
+    def catalog_ids(self, db_session):
+        """Ids of 12 human skills and 12 courses."""
+        from app import models
+
+        skills = [models.Skill(name=f"Human Skill {i}", type="human") for i in range(12)]
+        courses = [models.Course(name=f"Profile Course {i}") for i in range(12)]
+        db_session.add_all(skills + courses)
+        db_session.commit()
+        return [s.id for s in skills], [c.id for c in courses]
+
+    def save(self, client, student, skill_ids, course_ids):
+        return client.put(f"/students/{student.id}", json={
+            "name": student.name, "human_skill_ids": skill_ids, "courses_taken": course_ids,
+        })
+
+    def test_statement_count_is_constant(self, client, db_session, catalog_ids, capture_statements):
+        """Test that saving 10 skills and courses takes as many statements as saving 2."""
+        from app import models
+
+        skill_ids, course_ids = catalog_ids
+        students = [models.Student(name=f"saver_{i}", hashed_password="x") for i in range(2)]
+        db_session.add_all(students)
+        db_session.commit()
+        small_student, large_student = students
+
+        # Disjoint courses, so both saves create their completion counters
+        small = capture_statements(lambda: self.save(client, small_student, skill_ids[:2], course_ids[:2]))
+        large = capture_statements(lambda: self.save(client, large_student, skill_ids[2:], course_ids[2:]))
+
+        assert len(large) == len(small)
+        assert not any("WHERE skills.id = ?" in s for s in large)
+
+    def test_skill_diff(self, client, test_student, catalog_ids):
+        """Test that unknown skill ids are dropped and the stored set follows each save."""
+        skill_ids, _ = catalog_ids
+
+        self.save(client, test_student, skill_ids[:3] + [99999], [])
+        response = self.save(client, test_student, skill_ids[1:4], [])
+
+        assert response.status_code == status.HTTP_200_OK
+        assert sorted(response.json()["human_skill_ids"]) == skill_ids[1:4]
+
+    def test_create_with_skills(self, client, catalog_ids):
+        """Test that POST /students/ stores the submitted skills and courses."""
+        skill_ids, course_ids = catalog_ids
+        response = client.post("/students/", json={
+            "name": "bulk_student", "password": "secret123",
+            "human_skill_ids": skill_ids[:5], "courses_taken": course_ids[:4],
+        })
+
+        assert response.status_code == status.HTTP_200_OK
+        assert sorted(response.json()["human_skill_ids"]) == skill_ids[:5]
+        assert sorted(response.json()["courses_taken"]) == course_ids[:4]
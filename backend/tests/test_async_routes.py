@@ -0,0 +1,113 @@
+"""
+Tests for the async read routes.
+
+Tests:
+- read routes are coroutines using the async session
+- relationships serialized by those routes are loaded eagerly
+"""
+import inspect
+
+import pytest
+from fastapi import status
+
+from app import models
+from app.database import get_async_db
+from app.routes import career_goals, course_reviews, courses, skills
+
+ASYNC_READ_ROUTES = {
+    ("GET", "/courses/"),
+    ("GET", "/courses/{course_id}"),
+    ("GET", "/courses/{course_id}/stats"),
+    ("GET", "/courses/stats"),
+    ("GET", "/courses/{course_id}/reviews"),
+    ("GET", "/reviews/"),
+    ("GET", "/reviews/course/{course_id}"),
+    ("GET", "/reviews/student/{student_id}"),
+    ("GET", "/skills/"),
+    ("GET", "/career-goals/"),
+}
+
+
+@pytest.fixture
+def linked_course(db_session, test_course, test_student, test_skill_technical, test_skill_human):
+    """A course with a prerequisite, a skill, a cluster and a review."""
+    prereq = models.Course(name="Async Prerequisite")
+    cluster = models.Cluster(name="Async Cluster")
+    goal = models.CareerGoal(name="Async Goal")
+    db_session.add_all([prereq, cluster, goal])
+    db_session.commit()
+    db_session.add_all([
+        models.CoursePrerequisite(course_id=test_course.id, required_course_id=prereq.id),
+        models.CourseSkill(course_id=test_course.id, skill_id=test_skill_technical.id, relevance_score=0.5),
+        models.CourseCluster(course_id=test_course.id, cluster_id=cluster.id),
+        models.CareerGoalTechnicalSkill(career_goal_id=goal.id, skill_id=test_skill_technical.id),
+        models.CareerGoalHumanSkill(career_goal_id=goal.id, skill_id=test_skill_human.id),
+        models.CourseReview(
+            student_id=test_student.id, course_id=test_course.id, final_score=8.0,
+            industry_relevance_rating=4, instructor_rating=4, useful_learning_rating=4,
+        ),
+    ])
+    test_student.career_goal_id = goal.id
+    db_session.commit()
+    return {"course": test_course, "prereq": prereq, "student": test_student}
+
+
+@pytest.mark.unit
+class TestAsyncRouteDeclarations:
+    """Test which routes run on the event loop."""
+
+    def test_read_routes_are_async(self):
+        """Test that the read-heavy routes are coroutines depending on get_async_db."""
+        found = set()
+        routes = [r for module in (courses, course_reviews, skills, career_goals) for r in module.router.routes]
+        for route in routes:
+            for method in getattr(route, "methods", ()):
+                if (method, route.path) in ASYNC_READ_ROUTES:
+                    found.add((method, route.path))
+                    assert inspect.iscoroutinefunction(route.endpoint), route.path
+                    assert any(dep.call is get_async_db for dep in route.dependant.dependencies), route.path
+
+        assert found == ASYNC_READ_ROUTES
+
+
+@pytest.mark.api
+class TestEagerRelationships:
+    """Test responses that include relationships."""
+
+    def test_course_details(self, client, linked_course):
+        """Test prerequisites, skills and clusters of a course."""
+        response = client.get(f"/courses/{linked_course['course'].id}")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["prerequisites"] == [{"id": linked_course["prereq"].id, "name": "Async Prerequisite"}]
+        assert [s["name"] for s in data["skills"]] == ["Python"]
+        assert [c["name"] for c in data["clusters"]] == ["Async Cluster"]
+
+    def test_reviews_include_student_and_course(self, client, linked_course):
+        """Test the nested student and course of each review."""
+        response = client.get(f"/reviews/student/{linked_course['student'].id}")
+
+        assert response.status_code == status.HTTP_200_OK
+        review = response.json()[0]
+        assert review["student"]["career_goal"]["name"] == "Async Goal"
+        assert review["course"]["name"] == linked_course["course"].name
+
+    def test_course_reviews_page(self, client, linked_course):
+        """Test the student names of a course's reviews."""
+        response = client.get(f"/courses/{linked_course['course'].id}/reviews")
+
+        assert response.json()["total"] == 1
+        assert response.json()["items"][0]["student_name"] == "test_student"
+
+    def test_career_goal_skill_names(self, client, linked_course):
+        """Test the skill names of each career goal."""
+        response = client.get("/career-goals/")
+
+        assert response.json() == [{
+            "id": linked_course["student"].career_goal_id,
+            "name": "Async Goal",
+            "description": None,
+            "technical_skills": ["Python"],
+            "human_skills": ["Communication"],
+        }]
@@ -0,0 +1,121 @@
+"""
+Tests for prerequisite-blocked courses in recommendation responses.
+
+Tests:
+- blocked_courses ordered by missing prerequisites and capped by blocked_limit
+- blocked courses only built when requested
+- GET /recommendations/blocked-courses pagination
+- blocked_limit bounded like the paginated endpoint
+"""
+import pytest
+from fastapi import status
+
+from app import crud, models
+from app.recommendation_engine import config, service
+
+
+@pytest.fixture
+def prereq_chain(db_session):
+    """B requires A; C requires A and B; D requires E."""
+    a, b, c, d, e = [models.Course(name=f"Chain {name}") for name in "ABCDE"]
+    db_session.add_all([a, b, c, d, e])
+    db_session.commit()
+    db_session.add_all([
+        models.CoursePrerequisite(course_id=b.id, required_course_id=a.id),
+        models.CoursePrerequisite(course_id=c.id, required_course_id=a.id),
+        models.CoursePrerequisite(course_id=c.id, required_course_id=b.id),
+        models.CoursePrerequisite(course_id=d.id, required_course_id=e.id),
+    ])
+    db_session.commit()
+    service.clear_caches()
+    return {"A": a, "B": b, "C": c, "D": d, "E": e}
+
+
+@pytest.mark.unit
+class TestBlockedCourses:
+    """Test blocked_courses returned by recommend_courses."""
+
+    def test_ordered_by_missing_prereqs(self, db_session, test_student, test_career_goal, prereq_chain):
+        """Test that courses closest to unlocking come first."""
+        result = service.recommend_courses(db_session, test_student.id, test_career_goal.id)
+
+        assert [b["course_id"] for b in result["blocked_courses"]] == [
+            prereq_chain["B"].id, prereq_chain["D"].id, prereq_chain["C"].id,
+        ]
+        assert result["blocked_courses"][2]["missing_prereqs"] == [prereq_chain["A"].id, prereq_chain["B"].id]
+        assert result["blocked_total"] == 3
+
+    def test_limit_caps_list(self, db_session, test_student, test_career_goal, prereq_chain):
+        """Test that blocked_limit caps the list but not the total."""
+        result = service.recommend_courses(db_session, test_student.id, test_career_goal.id, blocked_limit=1)
+
+        assert [b["course_id"] for b in result["blocked_courses"]] == [prereq_chain["B"].id]
+        assert result["blocked_total"] == 3
+
+    def test_zero_limit_skips_blocked_list(self, db_session, test_student, test_career_goal, prereq_chain):
+        """Test that blocked_limit=0 never orders or explains the blocked courses."""
+        result = service.recommend_courses(db_session, test_student.id, test_career_goal.id, blocked_limit=0)
+
+        assert result["blocked_courses"] == []
+        assert result["blocked_total"] == 3
+        components = next(iter(service._components_cache._data.values()))
+        assert components._blocked is None
+
+    def test_completed_prereq_moves_course_up(self, db_session, test_student, test_career_goal, prereq_chain):
+        """Test that completing A unlocks B and leaves C one prerequisite away."""
+        crud.add_student_course(db_session, test_student.id, prereq_chain["A"].id)
+
+        result = service.recommend_courses(db_session, test_student.id, test_career_goal.id)
+
+        assert [b["course_id"] for b in result["blocked_courses"]] == [prereq_chain["C"].id, prereq_chain["D"].id]
+        assert result["blocked_courses"][0]["missing_prereqs"] == [prereq_chain["B"].id]
+        assert prereq_chain["B"].id in [r["course_id"] for r in result["recommendations"]]
+
+    def test_not_enforced(self, db_session, test_student, test_career_goal, prereq_chain):
+        """Test that blocked fields are None when prerequisites are not enforced."""
+        result = service.recommend_courses(db_session, test_student.id, test_career_goal.id, enforce_prereqs=False)
+
+        assert result["blocked_courses"] is None
+        assert result["blocked_total"] is None
+
+
+@pytest.mark.api
+class TestBlockedCoursesEndpoint:
+    """Test GET /recommendations/blocked-courses."""
+
+    def test_pagination(self, authenticated_client, prereq_chain):
+        """Test that pages follow the closest-to-unlocking order."""
+        first = authenticated_client.get("/recommendations/blocked-courses?limit=2").json()
+        second = authenticated_client.get("/recommendations/blocked-courses?limit=2&offset=2").json()
+
+        assert first["total"] == 3
+        assert [b["course_id"] for b in first["blocked_courses"]] == [prereq_chain["B"].id, prereq_chain["D"].id]
+        assert [b["course_id"] for b in second["blocked_courses"]] == [prereq_chain["C"].id]
+
+    def test_blocked_limit_parameter(self, authenticated_client, test_career_goal, prereq_chain):
+        """Test blocked_limit on the recommendation endpoint."""
+        response = authenticated_client.get(
+            f"/recommendations/courses/for-goal/{test_career_goal.id}?blocked_limit=1"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()["blocked_courses"]) == 1
+        assert response.json()["blocked_total"] == 3
+
+    @pytest.mark.parametrize("url", [
+        "/recommendations/courses/for-goal/{goal}?blocked_limit={limit}",
+        "/recommendations/courses?blocked_limit={limit}",
+        "/recommendations/blocked-courses?limit={limit}",
+    ])
+    def test_oversized_limit_rejected(self, authenticated_client, test_career_goal, url):
+        """Test that the inline list and the pages share one upper bound."""
+        limit = config.BLOCKED_COURSES_MAX_LIMIT + 1
+        response = authenticated_client.get(url.format(goal=test_career_goal.id, limit=limit))
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_requires_auth(self, client):
+        """Test that the endpoint requires authentication."""
+        response = client.get("/recommendations/blocked-courses")
+
+        assert response.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
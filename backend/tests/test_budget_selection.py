@@ -0,0 +1,204 @@
+"""
+Tests for credit/workload-budgeted recommendation selection.
+
+Tests:
+- bounded knapsack DP against brute force
+- budget_credits / budget_workload in recommend_courses
+- budget parameters on the recommendation endpoints
+"""
+import itertools
+import random
+import time
+
+import numpy as np
+import pytest
+from fastapi import status
+
+from app import models
+from app.recommendation_engine import service
+
+
+def _brute_force(values, weights, k):
+    best = 0.0
+    for r in range(1, k + 1):
+        for combo in itertools.combinations(range(len(values)), r):
+            if all(w[list(combo)].sum() <= cap for w, cap in weights):
+                best = max(best, values[list(combo)].sum())
+    return best
+
+
+@pytest.fixture
+def budget_catalog(db_session, test_career_goal):
+    """Goal skill taught by five courses with different credits and workloads."""
+    skill = models.Skill(name="Budget Skill", type="technical")
+    specs = [  # name, relevance, credits, workload
+        ("Heavy Hitter", 1.0, 6.0, 12),
+        ("Solid A", 0.8, 3.0, 6),
+        ("Solid B", 0.75, 3.0, 4),
+        ("Light", 0.5, 1.5, 2),
+        ("Unknown Credits", 0.9, None, 3),
+    ]
+    courses = [models.Course(name=name, credits=credits, workload=workload) for name, _, credits, workload in specs]
+    db_session.add_all([skill, *courses])
+    db_session.commit()
+    db_session.add(models.CareerGoalTechnicalSkill(career_goal_id=test_career_goal.id, skill_id=skill.id))
+    db_session.add_all([
+        models.CourseSkill(course_id=course.id, skill_id=skill.id, relevance_score=spec[1])
+        for course, spec in zip(courses, specs)
+    ])
+    db_session.commit()
+    return {spec[0]: course for course, spec in zip(courses, specs)}
+
+
+@pytest.mark.unit
+class TestBudgetKnapsack:
+    """Test the bounded knapsack DP."""
+
+    def test_prefers_two_mid_courses_over_one_large(self):
+        """Test the textbook case where greedy by score would be wrong."""
+        values = np.array([10.0, 7.0, 6.0])
+        credits = np.array([5, 3, 3])
+
+        assert service._budget_knapsack(values, [(credits, 6)], k=3) == [1, 2]
+
+    def test_respects_k(self):
+        """Test that at most k items are picked."""
+        values = np.array([1.0, 1.0, 1.0, 1.0])
+
+        assert len(service._budget_knapsack(values, [(np.array([1, 1, 1, 1]), 10)], k=2)) == 2
+
+    def test_matches_brute_force(self):
+        """Test optimality on random instances with two budgets."""
+        rng = random.Random(1)
+        for _ in range(30):
+            n = rng.randint(1, 8)
+            values = np.array([rng.random() for _ in range(n)])
+            weights = [
+                (np.array([rng.randint(0, 6) for _ in range(n)]), rng.randint(0, 12)),
+                (np.array([rng.randint(1, 5) for _ in range(n)]), rng.randint(1, 10)),
+            ]
+            k = rng.randint(1, n)
+
+            picked = service._budget_knapsack(values, weights, k)
+
+            assert len(picked) <= k
+            assert all(w[picked].sum() <= cap for w, cap in weights)
+            assert values[picked].sum() == pytest.approx(_brute_force(values, weights, k))
+
+    def test_fast_enough_for_request_path(self):
+        """Test a realistic top-N DP with both budgets."""
+        rng = np.random.default_rng(0)
+        values = rng.random(50)
+        weights = [(rng.integers(2, 13, 50), 60), (rng.integers(2, 15, 50), 40)]
+
+        start = time.perf_counter()
+        service._budget_knapsack(values, weights, k=10)
+
+        assert time.perf_counter() - start < 0.5
+
+    def test_large_request_stays_within_cell_cap(self):
+        """Test that k=50 with both maximum budgets is filled greedily, not by a huge DP."""
+        rng = np.random.default_rng(0)
+        values = np.sort(rng.random(50))[::-1]
+        weights = [(rng.integers(2, 13, 50), 120), (rng.integers(2, 15, 50), 168)]
+        dims = [min(cap, int(w.sum())) + 1 for w, cap in weights]
+        assert 50 * 51 * dims[0] * dims[1] > service.config.KNAPSACK_MAX_CELLS
+
+        start = time.perf_counter()
+        picked = service._budget_knapsack(values, weights, k=50)
+
+        assert time.perf_counter() - start < 0.5
+        assert picked == service._budget_greedy(50, weights, 50)
+        assert all(w[picked].sum() <= cap for w, cap in weights)
+
+    def test_greedy_takes_best_ranked_that_fit(self):
+        """Test that the greedy fallback skips items that no longer fit."""
+        weights = [(np.array([5, 3, 3, 1]), 6)]
+
+        assert service._budget_greedy(4, weights, k=3) == [0, 3]
+
+
+@pytest.mark.unit
+class TestBudgetedRecommendations:
+    """Test budget_credits / budget_workload in recommend_courses."""
+
+    def test_credit_budget(self, db_session, test_student, test_career_goal, budget_catalog):
+        """Test that the credit budget picks the best-scoring subset that fits."""
+        result = service.recommend_courses(
+            db_session, test_student.id, test_career_goal.id, budget_credits=6,
+        )
+
+        names = {r["name"] for r in result["recommendations"]}
+        assert names == {"Solid A", "Solid B"}
+        assert result["budget_used"]["credits"] == pytest.approx(6.0)
+
+    def test_courses_without_credits_are_skipped(self, db_session, test_student, test_career_goal, budget_catalog):
+        """Test that a credit budget leaves out courses with unknown credits."""
+        result = service.recommend_courses(
+            db_session, test_student.id, test_career_goal.id, budget_credits=100,
+        )
+
+        assert "Unknown Credits" not in {r["name"] for r in result["recommendations"]}
+
+    def test_both_budgets(self, db_session, test_student, test_career_goal, budget_catalog):
+        """Test that workload and credits are limited together."""
+        result = service.recommend_courses(
+            db_session, test_student.id, test_career_goal.id, budget_credits=6, budget_workload=8,
+        )
+
+        assert result["budget_used"]["credits"] <= 6
+        assert result["budget_used"]["workload"] <= 8
+        assert {r["name"] for r in result["recommendations"]} == {"Solid A", "Light"}
+
+    def test_results_keep_ranking_order(self, db_session, test_student, test_career_goal, budget_catalog):
+        """Test that the picked courses are returned best first."""
+        result = service.recommend_courses(
+            db_session, test_student.id, test_career_goal.id, budget_workload=100,
+        )
+
+        scores = [r["final_score"] for r in result["recommendations"]]
+        assert scores == sorted(scores, reverse=True)
+        assert result["budget_used"] is not None
+
+
+@pytest.mark.api
+class TestBudgetEndpoint:
+    """Test budget parameters on GET /recommendations/courses/for-goal/{id}."""
+
+    def test_budget_credits_parameter(self, authenticated_client, test_career_goal, budget_catalog):
+        """Test that the endpoint applies the credit budget."""
+        response = authenticated_client.get(
+            f"/recommendations/courses/for-goal/{test_career_goal.id}?budget_credits=4.5"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["budget_used"]["credits"] <= 4.5
+        assert {r["name"] for r in data["recommendations"]} == {"Solid A", "Light"}
+
+    def test_non_positive_budget_rejected(self, authenticated_client, test_career_goal):
+        """Test that a zero budget returns 422."""
+        response = authenticated_client.get(
+            f"/recommendations/courses/for-goal/{test_career_goal.id}?budget_credits=0"
+        )
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    @pytest.mark.parametrize("query", [
+        "k=1000", "budget_credits=1000", "budget_workload=500",
+        "k=101&budget_credits=10", "k=101&budget_workload=10",
+    ])
+    def test_oversized_parameters_rejected(self, authenticated_client, test_career_goal, query):
+        """Test that k and the budgets are bounded, k more tightly when a budget is set."""
+        response = authenticated_client.get(f"/recommendations/courses/for-goal/{test_career_goal.id}?{query}")
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_largest_budget_request(self, authenticated_client, test_career_goal, budget_catalog):
+        """Test the largest accepted k with both maximum budgets."""
+        response = authenticated_client.get(
+            f"/recommendations/courses/for-goal/{test_career_goal.id}?k=100&budget_credits=60&budget_workload=168"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["budget_used"]["credits"] <= 60
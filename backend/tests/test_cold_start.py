@@ -0,0 +1,122 @@
+"""
+Tests for the cached cold-start ranking (students with no completed courses).
+
+Tests:
+- one ranking shared by every cold-start student of a goal
+- per-student readiness on top of the shared ranking
+- catalog writes invalidating the cached ranking
+- students with history and popularity-weighted requests bypassing the cache
+"""
+import pytest
+
+from app import crud, models
+from app.auth_utils import get_password_hash
+from app.recommendation_engine import service
+
+
+@pytest.fixture
+def goal_catalog(db_session):
+    """A goal requiring one technical and two human skills, and three courses."""
+    python = models.Skill(name="Python", type="technical")
+    teamwork = models.Skill(name="Teamwork", type="human")
+    speaking = models.Skill(name="Public Speaking", type="human")
+    goal = models.CareerGoal(name="Data Scientist")
+    courses = [models.Course(name=f"Cold Start Course {i}") for i in range(3)]
+    db_session.add_all([python, teamwork, speaking, goal, *courses])
+    db_session.commit()
+
+    db_session.add_all([
+        models.CareerGoalTechnicalSkill(career_goal_id=goal.id, skill_id=python.id),
+        models.CareerGoalHumanSkill(career_goal_id=goal.id, skill_id=teamwork.id),
+        models.CareerGoalHumanSkill(career_goal_id=goal.id, skill_id=speaking.id),
+        models.CourseSkill(course_id=courses[1].id, skill_id=python.id, relevance_score=0.9),
+        models.CourseSkill(course_id=courses[2].id, skill_id=python.id, relevance_score=0.4),
+    ])
+    db_session.commit()
+    service.clear_caches()
+    return {"goal": goal, "courses": courses, "teamwork": teamwork, "speaking": speaking}
+
+
+def _make_student(db_session, name, human_skills):
+    student = models.Student(name=name, hashed_password=get_password_hash("pass123"))
+    student.human_skills.extend(human_skills)
+    db_session.add(student)
+    db_session.commit()
+    return student
+
+
+@pytest.mark.unit
+class TestColdStartCache:
+    """Test recommend_courses serving cold-start students from the cache."""
+
+    def test_ranking_shared_between_students(self, db_session, goal_catalog):
+        """Test that the second cold-start student is served from the cache."""
+        goal = goal_catalog["goal"]
+        first = _make_student(db_session, "cold_a", [goal_catalog["teamwork"]])
+        second = _make_student(db_session, "cold_b", [goal_catalog["teamwork"], goal_catalog["speaking"]])
+
+        a = service.recommend_courses(db_session, first.id, goal.id)
+        b = service.recommend_courses(db_session, second.id, goal.id)
+
+        assert service._cold_start_cache.stats()["hits"] == 1
+        assert len(service._cold_start_cache) == 1
+        assert a["recommendations"] == b["recommendations"]
+        assert [r["course_id"] for r in a["recommendations"]][:2] == [
+            goal_catalog["courses"][1].id, goal_catalog["courses"][2].id,
+        ]
+        assert a["soft_readiness"] == pytest.approx(0.5)
+        assert b["soft_readiness"] == pytest.approx(1.0)
+        assert b["missing_human_skills"] == []
+
+    def test_cached_ranking_matches_uncached(self, db_session, goal_catalog):
+        """Test that a cache hit returns exactly what a fresh computation does."""
+        goal = goal_catalog["goal"]
+        student = _make_student(db_session, "cold_c", [goal_catalog["teamwork"]])
+
+        fresh = service.recommend_courses(db_session, student.id, goal.id, k=2)
+        cached = service.recommend_courses(db_session, student.id, goal.id, k=3)
+
+        assert cached["recommendations"][:2] == fresh["recommendations"]
+        assert len(cached["recommendations"]) == 3
+
+    def test_blocker_still_applies(self, db_session, goal_catalog):
+        """Test that a student without any required human skill is still blocked."""
+        student = _make_student(db_session, "cold_d", [])
+
+        result = service.recommend_courses(db_session, student.id, goal_catalog["goal"].id)
+
+        assert result["recommendations"] == []
+        assert result["blocked_reason"] is not None
+
+    def test_catalog_write_invalidates(self, db_session, goal_catalog):
+        """Test that a new course shows up after the snapshot generation changes."""
+        goal = goal_catalog["goal"]
+        student = _make_student(db_session, "cold_e", [goal_catalog["teamwork"]])
+        service.recommend_courses(db_session, student.id, goal.id)
+
+        course = models.Course(name="Brand New Course")
+        db_session.add(course)
+        db_session.commit()
+        result = service.recommend_courses(db_session, student.id, goal.id)
+
+        assert course.id in [r["course_id"] for r in result["recommendations"]]
+        assert service._cold_start_cache.stats()["hits"] == 0
+
+    def test_students_with_history_bypass_cache(self, db_session, goal_catalog):
+        """Test that only students without completed courses use the cache."""
+        goal = goal_catalog["goal"]
+        student = _make_student(db_session, "warm_a", [goal_catalog["teamwork"]])
+        crud.add_student_course(db_session, student.id, goal_catalog["courses"][0].id)
+
+        result = service.recommend_courses(db_session, student.id, goal.id)
+
+        assert len(service._cold_start_cache) == 0
+        assert goal_catalog["courses"][0].id not in [r["course_id"] for r in result["recommendations"]]
+
+    def test_popularity_weighted_requests_bypass_cache(self, db_session, goal_catalog):
+        """Test that rankings using the live popularity counters are not cached."""
+        student = _make_student(db_session, "cold_f", [goal_catalog["teamwork"]])
+
+        service.recommend_courses(db_session, student.id, goal_catalog["goal"].id, popularity_weight=0.5)
+
+        assert len(service._cold_start_cache) == 0
@@ -0,0 +1,162 @@
+"""
+Tests for the course detail loader and cache.
+
+Tests:
+- a detail miss takes two queries, a hit none
+- cached details are reloaded after course, prerequisite, skill and cluster writes
+- catalog writes committed by another worker reach the cache
+"""
+import pytest
+from fastapi import status
+from sqlalchemy import event, update
+
+from app import course_details, models
+from app.recommendation_engine import snapshot
+
+from .conftest import async_engine
+
+
+@pytest.fixture
+def detailed_course(db_session, test_course, test_skill_technical):
+    """test_course with a prerequisite, a skill and a cluster."""
+    prereq = models.Course(name="Detail Prerequisite")
+    cluster = models.Cluster(name="Detail Cluster")
+    db_session.add_all([prereq, cluster])
+    db_session.commit()
+    db_session.add_all([
+        models.CoursePrerequisite(course_id=test_course.id, required_course_id=prereq.id),
+        models.CourseSkill(course_id=test_course.id, skill_id=test_skill_technical.id, relevance_score=0.5),
+        models.CourseCluster(course_id=test_course.id, cluster_id=cluster.id),
+    ])
+    db_session.commit()
+    return {"course": test_course, "prereq": prereq, "cluster": cluster, "skill": test_skill_technical}
+
+
+@pytest.fixture
+def count_async_queries():
+    """Run a callable and return the number of statements the async engine executed."""
+    def count(call):
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+        try:
+            call()
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", listener)
+        return len(statements)
+
+    return count
+
+
+@pytest.mark.api
+class TestCourseDetailLoader:
+    """Test GET /courses/{course_id} query counts."""
+
+    def test_miss_takes_two_queries(self, client, detailed_course, count_async_queries):
+        """Test that the course, prerequisites, skills and clusters come from two queries."""
+        course_id = detailed_course["course"].id
+        responses = []
+
+        assert count_async_queries(lambda: responses.append(client.get(f"/courses/{course_id}"))) == 2
+        data = responses[0].json()
+        assert data["prerequisites"] == [{"id": detailed_course["prereq"].id, "name": "Detail Prerequisite"}]
+        assert [s["name"] for s in data["skills"]] == ["Python"]
+        assert [c["name"] for c in data["clusters"]] == ["Detail Cluster"]
+
+    def test_hit_takes_no_queries(self, client, detailed_course, count_async_queries):
+        """Test that a repeat view is served from the cache."""
+        course_id = detailed_course["course"].id
+        first = client.get(f"/courses/{course_id}").json()
+
+        responses = []
+        assert count_async_queries(lambda: responses.append(client.get(f"/courses/{course_id}"))) == 0
+        assert responses[0].json() == first
+
+    def test_unknown_course_not_cached(self, client, db_session):
+        """Test that a 404 is not cached."""
+        assert client.get("/courses/999").status_code == status.HTTP_404_NOT_FOUND
+        assert len(course_details._cache) == 0
+
+
+@pytest.mark.api
+class TestCourseDetailInvalidation:
+    """Test that catalog writes refresh the cached details."""
+
+    def test_course_update(self, client, detailed_course):
+        """Test that updating the course through the API refreshes its details."""
+        course = detailed_course["course"]
+        client.get(f"/courses/{course.id}")
+
+        client.put(f"/courses/{course.id}", json={"name": "Renamed Course", "description": None})
+
+        assert client.get(f"/courses/{course.id}").json()["name"] == "Renamed Course"
+
+    def test_prerequisite_rename(self, client, db_session, detailed_course):
+        """Test that renaming a prerequisite refreshes the courses that list it."""
+        course_id = detailed_course["course"].id
+        client.get(f"/courses/{course_id}")
+
+        detailed_course["prereq"].name = "Renamed Prerequisite"
+        db_session.commit()
+
+        assert client.get(f"/courses/{course_id}").json()["prerequisites"][0]["name"] == "Renamed Prerequisite"
+
+    def test_link_rows(self, client, db_session, detailed_course, test_skill_human):
+        """Test that adding a course skill or removing a prerequisite refreshes the course."""
+        course_id = detailed_course["course"].id
+        client.get(f"/courses/{course_id}")
+
+        db_session.add(models.CourseSkill(course_id=course_id, skill_id=test_skill_human.id, relevance_score=0.1))
+        db_session.delete(db_session.query(models.CoursePrerequisite).filter_by(course_id=course_id).one())
+        db_session.commit()
+
+        data = client.get(f"/courses/{course_id}").json()
+        assert sorted(s["name"] for s in data["skills"]) == ["Communication", "Python"]
+        assert data["prerequisites"] == []
+
+    def test_skill_and_cluster_rename(self, client, db_session, detailed_course):
+        """Test that renaming a skill or cluster refreshes the courses showing it."""
+        course_id = detailed_course["course"].id
+        client.get(f"/courses/{course_id}")
+
+        detailed_course["skill"].name = "Python 3"
+        detailed_course["cluster"].name = "Renamed Cluster"
+        db_session.commit()
+
+        data = client.get(f"/courses/{course_id}").json()
+        assert [s["name"] for s in data["skills"]] == ["Python 3"]
+        assert [c["name"] for c in data["clusters"]] == ["Renamed Cluster"]
+
+    def test_non_catalog_write_keeps_entry(self, client, db_session, detailed_course, test_student,
+                                           count_async_queries):
+        """Test that a write outside the catalog leaves the cached details valid."""
+        course_id = detailed_course["course"].id
+        client.get(f"/courses/{course_id}")
+
+        db_session.add(models.Rating(student_id=test_student.id, course_id=course_id, score=4))
+        db_session.commit()
+
+        assert count_async_queries(lambda: client.get(f"/courses/{course_id}")) == 0
+
+    def test_write_in_another_worker(self, client, db_session, detailed_course):
+        """Test that a rename committed elsewhere is picked up through the catalog version."""
+        course_id = detailed_course["course"].id
+        client.get(f"/courses/{course_id}")
+
+        # Another worker's commit: its session hooks only bump the shared catalog version
+        db_session.execute(update(models.Course).where(models.Course.id == course_id).values(name="Elsewhere"))
+        db_session.commit()
+        snapshot.invalidate()
+
+        assert client.get(f"/courses/{course_id}").json()["name"] == "Elsewhere"
+
+    def test_rollback_discards_pending(self, client, db_session, detailed_course):
+        """Test that rolled-back writes do not invalidate."""
+        course_id = detailed_course["course"].id
+        client.get(f"/courses/{course_id}")
+
+        detailed_course["cluster"].name = "Never Committed"
+        db_session.flush()
+        db_session.rollback()
+
+        assert course_id in course_details._cache._data
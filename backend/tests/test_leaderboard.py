@@ -0,0 +1,164 @@
+"""
+Tests for the shared "most recommended courses" leaderboard.
+
+Tests:
+- counting per scope (overall, goal, faculty, goal + faculty)
+- recording from recomputed recommendations and the warm-up rebuild
+- one rebuild claim per snapshot directory
+- GET /recommendations/leaderboard
+"""
+import pytest
+from fastapi import status
+
+from app import models
+from app.auth_utils import get_password_hash
+from app.recommendation_engine import config, leaderboard, service
+
+
+@pytest.fixture
+def goal_with_courses(db_session, test_student, test_career_goal):
+    """Three courses ranked for the test student's goal: 0 > 1 > 2."""
+    skill = models.Skill(name="Leaderboard Skill", type="technical")
+    courses = [models.Course(name=f"Ranked Course {i}") for i in range(3)]
+    db_session.add_all([skill, *courses])
+    db_session.commit()
+    db_session.add(models.CareerGoalTechnicalSkill(career_goal_id=test_career_goal.id, skill_id=skill.id))
+    db_session.add_all([
+        models.CourseSkill(course_id=course.id, skill_id=skill.id, relevance_score=relevance)
+        for course, relevance in zip(courses, (0.9, 0.6, 0.3))
+    ])
+    test_student.career_goal_id = test_career_goal.id
+    db_session.commit()
+    return courses
+
+
+@pytest.mark.unit
+class TestLeaderboardCounts:
+    """Test the leaderboard module."""
+
+    def test_record_counts_every_scope(self, db_session):
+        """Test that one student counts overall, per goal, per faculty and per both."""
+        leaderboard.record(db_session, 1, 7, "CS", [10, 11])
+
+        assert leaderboard.top(db_session) == [(10, 1), (11, 1)]
+        assert leaderboard.top(db_session, career_goal_id=7) == [(10, 1), (11, 1)]
+        assert leaderboard.top(db_session, faculty="CS") == [(10, 1), (11, 1)]
+        assert leaderboard.top(db_session, career_goal_id=7, faculty="CS") == [(10, 1), (11, 1)]
+        assert leaderboard.top(db_session, career_goal_id=8) == []
+
+    def test_rerecord_replaces_the_list(self, db_session):
+        """Test that a recomputed list replaces the student's previous one."""
+        leaderboard.record(db_session, 1, 7, "CS", [10, 11])
+        leaderboard.record(db_session, 2, 7, "CS", [11, 12])
+
+        leaderboard.record(db_session, 1, 7, "CS", [11, 12])
+
+        assert leaderboard.top(db_session) == [(11, 2), (12, 2)]
+
+    def test_unchanged_list_is_not_rewritten(self, db_session):
+        """Test that recording the same list again writes nothing."""
+        from sqlalchemy import event
+
+        leaderboard.record(db_session, 1, 7, "CS", [10, 11])
+        statements = []
+        engine = db_session.get_bind()
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            leaderboard.record(db_session, 1, 7, "CS", [11, 10])
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        assert not [s for s in statements if s.split()[0] in ("INSERT", "DELETE")]
+
+    def test_goal_change_moves_scopes(self, db_session):
+        """Test that changing goal removes the counts from the old goal's board."""
+        leaderboard.record(db_session, 1, 7, "CS", [10])
+        leaderboard.record(db_session, 1, 8, "CS", [10])
+
+        assert leaderboard.top(db_session, career_goal_id=7) == []
+        assert leaderboard.top(db_session, career_goal_id=8) == [(10, 1)]
+        assert leaderboard.top(db_session) == [(10, 1)]
+
+    def test_forget(self, db_session):
+        """Test that a forgotten student no longer counts."""
+        leaderboard.record(db_session, 1, 7, None, [10])
+        leaderboard.forget(db_session, 1)
+
+        assert leaderboard.top(db_session) == []
+        assert leaderboard.student_count(db_session) == 0
+
+    def test_ties_by_course_id(self, db_session):
+        """Test that equal counts are ordered by course id."""
+        leaderboard.record(db_session, 1, None, None, [12, 10, 11])
+
+        assert [course_id for course_id, _ in leaderboard.top(db_session)] == [10, 11, 12]
+
+    def test_rebuild_claimed_once(self, tmp_path, monkeypatch):
+        """Test that only the first worker claims the warm-up rebuild until it is released."""
+        monkeypatch.setattr(config, "SNAPSHOT_DIR", str(tmp_path))
+
+        assert leaderboard.claim_rebuild() is True
+        assert leaderboard.claim_rebuild() is False
+
+        leaderboard.release_rebuild()
+        assert leaderboard.claim_rebuild() is True
+
+
+@pytest.mark.unit
+class TestLeaderboardRecording:
+    """Test feeding the leaderboard from the recommendation service."""
+
+    def test_refresh_student_records_top_k(self, db_session, test_student, test_career_goal, goal_with_courses):
+        """Test that a recompute records the student's top courses in rank order."""
+        service.refresh_student_recommendations(db_session, test_student.id)
+
+        assert [cid for cid, _ in leaderboard.top(db_session, career_goal_id=test_career_goal.id)] == [
+            c.id for c in goal_with_courses
+        ]
+        assert leaderboard.student_count(db_session, faculty="Computer Science") == 1
+
+    def test_rebuild_counts_all_students(self, db_session, test_career_goal, goal_with_courses):
+        """Test that the warm-up rebuild records every student with a goal."""
+        db_session.add_all([
+            models.Student(name=f"lb_student_{i}", hashed_password=get_password_hash("x"),
+                           career_goal_id=test_career_goal.id if i < 2 else None)
+            for i in range(3)
+        ])
+        db_session.commit()
+
+        leaderboard.record(db_session, 999, None, None, [goal_with_courses[2].id])  # student since deleted
+
+        assert service.rebuild_leaderboard(db_session) == 3  # test_student + two new ones
+        assert leaderboard.top(db_session, 1) == [(goal_with_courses[0].id, 3)]
+        assert leaderboard.student_count(db_session) == 3
+
+
+@pytest.mark.api
+class TestLeaderboardEndpoint:
+    """Test GET /recommendations/leaderboard."""
+
+    def test_own_recommendations_feed_leaderboard(self, authenticated_client, test_career_goal, goal_with_courses):
+        """Test that viewing your own recommendations updates the leaderboard."""
+        authenticated_client.get("/recommendations/courses?k=1")
+
+        response = authenticated_client.get(f"/recommendations/leaderboard?career_goal_id={test_career_goal.id}")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["students"] == 1
+        assert [c["course_id"] for c in data["courses"]] == [c.id for c in goal_with_courses]
+        assert data["courses"][0]["name"] == "Ranked Course 0"
+
+    def test_custom_options_do_not_count(self, authenticated_client, goal_with_courses):
+        """Test that what-if requests (other weights, budgets) are not recorded."""
+        authenticated_client.get("/recommendations/courses?profile=affinity_boost")
+
+        assert authenticated_client.get("/recommendations/leaderboard").json()["courses"] == []
+
+    def test_faculty_filter(self, authenticated_client, goal_with_courses):
+        """Test the per-faculty leaderboard."""
+        authenticated_client.get("/recommendations/courses")
+
+        assert authenticated_client.get("/recommendations/leaderboard?faculty=Computer Science").json()["students"] == 1
+        assert authenticated_client.get("/recommendations/leaderboard?faculty=Law").json()["courses"] == []
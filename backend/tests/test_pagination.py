@@ -0,0 +1,170 @@
+"""
+Tests for keyset (cursor) pagination of the list endpoints.
+
+Tests:
+- cursor encoding and rejection of foreign cursors
+- walking /courses/, /students/, /ratings/ and /reviews/ page by page
+- /courses/{course_id}/reviews next_cursor (newest first, ties broken by id)
+- cursor pages filter on the sort key instead of skipping rows
+"""
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException, status
+from sqlalchemy import event
+
+from app import models, pagination
+
+from .conftest import async_engine
+
+
+def walk(client, url, limit):
+    """Follow X-Next-Cursor from the first page to the last; returns the ids per page."""
+    pages, cursor = [], None
+    while True:
+        separator = "&" if "?" in url else "?"
+        query = f"{separator}limit={limit}" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(url + query)
+        assert response.status_code == status.HTTP_200_OK
+        pages.append([item["id"] for item in response.json()])
+        cursor = response.headers.get(pagination.NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return pages
+
+
+@pytest.fixture
+def catalog(db_session, test_student):
+    """Seven courses, each rated and reviewed once by test_student."""
+    courses = [models.Course(name=f"Paged Course {i}") for i in range(7)]
+    db_session.add_all(courses)
+    db_session.commit()
+    for course in courses:
+        db_session.add_all([
+            models.Rating(student_id=test_student.id, course_id=course.id, score=4.0),
+            models.CourseReview(
+                student_id=test_student.id, course_id=course.id, final_score=8.0,
+                industry_relevance_rating=4, instructor_rating=4, useful_learning_rating=4,
+            ),
+        ])
+    db_session.commit()
+    return courses
+
+
+@pytest.mark.unit
+class TestCursor:
+    """Test cursor encoding."""
+
+    def test_round_trip(self):
+        """Test that datetimes and integers survive encoding."""
+        created = datetime(2024, 5, 1, 12, 30, 15, 250)
+        cursor = pagination.encode_cursor([created, 42])
+
+        assert pagination.decode_cursor(cursor, [models.CourseReview.created_at, models.CourseReview.id]) == (
+            created, 42,
+        )
+
+    @pytest.mark.parametrize("cursor", ["not-base64!", pagination.encode_cursor([1, 2]), "e30"])
+    def test_invalid_cursor(self, cursor):
+        """Test that malformed cursors and cursors for other columns are rejected."""
+        with pytest.raises(HTTPException) as exc:
+            pagination.decode_cursor(cursor, [models.Course.id])
+
+        assert exc.value.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_invalid_cursor_response(self, client):
+        """Test that a list endpoint answers 400 to a bad cursor."""
+        assert client.get("/courses/?cursor=garbage").status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.api
+class TestListEndpoints:
+    """Test walking the list endpoints with cursors."""
+
+    @pytest.mark.parametrize("url", ["/courses/", "/students/", "/ratings/", "/reviews/"])
+    def test_walk_all_pages(self, client, catalog, db_session, url):
+        """Test that pages follow id order, do not overlap and cover every row."""
+        for i in range(3):
+            db_session.add(models.Student(name=f"paged_student_{i}", hashed_password="x"))
+        db_session.commit()
+
+        pages = walk(client, url, limit=3)
+        ids = [i for p in pages for i in p]
+
+        assert all(len(p) == 3 for p in pages[:-1])
+        assert ids == sorted(ids)
+        assert len(ids) == len(set(ids)) >= 4
+
+    def test_popular_sort(self, client, db_session, catalog):
+        """Test that sort=popular pages by completions, ties by id."""
+        db_session.add_all([
+            models.CourseEnrollmentStats(course_id=catalog[4].id, total_completions=9),
+            models.CourseEnrollmentStats(course_id=catalog[1].id, total_completions=5),
+            models.CourseEnrollmentStats(course_id=catalog[6].id, total_completions=5),
+        ])
+        db_session.commit()
+
+        pages = walk(client, "/courses/?sort=popular", limit=2)
+
+        expected = [catalog[i].id for i in (4, 1, 6, 0, 2, 3, 5)]
+        assert [i for p in pages for i in p] == expected
+
+    def test_skip_still_supported(self, client, catalog):
+        """Test that older clients paging with skip get the same rows."""
+        response = client.get("/courses/?skip=2&limit=2")
+
+        assert [c["id"] for c in response.json()] == [catalog[2].id, catalog[3].id]
+        assert response.headers[pagination.NEXT_CURSOR_HEADER]
+
+    def test_last_page_has_no_cursor(self, client, catalog):
+        """Test that a page holding the remaining rows has no next cursor."""
+        response = client.get("/courses/?limit=7")
+
+        assert len(response.json()) == 7
+        assert pagination.NEXT_CURSOR_HEADER not in response.headers
+
+    def test_cursor_pages_filter_on_key(self, client, catalog):
+        """Test that following a cursor filters on the key instead of skipping rows."""
+        cursor = client.get("/courses/?limit=3").headers[pagination.NEXT_CURSOR_HEADER]
+        statements = []
+        listener = lambda conn, cursor_, statement, parameters, *args: statements.append((statement, parameters))
+        event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+        try:
+            client.get(f"/courses/?limit=3&cursor={cursor}")
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", listener)
+
+        (statement, parameters), = statements
+        assert "WHERE courses.id > ?" in statement
+        # SQLite always renders OFFSET once LIMIT is set; nothing is skipped
+        assert tuple(parameters)[-1] == 0
+
+
+@pytest.mark.api
+class TestCourseReviewsCursor:
+    """Test next_cursor of GET /courses/{course_id}/reviews."""
+
+    def test_walk_newest_first(self, client, db_session, test_course, test_student):
+        """Test that cursor pages are newest first and reviews sharing a timestamp are not lost."""
+        times = [datetime(2024, 1, day) for day in (3, 1, 2, 2, 2)]
+        reviews = [
+            models.CourseReview(
+                student_id=test_student.id, course_id=test_course.id, final_score=7.0, created_at=created,
+                industry_relevance_rating=3, instructor_rating=3, useful_learning_rating=3,
+            )
+            for created in times
+        ]
+        db_session.add_all(reviews)
+        db_session.commit()
+
+        ids, cursor = [], None
+        while True:
+            url = f"/courses/{test_course.id}/reviews?page_size=2" + (f"&cursor={cursor}" if cursor else "")
+            data = client.get(url).json()
+            assert data["total"] == 5
+            ids.extend(item["id"] for item in data["items"])
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+
+        by_day_2 = sorted((r.id for r in reviews[2:]), reverse=True)
+        assert ids == [reviews[0].id, *by_day_2, reviews[1].id]
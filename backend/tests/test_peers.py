@@ -0,0 +1,209 @@
+"""
+Tests for "students like me" peer discovery.
+
+Tests:
+- profile vectors and LSH bucket keys
+- approximate neighbour queries against exact cosine
+- incremental maintenance on profile writes, including other workers' writes
+- GET /students/me/peers
+"""
+import random
+import time
+
+import pytest
+from fastapi import status
+from sqlalchemy import insert
+
+from app import crud, models
+from app.recommendation_engine import config, peers, service
+
+
+@pytest.fixture(autouse=True)
+def clear_peer_index():
+    peers.clear()
+    yield
+    peers.clear()
+
+
+@pytest.fixture
+def peer_catalog(db_session, test_student, test_career_goal, test_skill_human):
+    """Courses C0..C5; test_student completed C0-C2. Twin shares all three, Partial one, Stranger none."""
+    courses = [models.Course(name=f"Peer Course {i}") for i in range(6)]
+    twin, partial, stranger = [
+        models.Student(name=name, hashed_password="x", faculty="Engineering")
+        for name in ("twin", "partial", "stranger")
+    ]
+    db_session.add_all([*courses, twin, partial, stranger])
+    test_student.career_goal_id = test_career_goal.id
+    twin.career_goal_id = test_career_goal.id
+    test_student.human_skills.append(test_skill_human)
+    db_session.commit()
+    for course in courses[:3]:
+        crud.add_student_course(db_session, test_student.id, course.id)
+    for course in courses[:5]:
+        crud.add_student_course(db_session, twin.id, course.id)
+    crud.add_student_course(db_session, partial.id, courses[0].id)
+    crud.add_student_course(db_session, stranger.id, courses[5].id)
+    return {"courses": courses, "twin": twin, "partial": partial, "stranger": stranger}
+
+
+@pytest.mark.unit
+class TestEncoding:
+    """Test profile vectors and bucket keys."""
+
+    def test_cosine(self):
+        """Test weighted cosine over courses, skills and goal."""
+        a = peers.encode([1, 2], [7], 3)
+        b = peers.encode([1, 2], [], 3)
+
+        assert peers.cosine(a, a) == pytest.approx(1.0)
+        assert peers.cosine(a, b) == pytest.approx(
+            (2 * config.PEER_W_COURSE ** 2 + config.PEER_W_GOAL ** 2)
+            / ((2 * config.PEER_W_COURSE ** 2 + config.PEER_W_SKILL ** 2 + config.PEER_W_GOAL ** 2) ** 0.5
+               * (2 * config.PEER_W_COURSE ** 2 + config.PEER_W_GOAL ** 2) ** 0.5)
+        )
+        assert peers.cosine(a, peers.encode([9], [], None)) == 0.0
+
+    def test_identical_profiles_share_every_bucket(self):
+        """Test that bucket keys depend only on the profile."""
+        keys = peers._bucket_keys([peers.encode([1, 2], [7], 3), peers.encode([2, 1], [7], 3), {}])
+
+        assert keys.shape == (3, config.PEER_LSH_TABLES)
+        assert (keys[0] == keys[1]).all()
+        assert (keys[2] == 0).all()
+
+
+@pytest.mark.unit
+class TestPeerIndex:
+    """Test index queries and incremental maintenance."""
+
+    def test_ranked_by_similarity(self, db_session, test_student, peer_catalog):
+        """Test that the closest profile comes first and unrelated students are left out."""
+        result = peers.query(db_session, test_student.id, limit=10)
+
+        assert [sid for sid, _ in result] == [peer_catalog["twin"].id, peer_catalog["partial"].id]
+
+    def test_lsh_recall_on_large_index(self, monkeypatch):
+        """Test that LSH candidates find the exact top neighbours of near-duplicate profiles."""
+        monkeypatch.setattr(config, "PEER_EXACT_BELOW", 0)
+        rng = random.Random(0)
+        vectors = {}
+        for sid in range(1, 20001):
+            vectors[sid] = peers.encode(rng.sample(range(400), 12), rng.sample(range(30), 3), rng.randrange(20))
+        base = vectors[1]
+        for sid in range(2, 7):  # five near-duplicates of student 1
+            courses = [f[1] for f in base if f[0] == "course"][:-1] + [1000 + sid]
+            vectors[sid] = peers.encode(
+                courses, [f[1] for f in base if f[0] == "skill"], [f[1] for f in base if f[0] == "goal"][0],
+            )
+        peers._store(vectors)
+        peers._built = True
+        peers._log_position = peers._read_log(None)[:2]
+
+        start = time.perf_counter()
+        result = peers.query(None, 1, limit=5)
+        elapsed = time.perf_counter() - start
+
+        assert [sid for sid, _ in result] == [2, 3, 4, 5, 6]
+        assert elapsed < 0.1
+
+    def test_profile_writes_are_picked_up(self, db_session, test_student, peer_catalog, monkeypatch):
+        """Test that a peer's new courses are re-encoded without a rebuild."""
+        peers.query(db_session, test_student.id)
+        builds = []
+        monkeypatch.setattr(peers, "build", builds.append)
+
+        for course in peer_catalog["courses"][:3]:
+            crud.add_student_course(db_session, peer_catalog["stranger"].id, course.id)
+        result = dict(peers.query(db_session, test_student.id))
+
+        assert builds == []
+        assert peer_catalog["stranger"].id in result
+
+    def test_write_in_another_worker(self, db_session, test_student, peer_catalog, monkeypatch):
+        """Test that students marked stale through the shared log are re-encoded without a rebuild."""
+        peers.query(db_session, test_student.id)
+        builds = []
+        monkeypatch.setattr(peers, "build", builds.append)
+        stranger = peer_catalog["stranger"].id
+
+        # Another worker's commit: the rows change and its hook appends the student to the log
+        db_session.execute(insert(models.StudentCourse), [
+            {"student_id": stranger, "course_id": course.id} for course in peer_catalog["courses"][:3]
+        ])
+        db_session.commit()
+        peers.mark_stale([stranger])
+        result = dict(peers.query(db_session, test_student.id))
+
+        assert builds == []
+        assert stranger in result
+
+    def test_replaced_log_rebuilds(self, db_session, test_student, peer_catalog, monkeypatch):
+        """Test that a worker rebuilds when the shared log it read has been replaced."""
+        peers.query(db_session, test_student.id)
+        monkeypatch.setattr(config, "PEER_LOG_MAX_BYTES", 0)
+        builds = []
+        monkeypatch.setattr(peers, "build", builds.append)
+
+        peers.mark_stale([peer_catalog["stranger"].id])
+        peers.query(db_session, test_student.id)
+
+        assert builds == [db_session]
+
+    def test_cleared_courses_and_deleted_students(self, db_session, test_student, peer_catalog):
+        """Test bulk-deleted courses and deleted students leave the index."""
+        peers.query(db_session, test_student.id)
+
+        crud.clear_student_courses(db_session, peer_catalog["partial"].id)
+        db_session.commit()
+        db_session.delete(peer_catalog["twin"])
+        db_session.commit()
+
+        assert peers.query(db_session, test_student.id) == []
+        assert peers.size() == 3
+
+
+@pytest.mark.unit
+class TestGetPeers:
+    """Test service.get_peers."""
+
+    def test_next_courses(self, db_session, test_student, peer_catalog):
+        """Test that peers list the courses they completed that the student has not."""
+        result = service.get_peers(db_session, test_student.id, limit=1)
+
+        assert len(result) == 1
+        twin = result[0]
+        assert twin["student_id"] == peer_catalog["twin"].id
+        assert twin["shared_courses"] == 3
+        assert [c["course_id"] for c in twin["next_courses"]] == [c.id for c in peer_catalog["courses"][3:5]]
+        assert twin["next_courses"][0]["name"] == "Peer Course 3"
+
+    def test_empty_profile(self, db_session, test_student):
+        """Test that a student with no courses, skills or goal has no peers."""
+        assert service.get_peers(db_session, test_student.id) == []
+
+
+@pytest.mark.api
+class TestPeersEndpoint:
+    """Test GET /students/me/peers."""
+
+    def test_get_peers(self, authenticated_client, peer_catalog):
+        """Test that the endpoint returns similar students best first."""
+        response = authenticated_client.get("/students/me/peers?limit=5")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert [p["name"] for p in data] == ["twin", "partial"]
+        assert 0 < data[1]["similarity"] < data[0]["similarity"] <= 1
+
+    def test_limit_bounds(self, authenticated_client):
+        """Test that limit above PEER_MAX_RESULTS returns 422."""
+        response = authenticated_client.get(f"/students/me/peers?limit={config.PEER_MAX_RESULTS + 1}")
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_requires_auth(self, client):
+        """Test that the endpoint requires authentication."""
+        response = client.get("/students/me/peers")
+
+        assert response.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,121 @@
+"""
+Tests for connection pool settings and pool metrics.
+
+Tests:
+- pool settings read from the environment
+- checkout, overflow, timeout and invalidation counters
+- the /metrics/db-pool endpoint
+"""
+import pytest
+from fastapi import status
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import QueuePool
+
+from app import pool_metrics
+
+
+@pytest.fixture
+def metered():
+    """A metered sqlite engine with one pooled and one overflow connection."""
+    metrics = pool_metrics.PoolMetrics("test")
+    engine = create_engine(
+        "sqlite://", poolclass=metrics.pool_class(QueuePool),
+        pool_size=1, max_overflow=1, pool_timeout=0.05,
+    )
+    metrics.listen(engine)
+    yield metrics, engine
+    engine.dispose()
+
+
+@pytest.mark.unit
+class TestPoolSettings:
+    """Test pool_metrics.pool_settings."""
+
+    def test_defaults(self, monkeypatch):
+        """Test the settings without DB_POOL_* variables."""
+        for name in ("DB_POOL_SIZE", "DB_MAX_OVERFLOW", "DB_POOL_TIMEOUT", "DB_POOL_RECYCLE", "DB_POOL_PRE_PING"):
+            monkeypatch.delenv(name, raising=False)
+
+        assert pool_metrics.pool_settings() == {
+            "pool_size": 5, "max_overflow": 10, "pool_timeout": 30.0, "pool_recycle": 1800, "pool_pre_ping": True,
+        }
+
+    def test_environment(self, monkeypatch):
+        """Test that the environment overrides every setting."""
+        monkeypatch.setenv("DB_POOL_SIZE", "20")
+        monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+        monkeypatch.setenv("DB_POOL_TIMEOUT", "2.5")
+        monkeypatch.setenv("DB_POOL_RECYCLE", "-1")
+        monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+
+        assert pool_metrics.pool_settings() == {
+            "pool_size": 20, "max_overflow": 0, "pool_timeout": 2.5, "pool_recycle": -1, "pool_pre_ping": False,
+        }
+
+
+@pytest.mark.unit
+class TestPoolMetrics:
+    """Test the pool counters."""
+
+    def test_checkout_and_checkin(self, metered):
+        """Test that a connection use counts one connect, checkout and checkin."""
+        metrics, engine = metered
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            assert metrics.snapshot()["pool"]["checked_out"] == 1
+
+        snapshot = metrics.snapshot()
+        assert (snapshot["connects"], snapshot["checkouts"], snapshot["checkins"]) == (1, 1, 1)
+        assert snapshot["pool"]["checked_out"] == 0
+        assert snapshot["wait_max_ms"] >= 0.0
+
+    def test_overflow_and_timeout(self, metered):
+        """Test overflow use and a checkout that times out on an exhausted pool."""
+        metrics, engine = metered
+        first, second = engine.connect(), engine.connect()
+        try:
+            assert metrics.snapshot()["pool"]["overflow"] == 1
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+        finally:
+            first.close()
+            second.close()
+
+        snapshot = metrics.snapshot()
+        assert snapshot["overflow_checkouts"] == 1
+        assert snapshot["peak_checked_out"] == 2
+        assert snapshot["timeouts"] == 1
+        assert snapshot["wait_max_ms"] >= 50.0
+
+    def test_invalidation(self, metered):
+        """Test that an invalidated connection is counted."""
+        metrics, engine = metered
+        with engine.connect() as conn:
+            conn.invalidate()
+
+        assert metrics.snapshot()["invalidations"] == 1
+
+    def test_reset(self, metered):
+        """Test that reset zeroes the counters."""
+        metrics, engine = metered
+        with engine.connect():
+            pass
+
+        metrics.reset()
+
+        assert metrics.snapshot()["checkouts"] == 0
+
+
+@pytest.mark.api
+class TestPoolMetricsEndpoint:
+    """Test GET /metrics/db-pool."""
+
+    def test_lists_both_engines(self, client):
+        """Test that the sync and async engines are reported with their settings."""
+        response = client.get("/metrics/db-pool")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert {"sync", "async"} <= set(data)
+        assert data["sync"]["pool"]["size"] == pool_metrics.pool_settings()["pool_size"]
+        assert "wait_avg_ms" in data["async"]
@@ -0,0 +1,273 @@
+"""
+Tests for the incrementally maintained course popularity counters.
+
+Tests:
+- enrollment write paths keeping course_enrollment_stats / course_enrollment_daily current
+- ring buffer slot reuse and the recent-window query
+- GET /courses/?sort=popular
+- popularity_weight on the recommendation endpoints
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import status
+
+from app import crud, models
+from app.auth_utils import get_password_hash
+from app.recommendation_engine import config, queries
+
+
+def _make_students(db_session, n):
+    students = [
+        models.Student(name=f"pop_student_{i}", hashed_password=get_password_hash("pass123"))
+        for i in range(n)
+    ]
+    db_session.add_all(students)
+    db_session.commit()
+    return students
+
+
+def _make_courses(db_session, n):
+    courses = [models.Course(name=f"Popular Course {i}") for i in range(n)]
+    db_session.add_all(courses)
+    db_session.commit()
+    return courses
+
+
+@pytest.mark.unit
+class TestEnrollmentCounters:
+    """Test the counters kept by the crud enrollment functions."""
+
+    def test_add_and_remove_course(self, db_session, test_student, test_course):
+        """Test that completions are counted once and removed again."""
+        crud.add_student_course(db_session, test_student.id, test_course.id)
+        crud.add_student_course(db_session, test_student.id, test_course.id)  # already completed
+
+        assert queries.get_course_popularity(db_session)[test_course.id] == (1, 1)
+
+        crud.remove_student_course(db_session, test_student.id, test_course.id)
+
+        assert queries.get_course_popularity(db_session)[test_course.id] == (0, 0)
+
+    def test_status_change_moves_counters(self, db_session, test_student, test_course):
+        """Test that only 'completed' enrollments are counted."""
+        crud.add_student_course(db_session, test_student.id, test_course.id, status="in_progress")
+        assert queries.get_course_popularity(db_session).get(test_course.id, (0, 0)) == (0, 0)
+
+        crud.add_student_course(db_session, test_student.id, test_course.id, status="completed")
+        assert queries.get_course_popularity(db_session)[test_course.id] == (1, 1)
+
+        crud.add_student_course(db_session, test_student.id, test_course.id, status="in_progress")
+        assert queries.get_course_popularity(db_session)[test_course.id] == (0, 0)
+
+    def test_completion_on_a_later_day_is_removed_from_its_slot(self, db_session, test_student, test_course):
+        """Test that a course started one day and completed another is counted and removed on the same day."""
+        started = datetime.utcnow() - timedelta(days=3)
+        db_session.add(models.StudentCourse(
+            student_id=test_student.id, course_id=test_course.id, status="in_progress", created_at=started,
+        ))
+        db_session.commit()
+
+        crud.add_student_course(db_session, test_student.id, test_course.id, status="completed")
+        assert queries.get_course_popularity(db_session)[test_course.id] == (1, 1)
+
+        crud.remove_student_course(db_session, test_student.id, test_course.id)
+
+        assert queries.get_course_popularity(db_session)[test_course.id] == (0, 0)
+        buckets = db_session.query(models.CourseEnrollmentDaily).filter_by(course_id=test_course.id).all()
+        assert [(b.day, b.completions) for b in buckets] == [(datetime.utcnow().date(), 0)]
+
+    def test_replace_completes_on_a_later_day(self, db_session, test_student, test_course):
+        """Test the same for an enrollment completed through replace_student_courses."""
+        started = datetime.utcnow() - timedelta(days=3)
+        db_session.add(models.StudentCourse(
+            student_id=test_student.id, course_id=test_course.id, status="in_progress", created_at=started,
+        ))
+        db_session.commit()
+
+        crud.replace_student_courses(db_session, test_student.id, [test_course.id])
+        db_session.commit()
+        crud.replace_student_courses(db_session, test_student.id, [])
+        db_session.commit()
+
+        assert queries.get_course_popularity(db_session)[test_course.id] == (0, 0)
+
+    def test_concurrent_first_completion_keeps_existing_rows(self, db_session, test_course):
+        """Test that counter rows created by another transaction are locked and incremented, not re-added."""
+        today = datetime.utcnow()
+        db_session.add_all([
+            models.CourseEnrollmentStats(course_id=test_course.id, total_completions=1),
+            models.CourseEnrollmentDaily(
+                course_id=test_course.id, slot=crud._window_slot(today.date()), day=today.date(), completions=1,
+            ),
+        ])
+        db_session.commit()
+        crud._insert_missing(db_session, models.CourseEnrollmentStats, [
+            {"course_id": test_course.id, "total_completions": 0},
+        ])
+
+        crud.record_completion(db_session, test_course.id, +1, today)
+        db_session.commit()
+
+        assert queries.get_course_popularity(db_session)[test_course.id] == (2, 2)
+
+    def test_ring_buffer_slot_is_reused(self, db_session, test_course):
+        """Test that a slot holding a day from the previous cycle is reset."""
+        window = config.POPULARITY_WINDOW_DAYS
+        today = datetime.utcnow()
+        old = today - timedelta(days=window)
+
+        crud.record_completion(db_session, test_course.id, +1, old)
+        crud.record_completion(db_session, test_course.id, +1, old)
+        crud.record_completion(db_session, test_course.id, +1, today)
+        db_session.commit()
+
+        buckets = db_session.query(models.CourseEnrollmentDaily).filter_by(course_id=test_course.id).all()
+        assert len(buckets) == 1
+        assert buckets[0].day == today.date()
+        assert buckets[0].completions == 1
+        assert queries.get_course_popularity(db_session)[test_course.id] == (3, 1)
+
+    def test_removing_old_enrollment_only_changes_total(self, db_session, test_course):
+        """Test that removing an enrollment older than the window leaves the buffer alone."""
+        today = datetime.utcnow()
+        crud.record_completion(db_session, test_course.id, +1, today)
+        crud.record_completion(db_session, test_course.id, +1, today)
+        crud.record_completion(db_session, test_course.id, -1, today - timedelta(days=90))
+        db_session.commit()
+
+        assert queries.get_course_popularity(db_session)[test_course.id] == (1, 2)
+
+    def test_rebuild_matches_student_courses(self, db_session):
+        """Test that the backfill counts completed enrollments inside and outside the window."""
+        students = _make_students(db_session, 3)
+        course = _make_courses(db_session, 1)[0]
+        long_ago = datetime.utcnow() - timedelta(days=400)
+        db_session.add_all([
+            models.StudentCourse(student_id=students[0].id, course_id=course.id, status="completed"),
+            models.StudentCourse(student_id=students[1].id, course_id=course.id, status="completed", created_at=long_ago),
+            models.StudentCourse(student_id=students[2].id, course_id=course.id, status="in_progress"),
+        ])
+        db_session.commit()
+
+        crud.rebuild_enrollment_stats(db_session)
+
+        assert queries.get_course_popularity(db_session)[course.id] == (2, 1)
+
+    def test_replace_diffs_enrollments(self, db_session, test_student):
+        """Test that replacing keeps unchanged enrollments and counts only the difference."""
+        courses = _make_courses(db_session, 4)
+        crud.add_student_course(db_session, test_student.id, courses[0].id)
+        crud.add_student_course(db_session, test_student.id, courses[1].id)
+        crud.add_student_course(db_session, test_student.id, courses[2].id, status="in_progress")
+        kept_at = db_session.query(models.StudentCourse).filter_by(course_id=courses[1].id).one().created_at
+
+        crud.replace_student_courses(db_session, test_student.id, [courses[1].id, courses[2].id, courses[3].id, "x"])
+        db_session.commit()
+
+        rows = {sc.course_id: sc for sc in crud.get_student_courses(db_session, test_student.id)}
+        assert set(rows) == {courses[1].id, courses[2].id, courses[3].id}
+        assert all(sc.status == "completed" for sc in rows.values())
+        assert rows[courses[1].id].created_at == kept_at
+        popularity = queries.get_course_popularity(db_session)
+        assert [popularity[c.id][0] for c in courses] == [0, 1, 1, 1]
+
+    def test_replace_statement_count(self, db_session, test_student):
+        """Test that replacing 40 courses takes a fixed number of statements."""
+        from sqlalchemy import event
+
+        course_ids = [c.id for c in _make_courses(db_session, 40)]
+        student_id = test_student.id
+        crud.replace_student_courses(db_session, student_id, course_ids[:20])
+        db_session.commit()
+
+        statements = []
+        engine = db_session.get_bind()
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            crud.replace_student_courses(db_session, student_id, course_ids[10:])
+            db_session.commit()
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        writes = [s for s in statements if s.split()[0] in ("INSERT", "UPDATE", "DELETE")]
+        assert len([s for s in writes if "student_courses" in s]) == 2  # one DELETE, one INSERT
+        assert len(statements) <= 12  # includes inserting and locking the new counter rows
+        assert queries.get_course_popularity(db_session)[course_ids[39]][0] == 1
+
+
+@pytest.mark.api
+class TestEnrollmentRoutes:
+    """Test PUT /students/{student_id}/courses keeping counters current."""
+
+    def test_replace_courses_updates_counters(self, client, db_session, test_student):
+        """Test that replacing the course list moves completions between courses."""
+        courses = _make_courses(db_session, 3)
+
+        client.put(f"/students/{test_student.id}/courses", json={"courses_taken": [courses[0].id, courses[1].id]})
+        response = client.put(f"/students/{test_student.id}/courses", json={"courses_taken": [courses[1].id, courses[2].id]})
+
+        assert response.status_code == status.HTTP_200_OK
+        popularity = queries.get_course_popularity(db_session)
+        assert popularity[courses[0].id][0] == 0
+        assert popularity[courses[1].id][0] == 1
+        assert popularity[courses[2].id][0] == 1
+
+    def test_delete_student_decrements_counters(self, client, db_session):
+        """Test that deleting a student takes their completions off the counters."""
+        keeper, leaver = _make_students(db_session, 2)
+        course = _make_courses(db_session, 1)[0]
+        for student in (keeper, leaver):
+            client.put(f"/students/{student.id}/courses", json={"courses_taken": [course.id]})
+
+        response = client.delete(f"/students/{leaver.id}")
+
+        assert response.status_code == status.HTTP_200_OK
+        db_session.expire_all()
+        assert queries.get_course_popularity(db_session)[course.id] == (1, 1)
+        assert db_session.query(models.StudentCourse).count() == 1
+
+
+@pytest.mark.api
+class TestPopularSort:
+    """Test GET /courses/?sort=popular."""
+
+    def test_sort_popular(self, client, db_session):
+        """Test that courses are ordered by completions, most completed first."""
+        courses = _make_courses(db_session, 3)
+        students = _make_students(db_session, 3)
+        for student in students:
+            crud.add_student_course(db_session, student.id, courses[2].id)
+        crud.add_student_course(db_session, students[0].id, courses[1].id)
+
+        response = client.get("/courses/?sort=popular")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [c["id"] for c in response.json()] == [courses[2].id, courses[1].id, courses[0].id]
+
+    def test_sort_unknown_rejected(self, client):
+        """Test that an unknown sort key returns 422."""
+        response = client.get("/courses/?sort=newest")
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.api
+class TestPopularityTerm:
+    """Test popularity_weight on GET /recommendations/courses/for-goal/{id}."""
+
+    def test_popularity_weight_ranks_popular_first(self, authenticated_client, db_session, test_career_goal):
+        """Test that the popularity term reorders otherwise tied courses."""
+        courses = _make_courses(db_session, 2)
+        for student in _make_students(db_session, 2):
+            crud.add_student_course(db_session, student.id, courses[1].id)
+
+        url = f"/recommendations/courses/for-goal/{test_career_goal.id}"
+        plain = authenticated_client.get(url).json()["recommendations"]
+        popular = authenticated_client.get(url + "?popularity_weight=0.5").json()["recommendations"]
+
+        assert plain[0]["course_id"] == courses[0].id
+        assert "s_popularity" not in plain[0]["breakdown"]
+        assert popular[0]["course_id"] == courses[1].id
+        assert popular[0]["breakdown"]["s_popularity"] == pytest.approx(1.0)
@@ -0,0 +1,175 @@
+"""
+Query plan regression tests for the hot read paths (PostgreSQL only).
+
+Loads a synthetic catalog into a schema of its own in the PostgreSQL test
+database, ANALYZEs it and asserts with EXPLAIN that every hot query reads its
+table through the expected index instead of a sequential scan. Skipped when
+that database (the TEST_DB_* settings) cannot be reached; QUERY_PLAN_SCALE
+multiplies the dataset size (default 1).
+
+Tests:
+- /ratings/course/{course_id} and /ratings/student/{student_id}
+- /reviews/course/{course_id} and /reviews/student/{student_id}
+- /courses/{course_id}/reviews count, first page and cursor page
+- course detail rows (prerequisites, skills, clusters)
+"""
+import os
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.exc import OperationalError
+
+from app import course_details, models, pagination
+from app.database import Base
+
+from .conftest import TEST_DB_HOST, TEST_DB_NAME, TEST_DB_PASSWORD, TEST_DB_PORT, TEST_DB_USER
+
+PLAN_SCHEMA = "query_plans"
+SCALE = int(os.getenv("QUERY_PLAN_SCALE", "1"))
+
+# Rows per table at scale 1; ratings and reviews are per student
+COURSES = 2000 * SCALE
+STUDENTS = 10000 * SCALE
+SKILLS = 500
+CLUSTERS = 50
+RATINGS_PER_STUDENT = 10
+REVIEWS_PER_STUDENT = 10
+
+SEED_STATEMENTS = [
+    "INSERT INTO courses (id, name) SELECT g, 'plan_course_' || g FROM generate_series(1, :courses) g",
+    "INSERT INTO students (id, name, hashed_password) "
+    "SELECT g, 'plan_student_' || g, 'x' FROM generate_series(1, :students) g",
+    "INSERT INTO skills (id, name, type) SELECT g, 'plan_skill_' || g, 'technical' FROM generate_series(1, :skills) g",
+    "INSERT INTO clusters (id, name) SELECT g, 'plan_cluster_' || g FROM generate_series(1, :clusters) g",
+    "INSERT INTO course_prerequisites (course_id, required_course_id) "
+    "SELECT c, 1 + (c + k * 37) % :courses FROM generate_series(1, :courses) c, generate_series(1, 2) k",
+    "INSERT INTO course_skills (course_id, skill_id) "
+    "SELECT c, 1 + (c * 7 + k) % :skills FROM generate_series(1, :courses) c, generate_series(0, 4) k",
+    "INSERT INTO course_clusters (course_id, cluster_id) "
+    "SELECT c, 1 + c % :clusters FROM generate_series(1, :courses) c",
+    "INSERT INTO ratings (student_id, course_id, score) "
+    "SELECT s, 1 + (s * 7 + k * 101) % :courses, 1 + (s + k) % 5 "
+    "FROM generate_series(1, :students) s, generate_series(1, :ratings_per_student) k",
+    "INSERT INTO course_reviews (student_id, course_id, industry_relevance_rating, instructor_rating, "
+    "useful_learning_rating, final_score, created_at) "
+    "SELECT s, 1 + (s * 11 + k * 103) % :courses, 1 + k % 5, 1 + s % 5, 1 + (s + k) % 5, 1 + (s + k) % 10, "
+    "timestamp '2024-01-01' + (s * :reviews_per_student + k) * interval '1 minute' "
+    "FROM generate_series(1, :students) s, generate_series(1, :reviews_per_student) k",
+]
+
+
+@pytest.fixture(scope="module")
+def plan_engine():
+    """Engine on the synthetic catalog; the schema is dropped afterwards."""
+    engine = create_engine(
+        f"postgresql://{TEST_DB_USER}:{TEST_DB_PASSWORD}@{TEST_DB_HOST}:{TEST_DB_PORT}/{TEST_DB_NAME}",
+        connect_args={"options": f"-csearch_path={PLAN_SCHEMA}", "connect_timeout": 3},
+    )
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {PLAN_SCHEMA} CASCADE"))
+            conn.execute(text(f"CREATE SCHEMA {PLAN_SCHEMA}"))
+    except OperationalError:
+        engine.dispose()
+        pytest.skip("PostgreSQL test database is not available")
+
+    try:
+        Base.metadata.create_all(bind=engine)
+        params = {
+            "courses": COURSES, "students": STUDENTS, "skills": SKILLS, "clusters": CLUSTERS,
+            "ratings_per_student": RATINGS_PER_STUDENT, "reviews_per_student": REVIEWS_PER_STUDENT,
+        }
+        with engine.begin() as conn:
+            for statement in SEED_STATEMENTS:
+                conn.execute(text(statement), params)
+            conn.execute(text("ANALYZE"))
+        yield engine
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {PLAN_SCHEMA} CASCADE"))
+        engine.dispose()
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def explain(engine, statement):
+    """The plan nodes PostgreSQL picks for a SQLAlchemy statement."""
+    with engine.connect() as conn:
+        compiled = statement.compile(dialect=conn.dialect)
+        (result,), = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + compiled.string, compiled.params).all()
+    return list(plan_nodes(result[0]["Plan"]))
+
+
+def assert_index_scan(engine, statement, table, index):
+    """Assert ``table`` is read through ``index`` and never sequentially."""
+    nodes = explain(engine, statement)
+    scans = [(n["Node Type"], n.get("Index Name")) for n in nodes if n.get("Relation Name") == table]
+    used = {n.get("Index Name") for n in nodes}
+
+    assert ("Seq Scan", None) not in scans, f"sequential scan on {table}: {scans}"
+    assert index in used, f"{index} not used, plan reads {table} with {scans}"
+
+
+@pytest.mark.integration
+class TestHotQueryPlans:
+    """Test that the hot read paths use their indexes on a scaled dataset."""
+
+    def test_ratings_by_course(self, plan_engine):
+        """Test /ratings/course/{course_id}."""
+        statement = select(models.Rating).where(models.Rating.course_id == COURSES // 2)
+
+        assert_index_scan(plan_engine, statement, "ratings", "ix_ratings_course_id")
+
+    def test_ratings_by_student(self, plan_engine):
+        """Test /ratings/student/{student_id}."""
+        statement = select(models.Rating).where(models.Rating.student_id == STUDENTS // 2)
+
+        assert_index_scan(plan_engine, statement, "ratings", "ix_ratings_student_id")
+
+    def test_reviews_by_course(self, plan_engine):
+        """Test /reviews/course/{course_id}."""
+        statement = select(models.CourseReview).where(models.CourseReview.course_id == COURSES // 2)
+
+        assert_index_scan(plan_engine, statement, "course_reviews", "ix_course_reviews_course_created")
+
+    def test_reviews_by_student(self, plan_engine):
+        """Test /reviews/student/{student_id}."""
+        statement = select(models.CourseReview).where(models.CourseReview.student_id == STUDENTS // 2)
+
+        assert_index_scan(plan_engine, statement, "course_reviews", "ix_course_reviews_student_id")
+
+    def test_course_reviews_count(self, plan_engine):
+        """Test the total of /courses/{course_id}/reviews."""
+        statement = (
+            select(func.count()).select_from(models.CourseReview)
+            .where(models.CourseReview.course_id == COURSES // 2)
+        )
+
+        assert_index_scan(plan_engine, statement, "course_reviews", "ix_course_reviews_course_created")
+
+    @pytest.mark.parametrize("cursor", [None, pagination.encode_cursor([datetime(2024, 2, 1), 50000])])
+    def test_course_reviews_page(self, plan_engine, cursor):
+        """Test the first page and a cursor page of /courses/{course_id}/reviews."""
+        review = models.CourseReview
+        statement = pagination.keyset(
+            select(review).where(review.course_id == COURSES // 2),
+            [review.created_at, review.id], cursor, 10, descending=True,
+        )
+
+        assert_index_scan(plan_engine, statement, "course_reviews", "ix_course_reviews_course_created")
+
+    @pytest.mark.parametrize("table, index", [
+        ("course_prerequisites", "ix_course_prerequisites_course_id"),
+        ("course_skills", "ix_course_skills_course_id"),
+        ("course_clusters", "ix_course_clusters_course_id"),
+    ])
+    def test_course_detail_rows(self, plan_engine, table, index):
+        """Test the related rows query of GET /courses/{course_id}."""
+        statement = course_details._related_rows(COURSES // 2)
+
+        assert_index_scan(plan_engine, statement, table, index)
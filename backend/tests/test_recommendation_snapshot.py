@@ -0,0 +1,203 @@
+"""
+Tests for the memory-mapped recommendation catalog snapshot.
+
+Tests:
+- Snapshot build/publish/load round trip
+- Generation swaps on catalog writes (and not on student profile or review writes)
+- Loading a published snapshot without a database session
+- Recommendations computed from the snapshot
+"""
+import os
+
+import numpy as np
+import pytest
+from fastapi import status
+
+from app import models
+from app.recommendation_engine import config, review_stats, snapshot
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    """Point the snapshot at an isolated directory and drop the worker's mapping."""
+    monkeypatch.setattr(config, "SNAPSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(snapshot, "_current", None)
+    monkeypatch.setattr(review_stats, "_current", None)
+    return tmp_path
+
+
+@pytest.fixture
+def catalog(db_session):
+    """Two courses sharing a cluster and a skill; course B requires course A."""
+    python = models.Skill(name="Python", type="technical")
+    sql = models.Skill(name="SQL", type="technical")
+    cluster = models.Cluster(name="Data")
+    course_a = models.Course(name="Intro to Python")
+    course_b = models.Course(name="Data Engineering")
+    db_session.add_all([python, sql, cluster, course_a, course_b])
+    db_session.commit()
+
+    db_session.add_all([
+        models.CourseSkill(course_id=course_a.id, skill_id=python.id, relevance_score=0.9),
+        models.CourseSkill(course_id=course_b.id, skill_id=python.id, relevance_score=0.5),
+        models.CourseSkill(course_id=course_b.id, skill_id=sql.id, relevance_score=0.8),
+        models.CourseCluster(course_id=course_a.id, cluster_id=cluster.id),
+        models.CourseCluster(course_id=course_b.id, cluster_id=cluster.id),
+        models.CoursePrerequisite(course_id=course_b.id, required_course_id=course_a.id),
+    ])
+    db_session.commit()
+    return {"python": python, "sql": sql, "course_a": course_a, "course_b": course_b}
+
+
+@pytest.mark.unit
+class TestSnapshotBuild:
+    """Test building and loading snapshot generations."""
+
+    def test_first_read_publishes_generation(self, db_session, snapshot_dir, catalog):
+        """Test that the first read builds generation 1 from the database."""
+        snap = snapshot.get_snapshot(db_session)
+
+        assert snap.generation == 1
+        assert snapshot.read_generation() == 1
+        assert os.path.isdir(snapshot_dir / "gen-000001")
+        assert not os.path.exists(snapshot_dir / snapshot.DIRTY_FILE)
+
+    def test_arrays_are_read_only_memory_maps(self, db_session, snapshot_dir, catalog):
+        """Test that every snapshot array is mapped read-only."""
+        snap = snapshot.get_snapshot(db_session)
+
+        for name in snapshot.ARRAY_NAMES:
+            arr = getattr(snap, name)
+            assert isinstance(arr, np.memmap)
+            assert not arr.flags.writeable
+
+    def test_arrays_match_catalog(self, db_session, snapshot_dir, catalog):
+        """Test relevance, similarity and prerequisite arrays."""
+        snap = snapshot.get_snapshot(db_session)
+        a = snap.course_index[catalog["course_a"].id]
+        b = snap.course_index[catalog["course_b"].id]
+        python = snap.skill_index[catalog["python"].id]
+        sql = snap.skill_index[catalog["sql"].id]
+
+        assert snap.relevance[a, python] == pytest.approx(0.9)
+        assert snap.relevance[a, sql] == 0.0
+        assert snap.relevance[b, sql] == pytest.approx(0.8)
+        assert snap.cluster_match[a, b]
+        assert snap.tech_overlap[a, b] == pytest.approx(0.5)  # {py} vs {py, sql}
+        assert snap.prereq_mask[b, a]
+        assert not snap.prereq_mask[a, b]
+        assert snap.course_names[a] == "Intro to Python"
+
+    def test_load_without_database(self, db_session, snapshot_dir, catalog):
+        """Test that a new worker maps a published snapshot without a session."""
+        generation = snapshot.get_snapshot(db_session).generation
+        snapshot._current = None
+
+        snap = snapshot.get_snapshot(None)
+
+        assert snap.generation == generation
+        assert snap.num_courses == 2
+
+
+@pytest.mark.unit
+class TestSnapshotInvalidation:
+    """Test generation swaps triggered by writes."""
+
+    def test_catalog_write_publishes_new_generation(self, db_session, snapshot_dir, catalog):
+        """Test that committing a course change marks the snapshot dirty."""
+        first = snapshot.get_snapshot(db_session)
+
+        db_session.add(models.Course(name="Databases"))
+        db_session.commit()
+
+        assert os.path.exists(snapshot_dir / snapshot.DIRTY_FILE)
+        second = snapshot.get_snapshot(db_session)
+        assert second.generation == first.generation + 1
+        assert second.num_courses == 3
+
+    def test_student_profile_write_keeps_generation(self, db_session, snapshot_dir, catalog, test_student, test_skill_human):
+        """Test that adding a human skill to a student does not touch the catalog."""
+        first = snapshot.get_snapshot(db_session)
+
+        test_student.human_skills.append(test_skill_human)
+        db_session.commit()
+
+        assert not os.path.exists(snapshot_dir / snapshot.DIRTY_FILE)
+        assert snapshot.get_snapshot(db_session).generation == first.generation
+
+    def test_review_write_keeps_generation(self, db_session, snapshot_dir, catalog, test_student):
+        """Test that a review reloads the review stats without rebuilding the catalog."""
+        first = snapshot.get_snapshot(db_session)
+        course_a = first.course_index[catalog["course_a"].id]
+        before = review_stats.get(db_session, first)
+        assert before.review_count[course_a] == 0
+
+        db_session.add(models.CourseReview(
+            student_id=test_student.id, course_id=catalog["course_a"].id, industry_relevance_rating=4,
+            instructor_rating=4, useful_learning_rating=4, final_score=8.0,
+        ))
+        db_session.commit()
+
+        assert not os.path.exists(snapshot_dir / snapshot.DIRTY_FILE)
+        snap = snapshot.get_snapshot(db_session)
+        assert snap.generation == first.generation
+        after = review_stats.get(db_session, snap)
+        assert after.version != before.version
+        assert after.review_count[course_a] == 1
+        assert after.review_avg[course_a] == pytest.approx(8.0)
+
+    def test_old_generations_are_pruned(self, db_session, snapshot_dir, catalog):
+        """Test that only the configured number of generations stays on disk."""
+        for _ in range(4):
+            snapshot.invalidate()
+            snapshot.get_snapshot(db_session)
+
+        generations = sorted(p.name for p in snapshot_dir.iterdir() if p.name.startswith("gen-"))
+        assert generations == ["gen-000003", "gen-000004"]
+
+
+@pytest.mark.api
+class TestRecommendationsFromSnapshot:
+    """Test recommendation output computed from the snapshot."""
+
+    def test_ranking_and_blocked_prereqs(self, authenticated_client, db_session, test_student, test_career_goal, catalog):
+        """Test that relevance drives ranking and unmet prereqs block courses."""
+        db_session.add(models.CareerGoalTechnicalSkill(
+            career_goal_id=test_career_goal.id, skill_id=catalog["python"].id
+        ))
+        db_session.commit()
+
+        response = authenticated_client.get(
+            f"/recommendations/courses/for-goal/{test_career_goal.id}?k=5"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert [r["course_id"] for r in data["recommendations"]] == [catalog["course_a"].id]
+        assert data["recommendations"][0]["breakdown"]["s_role"] == pytest.approx(0.9)
+        assert data["blocked_courses"] == [{
+            "course_id": catalog["course_b"].id,
+            "course_name": "Data Engineering",
+            "missing_prereqs": [catalog["course_a"].id],
+        }]
+
+    def test_completed_course_feeds_affinity(self, authenticated_client, db_session, test_student, test_career_goal, catalog):
+        """Test that a completed prerequisite unlocks and explains the next course."""
+        db_session.add(models.StudentCourse(
+            student_id=test_student.id, course_id=catalog["course_a"].id, status="completed"
+        ))
+        db_session.commit()
+
+        response = authenticated_client.get(
+            f"/recommendations/courses/for-goal/{test_career_goal.id}?k=5"
+        )
+
+        data = response.json()
+        assert [r["course_id"] for r in data["recommendations"]] == [catalog["course_b"].id]
+        explanation = data["recommendations"][0]["affinity_explanation"]["top_contributing_courses"]
+        assert explanation[0]["completed_course_id"] == catalog["course_a"].id
+        assert explanation[0]["cluster_matched"] is True
+        assert explanation[0]["similarity_score"] == pytest.approx(
+            config.ALPHA + (1 - config.ALPHA) * 0.5
+        )
+        assert data["blocked_courses"] == []
@@ -0,0 +1,136 @@
+"""
+Tests for the NDJSON streaming mode of the recommendation endpoints.
+
+Tests:
+- header line followed by one recommendation per line
+- same content as the regular JSON response
+- blocked students and the default JSON mode
+- k above the JSON limit is only accepted for a stream
+"""
+import json
+
+import pytest
+from fastapi import status
+
+from app import crud, models
+from app.recommendation_engine import config, service
+
+NDJSON = {"Accept": "application/x-ndjson"}
+
+
+@pytest.fixture
+def many_courses(db_session):
+    courses = [models.Course(name=f"Streamed Course {i}") for i in range(12)]
+    db_session.add_all(courses)
+    db_session.commit()
+    return courses
+
+
+@pytest.fixture
+def large_catalog(db_session):
+    courses = [models.Course(name=f"Large Catalog Course {i}") for i in range(150)]
+    db_session.add_all(courses)
+    db_session.commit()
+    return courses
+
+
+def _lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+@pytest.mark.api
+class TestNdjsonStreaming:
+    """Test Accept: application/x-ndjson on the recommendation endpoints."""
+
+    def test_header_then_one_line_per_recommendation(self, authenticated_client, test_career_goal, many_courses):
+        """Test that the stream starts with the header and has k recommendation lines."""
+        response = authenticated_client.get(
+            f"/recommendations/courses/for-goal/{test_career_goal.id}?k=5", headers=NDJSON
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        header, *items = _lines(response)
+        assert header["soft_readiness"] == 1.0
+        assert "recommendations" not in header
+        assert header["blocked_courses"] == []
+        assert len(items) == 5
+        assert all("final_score" in item and "breakdown" in item for item in items)
+
+    def test_stream_matches_json_response(self, authenticated_client, test_career_goal, many_courses):
+        """Test that the streamed lines carry the same data as the JSON body."""
+        url = f"/recommendations/courses/for-goal/{test_career_goal.id}?k=20"
+        full = authenticated_client.get(url).json()
+        header, *items = _lines(authenticated_client.get(url, headers=NDJSON))
+
+        assert items == full.pop("recommendations")
+        assert header == full
+
+    def test_blocked_student_streams_header_only(self, authenticated_client, db_session, test_career_goal, test_skill_human):
+        """Test that a student blocked by the human-skill check gets just the header."""
+        db_session.add(models.CareerGoalHumanSkill(career_goal_id=test_career_goal.id, skill_id=test_skill_human.id))
+        db_session.commit()
+
+        response = authenticated_client.get(
+            f"/recommendations/courses/for-goal/{test_career_goal.id}", headers=NDJSON
+        )
+
+        lines = _lines(response)
+        assert len(lines) == 1
+        assert lines[0]["blocked_reason"] is not None
+
+    def test_json_remains_default(self, authenticated_client, test_career_goal, many_courses):
+        """Test that clients not asking for NDJSON get the regular JSON body."""
+        response = authenticated_client.get(f"/recommendations/courses/for-goal/{test_career_goal.id}")
+
+        assert response.headers["content-type"].startswith("application/json")
+        assert len(response.json()["recommendations"]) == 10
+
+
+@pytest.mark.unit
+class TestStreamRecommendations:
+    """Test service.stream_recommendations."""
+
+    def test_entries_are_explained_lazily(self, db_session, test_student, test_career_goal, many_courses, monkeypatch):
+        """Test that nothing is explained until the iterator is consumed."""
+        crud.add_student_course(db_session, test_student.id, many_courses[0].id)
+        explained = []
+        original = service._explain_course
+        monkeypatch.setattr(service, "_explain_course", lambda *a, **kw: explained.append(1) or original(*a, **kw))
+
+        header, items = service.stream_recommendations(db_session, test_student.id, test_career_goal.id, k=10)
+
+        assert explained == []
+        next(items)
+        assert len(explained) == 1
+
+
+@pytest.mark.api
+class TestStreamingLimits:
+    """Test the k limits of the JSON and NDJSON modes."""
+
+    def test_large_k_streams(self, authenticated_client, test_career_goal, large_catalog):
+        """Test that a stream accepts k above the budget limit."""
+        response = authenticated_client.get(
+            f"/recommendations/courses/for-goal/{test_career_goal.id}?k=500", headers=NDJSON
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        header, *items = _lines(response)
+        assert len(items) == 150
+
+    def test_k_above_json_limit_rejected_unless_streamed(self, authenticated_client, test_career_goal, many_courses):
+        """Test that JSON and NDJSON have separate caps on k."""
+        url = f"/recommendations/courses/for-goal/{test_career_goal.id}?k={config.RECOMMENDATIONS_MAX_K + 1}"
+
+        assert authenticated_client.get(url).status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert authenticated_client.get(url, headers=NDJSON).status_code == status.HTTP_200_OK
+
+    def test_k_above_stream_limit_rejected(self, authenticated_client, test_career_goal):
+        """Test that a stream is bounded too."""
+        response = authenticated_client.get(
+            f"/recommendations/courses/for-goal/{test_career_goal.id}?k={config.RECOMMENDATIONS_STREAM_MAX_K + 1}",
+            headers=NDJSON,
+        )
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
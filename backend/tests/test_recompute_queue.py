@@ -0,0 +1,113 @@
+"""
+Tests for the background recommendation recompute queue.
+
+Tests:
+- deduplication of queued students and lag/depth reporting
+- recomputation warms the components cache and the leaderboard
+- worker thread start/stop
+- profile write endpoints enqueue the student
+"""
+import time
+
+import pytest
+from fastapi import status
+from sqlalchemy.orm import sessionmaker
+
+from app import models, recompute_queue
+from app.recommendation_engine import leaderboard, service
+
+
+@pytest.fixture
+def session_factory(db_session):
+    return sessionmaker(bind=db_session.get_bind(), autocommit=False, autoflush=False)
+
+
+@pytest.fixture
+def goal_student(db_session, test_student, test_career_goal, test_skill_technical, test_course):
+    """test_student with a goal whose skill test_course teaches."""
+    db_session.add_all([
+        models.CareerGoalTechnicalSkill(career_goal_id=test_career_goal.id, skill_id=test_skill_technical.id),
+        models.CourseSkill(course_id=test_course.id, skill_id=test_skill_technical.id, relevance_score=0.8),
+    ])
+    test_student.career_goal_id = test_career_goal.id
+    db_session.commit()
+    service.clear_caches()
+    return test_student
+
+
+@pytest.mark.unit
+class TestRecomputeQueue:
+    """Test enqueueing and draining."""
+
+    def test_deduplicates_queued_students(self):
+        """Test that a student queued twice is recomputed once."""
+        assert recompute_queue.enqueue(1) is True
+        assert recompute_queue.enqueue(2) is True
+        assert recompute_queue.enqueue(1) is False
+
+        status_ = recompute_queue.get_status()
+        assert status_["depth"] == 2
+        assert status_["deduplicated"] == 1
+        assert status_["oldest_wait_seconds"] >= 0
+
+    def test_run_pending_precomputes(self, db_session, session_factory, goal_student, test_course):
+        """Test that recomputation fills the components cache and the leaderboard."""
+        recompute_queue.enqueue(goal_student.id)
+
+        assert recompute_queue.run_pending(session_factory) == 1
+
+        assert len(service._components_cache) == 1
+        assert leaderboard.top(db_session, career_goal_id=goal_student.career_goal_id) == [(test_course.id, 1)]
+        status_ = recompute_queue.get_status()
+        assert status_["depth"] == 0
+        assert status_["processed"] == 1
+        assert status_["last_lag_seconds"] is not None
+
+    def test_deleted_student_is_skipped(self, session_factory):
+        """Test that a student deleted before the worker ran is not a failure."""
+        recompute_queue.enqueue(99999)
+
+        recompute_queue.run_pending(session_factory)
+
+        assert recompute_queue.get_status()["failed"] == 0
+
+    def test_worker_thread(self, session_factory, goal_student, monkeypatch):
+        """Test that the started worker drains the queue and stops cleanly."""
+        monkeypatch.setenv("SKIP_RECOMMENDATION_QUEUE", "false")
+        recompute_queue.start(session_factory)
+        try:
+            recompute_queue.enqueue(goal_student.id)
+            deadline = time.monotonic() + 5
+            while recompute_queue.get_status()["processed"] < 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert recompute_queue.get_status()["running"] is True
+        finally:
+            recompute_queue.stop()
+
+        status_ = recompute_queue.get_status()
+        assert status_["processed"] == 1
+        assert status_["running"] is False
+
+
+@pytest.mark.api
+class TestProfileWritesEnqueue:
+    """Test that profile writes queue a recomputation."""
+
+    def test_update_courses_enqueues(self, client, test_student, test_course):
+        """Test PUT /students/{id}/courses."""
+        response = client.put(f"/students/{test_student.id}/courses", json={"courses_taken": [test_course.id]})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert recompute_queue.get_status()["depth"] == 1
+
+    def test_update_student_enqueues_once(self, client, test_student, test_student_data):
+        """Test PUT /students/{id} twice before the worker runs."""
+        payload = {k: v for k, v in test_student_data.items() if k != "password"}
+        client.put(f"/students/{test_student.id}", json=payload)
+        client.put(f"/students/{test_student.id}", json={**payload, "year": 3})
+
+        response = client.get("/recompute-queue")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["depth"] == 1
+        assert response.json()["deduplicated"] == 1
@@ -0,0 +1,177 @@
+"""
+Tests for the time-decayed review quality signal.
+
+Tests:
+- O(1) decayed sum/weight updates in crud
+- POST /reviews/ and DELETE /students/{student_id} keeping course_review_stats current
+- quality=decayed on the recommendation endpoints
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import status
+
+from app import crud, models
+from app.recommendation_engine import config
+
+
+def _add_review(db_session, student_id, course_id, score, created_at):
+    db_session.add(models.CourseReview(
+        student_id=student_id,
+        course_id=course_id,
+        industry_relevance_rating=3,
+        instructor_rating=3,
+        useful_learning_rating=3,
+        final_score=score,
+        created_at=created_at,
+    ))
+
+
+@pytest.mark.unit
+class TestDecayedStats:
+    """Test the incremental decayed stats updates."""
+
+    def test_older_review_decays_by_half_life(self, db_session, test_course):
+        """Test that a review one half-life old weighs half as much as a new one."""
+        start = datetime(2024, 1, 1)
+        later = start + timedelta(days=config.REVIEW_HALF_LIFE_DAYS)
+
+        crud.record_review_decay(db_session, test_course.id, 4.0, at=start)
+        stats = crud.record_review_decay(db_session, test_course.id, 10.0, at=later)
+
+        assert stats.decayed_weight == pytest.approx(1.5)
+        assert stats.decayed_sum == pytest.approx(0.5 * 4.0 + 10.0)
+        assert stats.updated_at == later
+
+    def test_out_of_order_review_is_decayed_on_its_own(self, db_session, test_course):
+        """Test that folding an older review does not move the reference time."""
+        start = datetime(2024, 1, 1)
+        later = start + timedelta(days=config.REVIEW_HALF_LIFE_DAYS)
+
+        crud.record_review_decay(db_session, test_course.id, 10.0, at=later)
+        stats = crud.record_review_decay(db_session, test_course.id, 4.0, at=start)
+
+        assert stats.decayed_weight == pytest.approx(1.5)
+        assert stats.decayed_sum == pytest.approx(10.0 + 0.5 * 4.0)
+        assert stats.updated_at == later
+
+    def test_rebuild_matches_incremental_updates(self, db_session, test_student, test_course):
+        """Test that the backfill produces the same values as the incremental path."""
+        start = datetime(2024, 1, 1)
+        for days, score in [(0, 6.0), (100, 8.0), (400, 9.0)]:
+            _add_review(db_session, test_student.id, test_course.id, score, start + timedelta(days=days))
+        db_session.commit()
+
+        crud.rebuild_review_decay_stats(db_session)
+        rebuilt = db_session.get(models.CourseReviewStats, test_course.id)
+
+        expected_weight = sum(
+            crud.decay_factor(timedelta(days=400 - days).total_seconds()) for days in (0, 100, 400)
+        )
+        assert rebuilt.decayed_weight == pytest.approx(expected_weight)
+        assert rebuilt.updated_at == start + timedelta(days=400)
+
+    def test_insert_if_missing_keeps_existing_row(self, db_session, test_course):
+        """Test that a second first-review insert is a no-op instead of a key violation."""
+        crud.record_review_decay(db_session, test_course.id, 8.0, at=datetime(2024, 1, 1))
+
+        crud._insert_if_missing(
+            db_session, models.CourseReviewStats,
+            course_id=test_course.id, decayed_sum=0.0, decayed_weight=0.0, updated_at=datetime(2024, 2, 1),
+        )
+        db_session.expire_all()
+
+        stats = db_session.get(models.CourseReviewStats, test_course.id)
+        assert stats.decayed_sum == pytest.approx(8.0)
+        assert stats.decayed_weight == pytest.approx(1.0)
+
+    def test_remove_student_reviews_refolds_stats(self, db_session, test_student, test_course):
+        """Test that a student's reviews leave the decayed stats of the courses they reviewed."""
+        other = models.Student(name="other_reviewer", hashed_password="x")
+        solo_course = models.Course(name="Reviewed Once")
+        db_session.add_all([other, solo_course])
+        db_session.commit()
+        start = datetime(2024, 1, 1)
+        _add_review(db_session, other.id, test_course.id, 6.0, start)
+        _add_review(db_session, test_student.id, test_course.id, 10.0, start + timedelta(days=30))
+        _add_review(db_session, test_student.id, solo_course.id, 9.0, start)
+        db_session.commit()
+        crud.rebuild_review_decay_stats(db_session)
+
+        crud.remove_student_reviews(db_session, test_student.id)
+        db_session.commit()
+
+        stats = db_session.get(models.CourseReviewStats, test_course.id)
+        assert stats.decayed_sum == pytest.approx(6.0)
+        assert stats.decayed_weight == pytest.approx(1.0)
+        assert stats.updated_at == start
+        assert db_session.get(models.CourseReviewStats, solo_course.id) is None
+
+
+@pytest.mark.api
+class TestReviewCreationUpdatesStats:
+    """Test POST /reviews/ maintaining course_review_stats."""
+
+    def test_create_review_updates_stats(self, authenticated_client, db_session, test_course, test_review_data):
+        """Test that each new review is folded into the course's decayed stats."""
+        authenticated_client.post("/reviews/", json=test_review_data)
+        response = authenticated_client.post("/reviews/", json=test_review_data)
+
+        assert response.status_code == status.HTTP_200_OK
+        db_session.expire_all()
+        stats = db_session.get(models.CourseReviewStats, test_course.id)
+        assert stats.decayed_weight == pytest.approx(2.0, abs=1e-6)
+        assert stats.decayed_sum == pytest.approx(2 * response.json()["final_score"], abs=1e-5)
+
+    def test_delete_student_removes_their_reviews_from_stats(self, client, db_session, test_student, test_course):
+        """Test that deleting a student drops their reviews from the decayed stats."""
+        _add_review(db_session, test_student.id, test_course.id, 10.0, datetime(2024, 1, 1))
+        db_session.commit()
+        crud.record_review_decay(db_session, test_course.id, 10.0, at=datetime(2024, 1, 1))
+        db_session.commit()
+
+        response = client.delete(f"/students/{test_student.id}")
+
+        assert response.status_code == status.HTTP_200_OK
+        db_session.expire_all()
+        assert db_session.get(models.CourseReviewStats, test_course.id) is None
+        assert db_session.query(models.CourseReview).count() == 0
+
+
+@pytest.mark.api
+class TestDecayedQualityRanking:
+    """Test quality=decayed on GET /recommendations/courses/for-goal/{id}."""
+
+    def test_recent_reviews_outrank_old_ones(self, authenticated_client, db_session, test_student, test_career_goal):
+        """Test that old perfect reviews lose to recent good ones only in decayed mode."""
+        old_course = models.Course(name="Legacy Systems")
+        new_course = models.Course(name="Modern Systems")
+        db_session.add_all([old_course, new_course])
+        db_session.commit()
+
+        # Legacy: eight perfect reviews from five years ago, two poor recent ones.
+        # Modern: four good recent reviews.
+        now = datetime.utcnow()
+        for _ in range(8):
+            _add_review(db_session, test_student.id, old_course.id, 10.0, now - timedelta(days=5 * 365))
+        for _ in range(2):
+            _add_review(db_session, test_student.id, old_course.id, 5.0, now - timedelta(days=7))
+        for _ in range(4):
+            _add_review(db_session, test_student.id, new_course.id, 8.0, now - timedelta(days=7))
+        db_session.commit()
+        crud.rebuild_review_decay_stats(db_session)
+
+        url = f"/recommendations/courses/for-goal/{test_career_goal.id}?enforce_prereqs=false"
+        bayesian = authenticated_client.get(url).json()["recommendations"]
+        decayed = authenticated_client.get(url + "&quality=decayed").json()["recommendations"]
+
+        assert bayesian[0]["course_id"] == old_course.id
+        assert decayed[0]["course_id"] == new_course.id
+
+    def test_unknown_quality_mode_rejected(self, authenticated_client, test_career_goal):
+        """Test that an unknown quality mode returns 422."""
+        response = authenticated_client.get(
+            f"/recommendations/courses/for-goal/{test_career_goal.id}?quality=newest"
+        )
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
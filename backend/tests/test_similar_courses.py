@@ -0,0 +1,113 @@
+"""
+Tests for the precomputed similar-courses neighbour lists.
+
+Tests:
+- top-N neighbour selection (self excluded, ties by course id)
+- cluster, skill and co-enrollment signals in the snapshot
+- GET /courses/{course_id}/similar
+"""
+import numpy as np
+import pytest
+from fastapi import status
+
+from app import crud, models
+from app.auth_utils import get_password_hash
+from app.recommendation_engine import config, snapshot
+
+
+@pytest.fixture
+def similar_catalog(db_session):
+    """Base course; Twin shares cluster and skill, Peer is only co-enrolled, Other is unrelated."""
+    skill = models.Skill(name="Similarity Skill", type="technical")
+    cluster = models.Cluster(name="Similarity Cluster")
+    base, twin, peer, other = [models.Course(name=name) for name in ("Base", "Twin", "Peer", "Other")]
+    db_session.add_all([skill, cluster, base, twin, peer, other])
+    db_session.commit()
+    db_session.add_all([
+        models.CourseSkill(course_id=base.id, skill_id=skill.id, relevance_score=0.5),
+        models.CourseSkill(course_id=twin.id, skill_id=skill.id, relevance_score=0.5),
+        models.CourseCluster(course_id=base.id, cluster_id=cluster.id),
+        models.CourseCluster(course_id=twin.id, cluster_id=cluster.id),
+    ])
+    db_session.commit()
+
+    student = models.Student(name="similarity_student", hashed_password=get_password_hash("x"))
+    db_session.add(student)
+    db_session.commit()
+    crud.add_student_course(db_session, student.id, base.id)
+    crud.add_student_course(db_session, student.id, peer.id)
+    snapshot.invalidate()
+    return {"base": base, "twin": twin, "peer": peer, "other": other}
+
+
+@pytest.mark.unit
+class TestTopNeighbours:
+    """Test snapshot._top_neighbours."""
+
+    def test_excludes_self_and_zero_scores(self):
+        """Test that a course is never its own neighbour and unrelated courses are left out."""
+        similarity = np.array([[1.0, 0.5, 0.0], [0.5, 1.0, 0.0], [0.0, 0.0, 1.0]])
+
+        neighbours, scores = snapshot._top_neighbours(similarity, np.array([1, 2, 3]), 2)
+
+        assert neighbours.tolist() == [[1, -1], [0, -1], [-1, -1]]
+        assert scores[0, 0] == 0.5
+
+    def test_ties_broken_by_course_id(self):
+        """Test that equally similar courses are kept in course id order."""
+        similarity = np.full((4, 4), 0.3)
+
+        neighbours, _ = snapshot._top_neighbours(similarity, np.array([40, 30, 20, 10]), 2)
+
+        assert neighbours[0].tolist() == [3, 2]
+
+
+@pytest.mark.unit
+class TestSnapshotNeighbours:
+    """Test neighbour lists built with the snapshot."""
+
+    def test_signals_are_blended(self, db_session, similar_catalog):
+        """Test that cluster + skill similarity outranks co-enrollment alone."""
+        snap = snapshot.get_snapshot(db_session)
+        row = snap.course_index[similar_catalog["base"].id]
+
+        ids = [int(snap.course_ids[j]) for j in snap.neighbours[row] if j >= 0]
+        assert ids == [similar_catalog["twin"].id, similar_catalog["peer"].id]
+        assert snap.neighbour_scores[row, 0] == pytest.approx(config.SIMILAR_W_CLUSTER + config.SIMILAR_W_SKILLS)
+        assert snap.neighbour_scores[row, 1] == pytest.approx(config.SIMILAR_W_COENROLL)
+
+
+@pytest.mark.api
+class TestSimilarCoursesEndpoint:
+    """Test GET /courses/{course_id}/similar."""
+
+    def test_get_similar(self, client, similar_catalog):
+        """Test that neighbours come back best first, limited by n."""
+        response = client.get(f"/courses/{similar_catalog['base'].id}/similar?n=1")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == [{
+            "course_id": similar_catalog["twin"].id,
+            "name": "Twin",
+            "similarity": pytest.approx(config.SIMILAR_W_CLUSTER + config.SIMILAR_W_SKILLS),
+        }]
+
+    def test_unrelated_course_has_no_neighbours(self, client, similar_catalog):
+        """Test an empty list for a course similar to nothing."""
+        response = client.get(f"/courses/{similar_catalog['other'].id}/similar")
+
+        assert response.json() == []
+
+    def test_unknown_course(self, client):
+        """Test that an unknown course returns 404."""
+        response = client.get("/courses/99999/similar")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_n_above_precomputed_rejected(self, client, similar_catalog):
+        """Test that n cannot exceed the stored neighbour count."""
+        response = client.get(
+            f"/courses/{similar_catalog['base'].id}/similar?n={config.SIMILAR_COURSES_N + 1}"
+        )
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,156 @@
+"""
+Tests for the skill-gap set cover.
+
+Tests:
+- greedy weighted set cover over bitmasks (ties, costs, speed)
+- missing skills from completed courses, prerequisite eligibility
+- GET /recommendations/skill-cover/{career_goal_id}
+"""
+import random
+import time
+
+import numpy as np
+import pytest
+from fastapi import status
+
+from app import crud, models
+from app.recommendation_engine import service
+
+
+@pytest.fixture
+def cover_catalog(db_session):
+    """Goal needing skills s0..s3; courses teaching different subsets of them."""
+    skills = [models.Skill(name=f"cover_skill_{i}", type="technical") for i in range(4)]
+    goal = models.CareerGoal(name="Full Stack Developer")
+    wide = models.Course(name="Wide Course", credits=6.0)     # s0, s1, s2
+    left = models.Course(name="Left Course", credits=2.0)     # s0, s1
+    right = models.Course(name="Right Course", credits=2.0)   # s2, s3
+    gated = models.Course(name="Gated Course", credits=1.0)   # s0..s3, requires wide
+    db_session.add_all([*skills, goal, wide, left, right, gated])
+    db_session.commit()
+
+    def teach(course, idx):
+        return [models.CourseSkill(course_id=course.id, skill_id=skills[i].id, relevance_score=0.5) for i in idx]
+
+    db_session.add_all([
+        *[models.CareerGoalTechnicalSkill(career_goal_id=goal.id, skill_id=s.id) for s in skills],
+        *teach(wide, [0, 1, 2]),
+        *teach(left, [0, 1]),
+        *teach(right, [2, 3]),
+        *teach(gated, [0, 1, 2, 3]),
+        models.CoursePrerequisite(course_id=gated.id, required_course_id=wide.id),
+    ])
+    db_session.commit()
+    return {"skills": skills, "goal": goal, "wide": wide, "left": left, "right": right, "gated": gated}
+
+
+def _ids(result):
+    return [c["course_id"] for c in result["courses"]]
+
+
+@pytest.mark.unit
+class TestGreedyCover:
+    """Test the bitmask greedy set cover."""
+
+    def test_picks_largest_gain_first(self):
+        """Test the classic greedy order on bitmask sets."""
+        masks = [0b0111, 0b0011, 0b1100]
+        chosen, uncovered = service._greedy_cover(
+            masks, np.ones(3), np.zeros(3), np.array([1, 2, 3]), 0b1111,
+        )
+
+        assert [pos for pos, _ in chosen] == [0, 2]
+        assert chosen[1][1] == 0b1000
+        assert uncovered == 0
+
+    def test_ties_go_to_review_quality(self):
+        """Test that equal gains are broken by higher review quality."""
+        chosen, _ = service._greedy_cover(
+            [0b11, 0b11], np.ones(2), np.array([0.4, 0.9]), np.array([1, 2]), 0b11,
+        )
+
+        assert [pos for pos, _ in chosen] == [1]
+
+    def test_costs_weight_the_gain(self):
+        """Test that gain per unit cost decides the pick."""
+        chosen, _ = service._greedy_cover(
+            [0b111, 0b011, 0b100], np.array([6.0, 2.0, 2.0]), np.zeros(3), np.array([1, 2, 3]), 0b111,
+        )
+
+        assert sorted(pos for pos, _ in chosen) == [1, 2]
+
+    def test_uncoverable_skills_remain(self):
+        """Test that skills nobody teaches are returned as uncovered."""
+        _, uncovered = service._greedy_cover([0b01], np.ones(1), np.zeros(1), np.array([1]), 0b11)
+
+        assert uncovered == 0b10
+
+    def test_thousands_of_courses_in_milliseconds(self):
+        """Test the cover for 5000 courses over 300 skills stays fast."""
+        rng = random.Random(0)
+        n_courses, n_skills = 5000, 300
+        masks = [sum(1 << rng.randrange(n_skills) for _ in range(8)) for _ in range(n_courses)]
+        costs = np.ones(n_courses)
+        quality = np.array([rng.random() for _ in range(n_courses)])
+
+        start = time.perf_counter()
+        chosen, uncovered = service._greedy_cover(
+            masks, costs, quality, np.arange(n_courses), (1 << n_skills) - 1,
+        )
+        elapsed = time.perf_counter() - start
+
+        assert uncovered == 0
+        assert elapsed < 0.5
+
+
+@pytest.mark.unit
+class TestSkillCover:
+    """Test recommend_skill_cover."""
+
+    def test_cover_uses_eligible_courses(self, db_session, test_student, cover_catalog):
+        """Test that a prerequisite-blocked course is not part of the cover."""
+        result = service.recommend_skill_cover(db_session, test_student.id, cover_catalog["goal"].id)
+
+        assert _ids(result) == [cover_catalog["wide"].id, cover_catalog["right"].id]
+        assert len(result["missing_skills"]) == 4
+        assert result["uncovered_skills"] == []
+
+    def test_completed_courses_reduce_missing_skills(self, db_session, test_student, cover_catalog):
+        """Test that skills taught by completed courses are not covered again."""
+        crud.add_student_course(db_session, test_student.id, cover_catalog["wide"].id)
+
+        result = service.recommend_skill_cover(db_session, test_student.id, cover_catalog["goal"].id)
+
+        assert [s["skill_id"] for s in result["missing_skills"]] == [cover_catalog["skills"][3].id]
+        # The gated course is now eligible and ties with Right; lower course id wins
+        assert _ids(result) == [cover_catalog["right"].id]
+
+    def test_credit_cost(self, db_session, test_student, cover_catalog):
+        """Test that cost='credits' prefers cheaper courses."""
+        result = service.recommend_skill_cover(
+            db_session, test_student.id, cover_catalog["goal"].id, cost="credits",
+        )
+
+        assert sorted(_ids(result)) == sorted([cover_catalog["left"].id, cover_catalog["right"].id])
+
+
+@pytest.mark.api
+class TestSkillCoverEndpoint:
+    """Test GET /recommendations/skill-cover/{career_goal_id}."""
+
+    def test_get_skill_cover(self, authenticated_client, cover_catalog):
+        """Test that the endpoint returns the picked courses with the skills they add."""
+        response = authenticated_client.get(f"/recommendations/skill-cover/{cover_catalog['goal'].id}")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert [len(c["covers"]) for c in data["courses"]] == [3, 1]
+        assert data["courses"][0]["credits"] == 6.0
+
+    def test_unknown_cost_rejected(self, authenticated_client, cover_catalog):
+        """Test that an unknown cost returns 422."""
+        response = authenticated_client.get(
+            f"/recommendations/skill-cover/{cover_catalog['goal'].id}?cost=hours"
+        )
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
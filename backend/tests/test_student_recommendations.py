@@ -0,0 +1,116 @@
+"""
+Tests for GET /students/me/recommendations.
+
+Tests:
+- cache-first responses keyed on the student's state
+- ETag / If-None-Match revalidation and Cache-Control
+- cached visits do not load the student row
+"""
+import pytest
+from fastapi import status
+from sqlalchemy import event
+
+from app import crud, models
+from app.recommendation_engine import service
+
+
+@pytest.fixture
+def goal_catalog(db_session, test_student, test_career_goal, test_skill_technical):
+    """Goal skill taught by two courses; test_student has the goal."""
+    courses = [models.Course(name=f"Facade Course {i}") for i in range(2)]
+    db_session.add_all(courses)
+    db_session.commit()
+    db_session.add_all([
+        models.CareerGoalTechnicalSkill(career_goal_id=test_career_goal.id, skill_id=test_skill_technical.id),
+        *[models.CourseSkill(course_id=c.id, skill_id=test_skill_technical.id, relevance_score=0.9 - 0.1 * i)
+          for i, c in enumerate(courses)],
+    ])
+    test_student.career_goal_id = test_career_goal.id
+    db_session.commit()
+    service.clear_caches()
+    return courses
+
+
+@pytest.mark.unit
+class TestGetStudentRecommendations:
+    """Test service.get_student_recommendations."""
+
+    def test_repeat_call_is_served_from_cache(self, db_session, test_student, test_career_goal, goal_catalog, monkeypatch):
+        """Test that an unchanged student is not recomputed."""
+        etag, first = service.get_student_recommendations(db_session, test_student.id, test_career_goal.id)
+        monkeypatch.setattr(service, "recommend_courses", lambda *a, **kw: pytest.fail("recomputed"))
+
+        again, second = service.get_student_recommendations(db_session, test_student.id, test_career_goal.id)
+
+        assert again == etag
+        assert second is first
+
+    def test_profile_change_changes_etag(self, db_session, test_student, test_career_goal, goal_catalog):
+        """Test that completing a course gives a new ETag and response."""
+        etag, _ = service.get_student_recommendations(db_session, test_student.id, test_career_goal.id)
+
+        crud.add_student_course(db_session, test_student.id, goal_catalog[0].id)
+        new_etag, response = service.get_student_recommendations(db_session, test_student.id, test_career_goal.id)
+
+        assert new_etag != etag
+        assert [r["course_id"] for r in response["recommendations"]] == [goal_catalog[1].id]
+
+    def test_matching_etag_returns_no_body(self, db_session, test_student, test_career_goal, goal_catalog):
+        """Test that If-None-Match with the current ETag skips the response."""
+        etag, _ = service.get_student_recommendations(db_session, test_student.id, test_career_goal.id)
+
+        assert service.get_student_recommendations(
+            db_session, test_student.id, test_career_goal.id, if_none_match=f'W/{etag}',
+        ) == (etag, None)
+
+
+@pytest.mark.api
+class TestStudentRecommendationsEndpoint:
+    """Test GET /students/me/recommendations."""
+
+    def test_get_recommendations(self, authenticated_client, goal_catalog):
+        """Test the response, ETag and Cache-Control headers."""
+        response = authenticated_client.get("/students/me/recommendations?limit=1")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [r["course_id"] for r in response.json()["recommendations"]] == [goal_catalog[0].id]
+        assert response.headers["etag"]
+        assert response.headers["cache-control"].startswith("private")
+
+    def test_revalidation_returns_304(self, authenticated_client, goal_catalog):
+        """Test that a repeat visit with the ETag gets 304 Not Modified."""
+        etag = authenticated_client.get("/students/me/recommendations").headers["etag"]
+
+        response = authenticated_client.get("/students/me/recommendations", headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+
+    def test_student_row_not_loaded(self, authenticated_client, db_session, goal_catalog):
+        """Test that a cached visit reads single columns, not the students table row."""
+        authenticated_client.get("/students/me/recommendations")
+        statements = []
+        engine = db_session.get_bind()
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            authenticated_client.get("/students/me/recommendations")
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        student_reads = [s for s in statements if "FROM students" in s]
+        assert student_reads
+        assert all("students.hashed_password" not in s for s in student_reads)
+
+    def test_no_career_goal(self, authenticated_client):
+        """Test that a student without a career goal gets 400."""
+        response = authenticated_client.get("/students/me/recommendations")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_requires_auth(self, client):
+        """Test that the endpoint requires authentication."""
+        response = client.get("/students/me/recommendations")
+
+        assert response.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,139 @@
+"""
+Tests for the startup warm-up and the readiness endpoint.
+
+Tests:
+- GET /ready
+- warm-up steps (sync and async pool priming, catalog snapshot, peer index, role-fit and similarity pages)
+- leaderboard rebuild after the worker is ready, once per deployment
+"""
+import asyncio
+import threading
+
+import pytest
+from fastapi import status
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app import warmup
+from app.recommendation_engine import leaderboard, service, snapshot
+
+from .conftest import async_engine
+
+
+@pytest.mark.api
+class TestReadiness:
+    """Test GET /ready endpoint."""
+
+    def test_ready_when_warmup_skipped(self, client):
+        """Test that SKIP_WARMUP marks the worker ready at startup."""
+        response = client.get("/ready")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["ready"] is True
+
+    def test_not_ready_until_warmup_finishes(self, client):
+        """Test that readiness reports 503 while warm-up has not finished."""
+        warmup.reset()
+
+        response = client.get("/ready")
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.json()["ready"] is False
+
+
+@pytest.mark.unit
+class TestRunWarmup:
+    """Test the warm-up steps."""
+
+    def test_run_warmup_times_every_step(self, db_session, test_course, test_career_goal):
+        """Test that every step is timed and the worker becomes ready."""
+        engine = db_session.get_bind()
+        warmup.reset()
+
+        warmup.run_warmup(sessionmaker(bind=engine), engine)
+
+        status_ = warmup.get_status()
+        assert status_["ready"] is True
+        assert set(status_["steps"]) == {
+            "db_pool", "async_db_pool", "catalog_snapshot", "leaderboard", "peer_index", "goal_role_fit", "similarity",
+        }
+        assert snapshot.read_generation() is not None
+
+    def test_async_pool_primed_on_the_serving_loop(self, db_session):
+        """Test that the async engine's connections are opened and pinged on the given event loop."""
+        engine = db_session.get_bind()
+        loop = asyncio.new_event_loop()
+        loop_thread = threading.Thread(target=loop.run_forever, daemon=True)
+        loop_thread.start()
+        pings = []
+        listener = lambda conn, cursor, statement, *args: pings.append(statement)
+        event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+        try:
+            warmup.reset()
+            warmup.run_warmup(sessionmaker(bind=engine), engine, async_engine, loop)
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", listener)
+            loop.call_soon_threadsafe(loop.stop)
+            loop_thread.join()
+            loop.close()
+
+        assert pings == ["SELECT 1"]  # NullPool in tests: one connection
+        assert "async_db_pool" in warmup.get_status()["steps"]
+
+    def test_leaderboard_built_after_ready(self, db_session, monkeypatch):
+        """Test that /ready does not wait for the leaderboard rebuild."""
+        engine = db_session.get_bind()
+        ready_at_rebuild = []
+        monkeypatch.setattr(service, "rebuild_leaderboard", lambda db: ready_at_rebuild.append(warmup.is_ready()) or 0)
+        warmup.reset()
+
+        warmup.run_warmup(sessionmaker(bind=engine), engine)
+
+        assert ready_at_rebuild == [True]
+
+    def test_leaderboard_rebuilt_by_one_worker(self, db_session, monkeypatch):
+        """Test that a second worker's warm-up leaves the shared leaderboard alone."""
+        engine = db_session.get_bind()
+        rebuilds = []
+        monkeypatch.setattr(service, "rebuild_leaderboard", lambda db: rebuilds.append(db) or 0)
+
+        for _ in range(2):
+            warmup.reset()
+            warmup.run_warmup(sessionmaker(bind=engine), engine)
+
+        assert len(rebuilds) == 1
+        assert warmup.is_ready()
+
+    def test_failed_leaderboard_stays_ready(self, db_session, monkeypatch):
+        """Test that a failing leaderboard rebuild leaves the worker ready."""
+        engine = db_session.get_bind()
+
+        def broken(db):
+            raise RuntimeError("leaderboard unavailable")
+
+        monkeypatch.setattr(service, "rebuild_leaderboard", broken)
+        warmup.reset()
+
+        warmup.run_warmup(sessionmaker(bind=engine), engine)
+
+        status_ = warmup.get_status()
+        assert status_["ready"] is True
+        assert "leaderboard" not in status_["steps"]
+        assert leaderboard.claim_rebuild() is True  # released for the next worker
+
+    def test_failed_warmup_stays_not_ready(self, db_session, monkeypatch):
+        """Test that a failing step leaves the worker not ready with the error recorded."""
+        class BrokenEngine:
+            pool = None
+
+            def connect(self):
+                raise RuntimeError("database unavailable")
+
+        monkeypatch.setattr(warmup, "WARMUP_ATTEMPTS", 1)
+        warmup.reset()
+
+        warmup._run_with_retries(sessionmaker(bind=db_session.get_bind()), BrokenEngine())
+
+        status_ = warmup.get_status()
+        assert status_["ready"] is False
+        assert "database unavailable" in status_["error"]
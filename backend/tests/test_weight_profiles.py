@@ -0,0 +1,178 @@
+"""
+Tests for named weight profiles and the cached score components.
+
+Tests:
+- profile registry: default profile, config profiles, JSON file reload
+- re-weighting cached components for another profile
+- profile selection on the recommendation endpoints
+"""
+import json
+import os
+
+import pytest
+from fastapi import status
+
+from app import crud, models
+from app.recommendation_engine import config, profiles, service
+
+
+@pytest.fixture
+def profiles_file(tmp_path, monkeypatch):
+    """Point the profile registry at an isolated JSON file."""
+    path = tmp_path / "profiles.json"
+    monkeypatch.setattr(config, "WEIGHT_PROFILES_FILE", str(path))
+    monkeypatch.setattr(profiles, "_file_profiles", {})
+    monkeypatch.setattr(profiles, "_file_mtime", None)
+    return path
+
+
+def _write_profiles(path, data, mtime):
+    path.write_text(json.dumps(data))
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def affinity_catalog(db_session, test_student):
+    """Two candidates: one fitting the goal, one similar to a completed course."""
+    python = models.Skill(name="Python", type="technical")
+    cluster = models.Cluster(name="Systems")
+    goal = models.CareerGoal(name="Backend Developer")
+    done = models.Course(name="Operating Systems")
+    fit = models.Course(name="Python Services")
+    similar = models.Course(name="Distributed Systems")
+    db_session.add_all([python, cluster, goal, done, fit, similar])
+    db_session.commit()
+
+    db_session.add_all([
+        models.CareerGoalTechnicalSkill(career_goal_id=goal.id, skill_id=python.id),
+        models.CourseSkill(course_id=fit.id, skill_id=python.id, relevance_score=0.2),
+        models.CourseCluster(course_id=done.id, cluster_id=cluster.id),
+        models.CourseCluster(course_id=similar.id, cluster_id=cluster.id),
+    ])
+    db_session.commit()
+    crud.add_student_course(db_session, test_student.id, done.id)
+    service.clear_caches()
+    return {"goal": goal, "fit": fit, "similar": similar}
+
+
+@pytest.mark.unit
+class TestProfileRegistry:
+    """Test the weight profile registry."""
+
+    def test_default_mirrors_config(self, profiles_file):
+        """Test that the default profile follows the config constants."""
+        assert profiles.get_profile() == {
+            "w1": config.W1, "w2": config.W2, "w5": config.W5, "alpha": config.ALPHA,
+        }
+
+    def test_config_profile_fills_missing_keys(self, profiles_file):
+        """Test that a registered profile inherits unset weights from config."""
+        profile = profiles.get_profile("affinity_boost")
+
+        assert profile["w2"] == pytest.approx(0.30)
+        assert profile["alpha"] == config.ALPHA
+
+    def test_unknown_profile(self, profiles_file):
+        """Test that an unknown profile name raises ValueError."""
+        with pytest.raises(ValueError):
+            profiles.get_profile("nope")
+
+    def test_file_is_reloaded_when_changed(self, profiles_file):
+        """Test that edits to the profiles file apply without a restart."""
+        _write_profiles(profiles_file, {"ab_test": {"w1": 0.5}}, mtime=1_000_000)
+        assert profiles.get_profile("ab_test")["w1"] == 0.5
+
+        _write_profiles(profiles_file, {"ab_test": {"w1": 0.7}}, mtime=1_000_100)
+        assert profiles.get_profile("ab_test")["w1"] == 0.7
+
+    def test_invalid_file_keeps_previous_profiles(self, profiles_file):
+        """Test that a broken profiles file does not drop the loaded profiles."""
+        _write_profiles(profiles_file, {"ab_test": {"w1": 0.5}}, mtime=1_000_000)
+        profiles.get_profile("ab_test")
+
+        _write_profiles(profiles_file, {"ab_test": {"w1": 3.0}}, mtime=1_000_100)
+
+        assert profiles.get_profile("ab_test")["w1"] == 0.5
+        with pytest.raises(ValueError):
+            profiles.reload()
+
+    def test_invalid_file_read_once_per_change(self, profiles_file, caplog):
+        """Test that a broken file is parsed and logged once, not on every request."""
+        _write_profiles(profiles_file, {"ab_test": {"w1": 3.0}}, mtime=1_000_000)
+
+        with caplog.at_level("WARNING", logger=profiles.__name__):
+            for _ in range(3):
+                profiles.list_profiles()
+        assert len(caplog.records) == 1
+
+        _write_profiles(profiles_file, {"ab_test": {"w1": 0.4}}, mtime=1_000_100)
+        assert profiles.get_profile("ab_test")["w1"] == 0.4
+
+
+@pytest.mark.unit
+class TestComponentCache:
+    """Test re-weighting cached score components."""
+
+    def test_profiles_share_components(self, db_session, test_student, affinity_catalog, profiles_file):
+        """Test that a second profile re-weights the cached components."""
+        goal = affinity_catalog["goal"]
+
+        default = service.recommend_courses(db_session, test_student.id, goal.id)
+        boosted = service.recommend_courses(db_session, test_student.id, goal.id, weight_profile="affinity_boost")
+
+        assert len(service._components_cache) == 1
+        assert service._components_cache.stats()["hits"] == 1
+        assert default["recommendations"][0]["course_id"] == affinity_catalog["fit"].id
+        assert boosted["recommendations"][0]["course_id"] == affinity_catalog["similar"].id
+        assert boosted["weight_profile"] == "affinity_boost"
+        top = boosted["recommendations"][0]
+        assert top["final_score"] == pytest.approx(
+            0.60 * top["breakdown"]["s_role"] + 0.30 * top["breakdown"]["s_affinity"]
+            + 0.10 * top["breakdown"]["q_smoothed"]
+        )
+
+    def test_alpha_change_recomputes_affinity(self, db_session, test_student, affinity_catalog, profiles_file):
+        """Test that a profile with another alpha blends the cached similarity blocks."""
+        _write_profiles(profiles_file, {"clusters_only": {"alpha": 1.0}, "skills_only": {"alpha": 0.0}}, mtime=1_000_000)
+        goal = affinity_catalog["goal"]
+
+        by_cluster = service.recommend_courses(db_session, test_student.id, goal.id, weight_profile="clusters_only")
+        by_skill = service.recommend_courses(db_session, test_student.id, goal.id, weight_profile="skills_only")
+
+        def affinity(result, course):
+            return next(
+                r["breakdown"]["s_affinity"] for r in result["recommendations"] if r["course_id"] == course.id
+            )
+
+        assert len(service._components_cache) == 1
+        assert affinity(by_cluster, affinity_catalog["similar"]) == pytest.approx(1.0)
+        assert affinity(by_skill, affinity_catalog["similar"]) == pytest.approx(0.0)
+
+
+@pytest.mark.api
+class TestProfileEndpoints:
+    """Test profile selection on the recommendation endpoints."""
+
+    def test_list_profiles(self, authenticated_client, profiles_file):
+        """Test GET /recommendations/weight-profiles."""
+        response = authenticated_client.get("/recommendations/weight-profiles")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert {"default", "affinity_boost"} <= set(response.json())
+
+    def test_profile_query_parameter(self, authenticated_client, affinity_catalog, profiles_file):
+        """Test that ?profile= selects the weights used for the ranking."""
+        url = f"/recommendations/courses/for-goal/{affinity_catalog['goal'].id}?profile=affinity_boost"
+        response = authenticated_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["weight_profile"] == "affinity_boost"
+        assert response.json()["recommendations"][0]["course_id"] == affinity_catalog["similar"].id
+
+    def test_unknown_profile_rejected(self, authenticated_client, test_career_goal, profiles_file):
+        """Test that an unknown profile returns 400."""
+        response = authenticated_client.get(
+            f"/recommendations/courses/for-goal/{test_career_goal.id}?profile=nope"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
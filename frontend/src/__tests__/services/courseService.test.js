@@ -5,6 +5,7 @@
 import {
   getCourse,
   getCourseStats,
+  getCoursesStats,
   getCourseReviews,
   locateReviewPage
 } from '../../services/courseService';
@@ -118,6 +119,35 @@ describe('courseService', () => {
     });
   });
 
+  describe('getCoursesStats', () => {
+    test('getCoursesStats fetches stats for several courses in one request', async () => {
+      const mockStats = [
+        { course_id: 1, review_count: 2, avg_final_score: 8.0 },
+        { course_id: 3, review_count: 0, avg_final_score: 0.0 }
+      ];
+
+      fetch.mockResolvedValueOnce({
+        ok: true,
+        json: async () => mockStats
+      });
+
+      const result = await getCoursesStats([1, 3], mockToken);
+
+      expect(fetch).toHaveBeenCalledWith(
+        'http://localhost:8000/courses/stats?ids=1,3',
+        expect.objectContaining({ method: 'GET' })
+      );
+      expect(result).toEqual(mockStats);
+    });
+
+    test('getCoursesStats skips the request for no ids', async () => {
+      const result = await getCoursesStats([], mockToken);
+
+      expect(fetch).not.toHaveBeenCalled();
+      expect(result).toEqual([]);
+    });
+  });
+
   describe('getCourseReviews', () => {
     test('getCourseReviews successfully fetches paginated reviews', async () => {
       const mockReviews = {
@@ -58,10 +58,10 @@ const RecommendationsPage = () => {
 
                 {recommendations.map((rec, index) => (
                     <div key={rec.course_id} style={{ marginBottom: '24px', padding: '20px', border: '1px solid #e0e0e0', borderRadius: '8px' }}>
-                        <h3 style={{ fontSize: '20px', fontWeight: '600', marginBottom: '8px', color: '#333' }}>{rec.course_name}</h3>
+                        <h3 style={{ fontSize: '20px', fontWeight: '600', marginBottom: '8px', color: '#333' }}>{rec.name}</h3>
                         <ul style={{ listStyleType: 'disc', paddingLeft: '20px', marginBottom: '16px' }}>
-                            {rec.reasons.map((reason, i) => (
-                                <li key={i} style={{ fontSize: '14px', color: '#555', marginBottom: '4px' }}>{reason}</li>
+                            {rec.matched_technical_skills.map((skill) => (
+                                <li key={skill.skill_id} style={{ fontSize: '14px', color: '#555', marginBottom: '4px' }}>Teaches {skill.name}</li>
                             ))}
                         </ul>
                         <button
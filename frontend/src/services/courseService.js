@@ -49,6 +49,32 @@ export const getCourseStats = async (courseId, token) => {
   return response.json();
 };
 
+/**
+ * Fetch statistics for several courses in one request (e.g. a grid page)
+ * @param {number[]} courseIds - The course IDs
+ * @param {string} token - Auth token
+ * @returns {Promise<Object[]>} Stats objects with course_id, in the order of courseIds (unknown ids left out)
+ */
+export const getCoursesStats = async (courseIds, token) => {
+  if (courseIds.length === 0) {
+    return [];
+  }
+
+  const response = await fetch(`${API_URL}/courses/stats?ids=${courseIds.join(',')}`, {
+    method: 'GET',
+    headers: {
+      'Content-Type': 'application/json',
+      'Authorization': `Bearer ${token}`,
+    },
+  });
+
+  if (!response.ok) {
+    throw new Error(`Failed to fetch course stats: ${response.status} ${response.statusText}`);
+  }
+
+  return response.json();
+};
+
 /**
  * Fetch paginated reviews for a course
  * @param {number} courseId - The course ID